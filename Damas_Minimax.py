@@ -1,12 +1,30 @@
 import pygame
 import sys
+import argparse
+import multiprocessing
 
-pygame.init()
+from motor import busqueda, busqueda_paralela, instrumentacion
+from motor.bitboard import from_pieces, to_pieces
+from motor.busqueda import iterative_deepening
+from motor.geometria import board_size, click_move, initial_pieces, piece_captures
+from motor.libro_aperturas import book_move, open_book
+from motor.ponderacion import Ponderer
+from motor.tablas_finales import MAX_TURNS, best_move as tablebase_move, open_tablebase
+from motor.turno_ia import AITurn
+
+# La tabla de finales y el libro de aperturas se cargan en un diccionario una sola vez;
+# si falta el archivo, la IA busca.
+open_tablebase()
+open_book()
 
 screen_width = 400
 screen_height = 400
-screen = pygame.display.set_mode((screen_width, screen_height))
-pygame.display.set_caption("Juego de Damas 4x4")
+# Solo el proceso principal abre la ventana; los procesos de la búsqueda en paralelo
+# únicamente buscan.
+if multiprocessing.parent_process() is None:
+    pygame.init()
+    screen = pygame.display.set_mode((screen_width, screen_height))
+    pygame.display.set_caption(f"Juego de Damas {board_size}x{board_size}")
 
 # Colores
 BOARD_BLACK = (0, 0, 0)               # Casillas negras
@@ -16,22 +34,33 @@ SELECT_COLOR = (150, 150, 255)        # Resalte en el menú
 VINO_PIECE = (128, 0, 32)             # Piezas de la IA (vinotinto)
 PLAYER_PIECE = (100, 100, 100)        # Piezas del jugador (grises)
 MOVEMENT_COUNTER = (0, 128, 255)      # Color del contador de turnos
+FPS = 60                              # Cuadros por segundo del bucle principal
 
-# Tamaño del tablero
-board_size = 4
+# Tamaño del tablero (board_size viene de motor/geometria.py, que lee DAMAS_TAMANO)
 square_size = screen_width // board_size
 
 # Representación de las piezas:
 # Cada pieza se representa como una tupla: (color, is_king)
 # Inicialmente, ninguna pieza es "dama" (False)
-pieces = {
-    (0, 0): (VINO_PIECE, False),
-    (0, 2): (VINO_PIECE, False),
-    (3, 1): (PLAYER_PIECE, False),
-    (3, 3): (PLAYER_PIECE, False),
-}
+pieces = initial_pieces()
+
+# Tiempo máximo (en milisegundos) que la IA puede pensar cada jugada.
+AI_TIME_BUDGET_MS = 300
+AI_MAX_DEPTH = 64
+# Búsqueda en paralelo (ver motor/busqueda_paralela.py): procesos que se reparten las
+# jugadas de la raíz (1 = búsqueda secuencial) y si el resultado debe ser reproducible.
+AI_WORKERS = 1
+AI_DETERMINISTIC = False
+# Ponderación (ver motor/ponderacion.py): buscar durante el turno del jugador las
+# respuestas a sus jugadas probables. Si se activa, main crea `ponderer`.
+AI_PONDER = False
+ponderer = None
+ai_search_depth = 0   # Profundidad alcanzada en la última jugada de la IA ("TF" tabla de finales, "LA" libro de aperturas)
+# La búsqueda corre en segundo plano (ver motor/turno_ia.py) para que la ventana no se congele
+ai_turn = AITurn() if multiprocessing.parent_process() is None else None
 
 selected_piece = None
+jumping = False   # True mientras el jugador encadena capturas con selected_piece
 # Para evitar confusiones, usamos "player" para el jugador y "vino" para la IA.
 turn = 'player'  
 turn_counter = 0
@@ -62,6 +91,27 @@ def show_movement_counter():
     turn_text = f"Turnos: {turn_counter}"
     text_surface = font.render(turn_text, True, MOVEMENT_COUNTER)
     screen.blit(text_surface, (10, 10))
+    depth_text = font.render(f"Prof. IA: {ai_search_depth}", True, MOVEMENT_COUNTER)
+    screen.blit(depth_text, (10, 40))
+    if ponderer is not None:
+        ponder_text = font.render(f"Aciertos: {ponderer.hits}/{ponderer.hits + ponderer.misses}", True, MOVEMENT_COUNTER)
+        screen.blit(ponder_text, (10, 70))
+
+# Indicador mientras la IA busca su jugada: los puntos avanzan con el tiempo.
+def show_thinking():
+    font = pygame.font.Font(None, 36)
+    dots = "." * (pygame.time.get_ticks() // 300 % 4)
+    text_surface = font.render(f"Pensando{dots}", True, MOVEMENT_COUNTER)
+    screen.blit(text_surface, (10, screen_height - 40))
+
+# Cierra el juego; si la IA está pensando (o ponderando), primero detiene la búsqueda.
+def quit_game():
+    ai_turn.cancel()
+    if ponderer is not None:
+        ponderer.cancel()
+        print(ponderer.summary())
+    pygame.quit()
+    sys.exit()
 
 def show_menu():
     options = ["Jugar", "Salir"]
@@ -86,8 +136,7 @@ def show_menu():
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+                quit_game()
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_UP:
                     selected_index = (selected_index - 1) % len(options)
@@ -97,8 +146,7 @@ def show_menu():
                     if selected_index == 0:
                         return
                     elif selected_index == 1:
-                        pygame.quit()
-                        sys.exit()
+                        quit_game()
 
 # Función que promueve a dama (rey) si la pieza llega a la fila contraria.
 def promote_piece(row, piece):
@@ -114,7 +162,7 @@ def promote_piece(row, piece):
 
 # Función para manejar el movimiento mediante el mouse.
 def handle_mouse_click(pos):
-    global selected_piece, turn, turn_counter
+    global selected_piece, turn, turn_counter, jumping
     col = pos[0] // square_size
     row = pos[1] // square_size
 
@@ -125,35 +173,27 @@ def handle_mouse_click(pos):
             if (p_color == PLAYER_PIECE and turn == 'player') or (p_color == VINO_PIECE and turn == 'vino'):
                 selected_piece = (row, col)
     else:
-        selected_row, selected_col = selected_piece
-        # Movimiento normal (una casilla en diagonal)
-        if (abs(selected_row - row) == 1 and abs(selected_col - col) == 1):
-            moving_piece = pieces[selected_piece]
-            color, is_king = moving_piece
-            # Para piezas NO promocionadas, se restringe el movimiento hacia adelante.
-            if not is_king:
-                if (color == PLAYER_PIECE and row >= selected_row) or (color == VINO_PIECE and row <= selected_row):
-                    selected_piece = None
-                    return
+        # Un paso a una casilla vacía o, con clic en una pieza rival, la captura
+        # saltando sobre ella; las tablas de geometria.py dicen qué es válido.
+        move = click_move(pieces, selected_piece, (row, col))
+        # En medio de una cadena de capturas solo vale seguir saltando con la misma pieza
+        if jumping and (move is None or move[1] is None):
+            return
+        if move is not None:
+            landing, captured = move
+            moving_piece = pieces.pop(selected_piece)
+            if captured is not None:
+                del pieces[captured]
             # Mueve la pieza y aplica la promoción si corresponde.
-            new_piece = promote_piece(row, moving_piece)
-            pieces[(row, col)] = new_piece
-            del pieces[selected_piece]
+            pieces[landing] = promote_piece(landing[0], moving_piece)
+            # Si puede seguir capturando (y no acaba de coronar), el turno no pasa
+            if captured is not None and pieces[landing] == moving_piece and piece_captures(pieces, landing):
+                selected_piece = landing
+                jumping = True
+                return
+            jumping = False
             turn = 'player' if turn == 'vino' else 'vino'
             turn_counter += 1
-        else:
-            # Intento de captura:
-            if (row, col) in pieces and pieces[(row, col)][0] != pieces[selected_piece][0]:
-                behind_row = row + (row - selected_row)
-                behind_col = col + (col - selected_col)
-                if 0 <= behind_row < board_size and 0 <= behind_col < board_size and (behind_row, behind_col) not in pieces:
-                    moving_piece = pieces[selected_piece]
-                    new_piece = promote_piece(behind_row, moving_piece)
-                    del pieces[(row, col)]
-                    pieces[(behind_row, behind_col)] = new_piece
-                    del pieces[selected_piece]
-                    turn = 'player' if turn == 'vino' else 'vino'
-                    turn_counter += 1
         selected_piece = None
         check_winner()
 
@@ -168,7 +208,7 @@ def check_winner():
 
 def check_draw():
     global turn_counter
-    if turn_counter >= 64:
+    if turn_counter >= MAX_TURNS:
         show_winner_message("¡Empate!|Número máximo|de turnos alcanzado.")
 
 def show_winner_message(winner):
@@ -183,110 +223,103 @@ def show_winner_message(winner):
         y_offset += 50
     pygame.display.flip()
     pygame.time.wait(3000)
-    pygame.quit()
-    sys.exit()
+    quit_game()
 
-# La IA utiliza Minimax con poda alfa-beta.
-def apply_ai_move():
-    global turn, turn_counter
-    best_move = minimax(pieces, 3, True, float('-inf'), float('inf'))
+# La IA utiliza Minimax con poda alfa-beta y profundización iterativa:
+# busca cada vez más profundo hasta agotar AI_TIME_BUDGET_MS. Corre en el hilo de
+# ai_turn sobre su propia posición de bitboards, sin tocar el estado del juego, y
+# devuelve (jugada, profundidad). turn_number es el número de turnos jugados hasta
+# `position`, para el límite de turnos de la tabla de finales.
+def search_ai_move(position, turn_number):
+    # Si la posición está en la tabla de finales, la respuesta es inmediata y perfecta.
+    best_move = tablebase_move(position, True, MAX_TURNS - turn_number)
+    if best_move is not None:
+        return best_move, "TF"
+    # En la apertura, la jugada que el libro buscó a profundidad fija.
+    book_entry = book_move(position)
+    if book_entry is not None:
+        return book_entry[0], "LA"
+    if AI_WORKERS > 1 or AI_DETERMINISTIC:
+        best_move, _, depth = busqueda_paralela.iterative_deepening(
+            position, True, AI_TIME_BUDGET_MS, AI_MAX_DEPTH, AI_WORKERS, AI_DETERMINISTIC)
+    else:
+        best_move, _, depth = iterative_deepening(position, True, AI_TIME_BUDGET_MS, AI_MAX_DEPTH)
+    return best_move, depth
+
+# Aplica la jugada de la IA (buscada o tomada de la ponderación) y, con la ponderación
+# activa, empieza a buscar las respuestas a las jugadas del jugador.
+def finish_ai_move(result, ponder_hit=False):
+    apply_ai_move(result)
+    if instrumentacion.enabled:
+        instrumentacion.emit("ai_move", turn=turn_counter, depth=ai_search_depth, ponder_hit=ponder_hit)
+    if ponderer is not None and turn == 'player':
+        ponderer.start(from_pieces(pieces), turn_counter)
+
+# Aplica en el bucle principal la jugada que devolvió search_ai_move.
+def apply_ai_move(result):
+    global turn, turn_counter, ai_search_depth
+    best_move, ai_search_depth = result
     if best_move:
         pieces.clear()
-        pieces.update(best_move)
+        pieces.update(to_pieces(best_move))
         turn = 'player'
         turn_counter += 1
     check_winner()
 
-def evaluate_board(board):
-    vino_count = sum(1 for piece in board.values() if piece[0] == VINO_PIECE)
-    player_count = sum(1 for piece in board.values() if piece[0] == PLAYER_PIECE)
-    return vino_count - player_count
-
-def generate_moves(board, color):
-    moves = []
-    capture_moves = []
-    for (row, col), piece in board.items():
-        if piece[0] == color:
-            color_piece, is_king = piece
-            # Direcciones permitidas según si es dama o no.
-            if is_king:
-                directions = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
-            else:
-                if color == PLAYER_PIECE:
-                    directions = [(-1, -1), (-1, 1)]  # Las piezas del jugador solo avanzan "hacia arriba" (fila menor)
-                else:
-                    directions = [(1, -1), (1, 1)]      # Las piezas vinotinto solo avanzan "hacia abajo" (fila mayor)
-            for d_row, d_col in directions:
-                new_row = row + d_row
-                new_col = col + d_col
-                if 0 <= new_row < board_size and 0 <= new_col < board_size:
-                    if (new_row, new_col) not in board:
-                        new_board = board.copy()
-                        del new_board[(row, col)]
-                        new_piece = promote_piece(new_row, piece)
-                        new_board[(new_row, new_col)] = new_piece
-                        moves.append(new_board)
-                    # Verifica posibilidad de captura.
-                    enemy_row = row + d_row
-                    enemy_col = col + d_col
-                    behind_row = enemy_row + d_row
-                    behind_col = enemy_col + d_col
-                    if (0 <= enemy_row < board_size and 0 <= enemy_col < board_size and
-                        (enemy_row, enemy_col) in board and board[(enemy_row, enemy_col)][0] != color):
-                        if 0 <= behind_row < board_size and 0 <= behind_col < board_size and (behind_row, behind_col) not in board:
-                            capture_board = board.copy()
-                            del capture_board[(row, col)]
-                            del capture_board[(enemy_row, enemy_col)]
-                            new_piece = promote_piece(behind_row, piece)
-                            capture_board[(behind_row, behind_col)] = new_piece
-                            capture_moves.append(capture_board)
-    return capture_moves if capture_moves else moves
-
-def minimax(board, depth, maximizing_player, alpha, beta):
-    if depth == 0:
-        return evaluate_board(board)
-    if maximizing_player:
-        max_eval = float('-inf')
-        best_move = None
-        for move in generate_moves(board, VINO_PIECE):
-            eval_value = minimax(move, depth - 1, False, alpha, beta)
-            if eval_value > max_eval:
-                max_eval = eval_value
-                best_move = move
-            alpha = max(alpha, eval_value)
-            if beta <= alpha:
-                break
-        return best_move if depth == 3 else max_eval
-    else:
-        min_eval = float('inf')
-        best_move = None
-        for move in generate_moves(board, PLAYER_PIECE):
-            eval_value = minimax(move, depth - 1, True, alpha, beta)
-            if eval_value < min_eval:
-                min_eval = eval_value
-                best_move = move
-            beta = min(beta, eval_value)
-            if beta <= alpha:
-                break
-        return best_move if depth == 3 else min_eval
-
 def main():
+    global AI_WORKERS, AI_DETERMINISTIC, AI_PONDER, ponderer
+    parser = argparse.ArgumentParser(description="Juego de damas contra la IA minimax.")
+    parser.add_argument("--procesos", type=int, default=AI_WORKERS, help="Procesos de la búsqueda (1 = secuencial)")
+    parser.add_argument("--determinista", action="store_true", help="Misma jugada sin importar los tiempos ni los procesos")
+    parser.add_argument("--ponderar", action="store_true", help="Buscar durante el turno del jugador")
+    parser.add_argument("--medir", metavar="ARCHIVO", help="Escribir tiempos por jugada de la IA como líneas JSON")
+    parser.add_argument("--perfil", metavar="ARCHIVO", help="Guardar un perfil de cProfile al salir")
+    args = parser.parse_args()
+    AI_WORKERS = args.procesos
+    AI_DETERMINISTIC = AI_DETERMINISTIC or args.determinista
+    AI_PONDER = AI_PONDER or args.ponderar
+    if AI_PONDER:
+        ponderer = Ponderer(search_ai_move)
+    if args.perfil:
+        instrumentacion.start_profile(args.perfil)
+    if args.medir:
+        instrumentacion.start(args.medir)
+        # Los procesos de la búsqueda en paralelo no se miden; aquí solo se ve su espera.
+        instrumentacion.instrument(busqueda, ["search_root", "minimax", "generate_moves"])
+        instrumentacion.instrument(busqueda_paralela, ["iterative_deepening"])
+        instrumentacion.instrument(sys.modules[__name__], ["tablebase_move", "book_move", "iterative_deepening"], "Damas_Minimax")
     show_menu()
+    clock = pygame.time.Clock()
     while True:
         draw_board()
         draw_pieces()
         show_movement_counter()
+        if ai_turn.busy():
+            show_thinking()
         pygame.display.flip()
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+                quit_game()
             if event.type == pygame.MOUSEBUTTONDOWN and turn == 'player':
                 handle_mouse_click(event.pos)
 
+        # La búsqueda se lanza en segundo plano (la posición se pasa a bitboards) y su
+        # jugada se aplica en el primer cuadro después de que termina. Si la ponderación
+        # ya tiene la respuesta a la jugada del jugador, se aplica sin buscar.
         if turn == 'vino':
-            apply_ai_move()
+            if ai_turn.done():
+                finish_ai_move(ai_turn.result())
+            elif not ai_turn.busy():
+                if instrumentacion.enabled:
+                    instrumentacion.reset()
+                position = from_pieces(pieces)
+                answer = ponderer.take(position) if ponderer is not None else None
+                if answer is not None:
+                    finish_ai_move(answer, ponder_hit=True)
+                else:
+                    ai_turn.start(search_ai_move, position, turn_counter)
+        clock.tick(FPS)
 
 if __name__ == "__main__":
     main()
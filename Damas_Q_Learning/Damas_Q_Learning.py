@@ -1,17 +1,32 @@
 import pygame
 import sys
+import argparse
 import random
-import json
 import os
 import copy
 
+# El motor compartido está en la carpeta raíz del proyecto.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motor import instrumentacion
+from motor.bitboard import from_pieces, to_pieces
+from motor.geometria import board_size, click_move, initial_pieces, piece_captures
+from motor.libro_aperturas import book_move, open_book
+from motor.tablas_finales import MAX_TURNS, best_move as tablebase_move, open_tablebase
+from motor.turno_ia import AITurn
+
+# Reglas, recompensas y actualización de la Q-table compartidas con el entrenamiento.
+import nucleo
+from nucleo import (NO_MOVE_ACTION, TERMINAL_ACTION, compute_reward, generate_moves, get_state_representation,
+                    promote_piece, save_q_table, update_q_table)
+
 pygame.init()
 
 # Dimensiones de la ventana del juego
 screen_width = 400
 screen_height = 400
 screen = pygame.display.set_mode((screen_width, screen_height))
-pygame.display.set_caption("Juego de Damas 4x4")
+pygame.display.set_caption(f"Juego de Damas {board_size}x{board_size}")
 
 # Colores
 BOARD_BLACK = (0, 0, 0)               # Casillas negras
@@ -21,86 +36,34 @@ SELECT_COLOR = (150, 150, 255)        # Resalte en el menú
 VINO_PIECE = (128, 0, 32)             # Piezas de la IA (vinotinto)
 PLAYER_PIECE = (100, 100, 100)        # Piezas del jugador (grises)
 MOVEMENT_COUNTER = (0, 128, 255)      # Color del contador de turnos
+FPS = 60                              # Cuadros por segundo del bucle principal
 
-# Tamaño del tablero
-board_size = 4
+# Tamaño del tablero (board_size viene de motor/geometria.py, que lee DAMAS_TAMANO)
 square_size = screen_width // board_size
 
 # Representación de las piezas:
 # Cada pieza se representa como una tupla: (color, is_king)
 # Inicialmente, ninguna pieza es "dama" (False)
-pieces = {
-    (0, 0): (VINO_PIECE, False),
-    (0, 2): (VINO_PIECE, False),
-    (3, 1): (PLAYER_PIECE, False),
-    (3, 3): (PLAYER_PIECE, False),
-}
+pieces = initial_pieces()
 
 selected_piece = None
+jumping = False   # True mientras el jugador encadena capturas con selected_piece
 # Usamos "player" para el jugador y "vino" para la IA.
 turn = 'player'
 turn_counter = 0
 
-# Parámetros de Q-Learning
-alpha = 0.5         # Tasa de aprendizaje
-gamma = 0.9         # Factor de descuento
+# Parámetros de Q-Learning (alpha, gamma y la Q-table viven en nucleo.py)
 epsilon = 0.2       # Probabilidad de exploración
-q_table_file = "Damas_Q_Learning\qtable.json"
-q_table = {}  # Se cargará desde el archivo JSON
-
-# Carga los datos del archivo a q_table
-def load_q_table():
-    global q_table
-    if os.path.exists(q_table_file):
-        try:
-            with open(q_table_file, "r") as f:
-                q_table = json.load(f)
-        except Exception as e:
-            print("Error cargando qtable:", e)
-            q_table = {}
-    else:
-        q_table = {}
-
-# Guarda los datos en qtable
-def save_q_table():
-    # Carga la información existente y fusiona con la tabla actual
-    existing = {}
-    if os.path.exists(q_table_file):
-        try:
-            with open(q_table_file, "r") as f:
-                existing = json.load(f)
-        except Exception as e:
-            print("Error leyendo qtable para fusionar:", e)
-            existing = {}
-    for state, actions in q_table.items():
-        if state in existing:
-            for action, value in actions.items():
-                existing[state][action] = value
-        else:
-            existing[state] = actions
-    with open(q_table_file, "w") as f:
-        json.dump(existing, f)
-
-# Convierte el estado del tablero a una cadena unica
-def get_state_representation(board):
-    # Se ordenan las piezas para tener una representación consistente.
-    items = sorted([(str(k), board[k]) for k in board.keys()])
-    return str(items)
-
-# Actualiza qtable
-def update_q_table(state, action, reward, next_state):
-    global q_table
-    if state not in q_table:
-        q_table[state] = {}
-    if action not in q_table[state]:
-        q_table[state][action] = 0.0
-    next_max = 0.0
-    if next_state is not None and next_state in q_table and q_table[next_state]:
-        next_max = max(q_table[next_state].values())
-    q_table[state][action] = q_table[state][action] + alpha * (reward + gamma * next_max - q_table[state][action])
+use_tablebase = True  # Si la posición está en la tabla de finales, se juega la jugada perfecta
+use_book = True       # En la apertura se juega la jugada del libro (tableros mayores que el 4x4)
+# La jugada de la IA y el guardado de la Q-table corren en segundo plano (ver
+# motor/turno_ia.py) para que la ventana no se congele
+ai_turn = AITurn()
 
 # Cargar la Q-Table desde el archivo JSON al iniciar
-load_q_table()
+nucleo.load_q_table()
+open_tablebase()
+open_book()
 
 # Dibuja el tablero
 def draw_board():
@@ -132,6 +95,21 @@ def show_movement_counter():
     text_surface = font.render(turn_text, True, MOVEMENT_COUNTER)
     screen.blit(text_surface, (10, 10))
 
+# Indicador mientras la IA elige su jugada: los puntos avanzan con el tiempo.
+def show_thinking():
+    font = pygame.font.Font(None, 36)
+    dots = "." * (pygame.time.get_ticks() // 300 % 4)
+    text_surface = font.render(f"Pensando{dots}", True, MOVEMENT_COUNTER)
+    screen.blit(text_surface, (10, screen_height - 40))
+
+# Cierra el juego: espera a que la IA termine (sin dejar la Q-table a medio escribir)
+# y guarda los cambios pendientes.
+def quit_game():
+    ai_turn.cancel()
+    save_q_table()
+    pygame.quit()
+    sys.exit()
+
 # Muestra el menu
 def show_menu():
     options = ["Jugar", "Salir"]
@@ -156,9 +134,7 @@ def show_menu():
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                save_q_table()
-                pygame.quit()
-                sys.exit()
+                quit_game()
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_UP:
                     selected_index = (selected_index - 1) % len(options)
@@ -168,106 +144,7 @@ def show_menu():
                     if selected_index == 0:
                         return
                     elif selected_index == 1:
-                        save_q_table()
-                        pygame.quit()
-                        sys.exit()
-
-# Función que promueve a dama (rey) si la pieza llega a la fila contraria.
-def promote_piece(row, piece):
-    color, is_king = piece
-    if not is_king:
-        if color == PLAYER_PIECE and row == 0:
-            return (color, True)
-        if color == VINO_PIECE and row == board_size - 1:
-            return (color, True)
-    return piece
-
-# ------------------------------
-# Funciones auxiliares para recompensas
-# ------------------------------
-
-# Cuenta las piezas
-def count_pieces(board, team):
-    return sum(1 for piece in board.values() if piece[0] == team)
-
-# Cuenta las promociones
-def count_promoted(board, team):
-    return sum(1 for piece in board.values() if piece[0] == team and piece[1] == True)
-
-
-# Recompensa por soporte: Suma +0.2 si una ficha tiene al menos un amigo en alguna casilla diagonal.
-# Además, evalúa el posicionamiento protegido: si la ficha cuenta con una amiga en la dirección
-# "trasera" (según la dirección de avance) que le impide ser capturada, se otorga +0.5.
-
-def support_reward(board, team):
-    
-    reward = 0
-    for (row, col), piece in board.items():
-        if piece[0] == team:
-            # Evaluar soporte en cualquier diagonal
-            for d_row, d_col in [(-1, -1), (-1, 1), (1, -1), (1, 1)]:
-                r = row + d_row
-                c = col + d_col
-                if (r, c) in board and board[(r, c)][0] == team:
-                    reward += 0.2
-                    break
-            # Evaluar posicionamiento protegido: definir "atrás" según el sentido de avance.
-            if team == VINO_PIECE:
-                backward_dirs = [(-1, -1), (-1, 1)]
-            else:
-                backward_dirs = [(1, -1), (1, 1)]
-            for d_row, d_col in backward_dirs:
-                r = row + d_row
-                c = col + d_col
-                if 0 <= r < board_size and 0 <= c < board_size:
-                    if (r, c) in board and board[(r, c)][0] == team:
-                        reward += 1.5
-                        break
-    return reward
-
-# Recompensa por ocupar celdas centrales en un tablero 4x4
-def central_control_reward(board, team):
-    reward = 0
-    central_cells = [(1, 1), (1, 2), (2, 1), (2, 2)]
-    for (row, col), piece in board.items():
-        if piece[0] == team and (row, col) in central_cells:
-            reward += 0.1
-    return reward
-
-
-# Calcula la recompensa basada en:
-#   - Pérdida o ganancia de piezas (–5 por cada propia perdida, +5 por cada enemiga capturada)
-#   - Promoción a dama (+1 por cada ficha promovida)
-#   - Penalización leve si el movimiento es "normal" sin captura ni promoción (–0.05)
-#   - Recompensas adicionales por soporte (incluyendo posicionamiento protegido) y control central
-
-def compute_reward(before, after, team):
-   
-    reward = 0
-    enemy = PLAYER_PIECE if team == VINO_PIECE else VINO_PIECE
-
-    own_before = count_pieces(before, team)
-    own_after = count_pieces(after, team)
-    enemy_before = count_pieces(before, enemy)
-    enemy_after = count_pieces(after, enemy)
-
-    if own_after < own_before:
-        reward -= 5 * (own_before - own_after)
-    if enemy_after < enemy_before:
-        reward += 5 * (enemy_before - enemy_after)
-
-    prom_before = count_promoted(before, team)
-    prom_after = count_promoted(after, team)
-    if prom_after > prom_before:
-        reward += 3 * (prom_after - prom_before)
-
-    if (enemy_after == enemy_before) and (prom_after == prom_before):
-        reward -= 0.1
-
-    reward += support_reward(after, team)
-    reward += central_control_reward(after, team)
-
-    return reward
+                        quit_game()
 
 # ------------------------------
 # Lógica del Juego y Q-Learning (Human vs IA)
@@ -275,7 +152,7 @@ def compute_reward(before, after, team):
 
 # Permite que el jugador mueva piezas
 def handle_mouse_click(pos):
-    global selected_piece, turn, turn_counter
+    global selected_piece, turn, turn_counter, jumping
     col = pos[0] // square_size
     row = pos[1] // square_size
 
@@ -285,30 +162,24 @@ def handle_mouse_click(pos):
             if (p_color == PLAYER_PIECE and turn == 'player') or (p_color == VINO_PIECE and turn == 'vino'):
                 selected_piece = (row, col)
     else:
-        selected_row, selected_col = selected_piece
-        # Primero se verifica si se intenta capturar (clic en pieza enemiga)
-        if (row, col) in pieces and pieces[(row, col)][0] != pieces[selected_piece][0]:
-            behind_row = row + (row - selected_row)
-            behind_col = col + (col - selected_col)
-            if 0 <= behind_row < board_size and 0 <= behind_col < board_size and (behind_row, behind_col) not in pieces:
-                moving_piece = pieces[selected_piece]
-                new_piece = promote_piece(behind_row, moving_piece)
-                del pieces[(row, col)]
-                pieces[(behind_row, behind_col)] = new_piece
-                del pieces[selected_piece]
-                turn = 'player' if turn == 'vino' else 'vino'
-                turn_counter += 1
-        # Movimiento normal a casilla adyacente
-        elif (row, col) not in pieces and abs(selected_row - row) == 1 and abs(selected_col - col) == 1:
-            moving_piece = pieces[selected_piece]
-            color, is_king = moving_piece
-            if not is_king:
-                if (color == PLAYER_PIECE and row >= selected_row) or (color == VINO_PIECE and row <= selected_row):
-                    selected_piece = None
-                    return
-            new_piece = promote_piece(row, moving_piece)
-            pieces[(row, col)] = new_piece
-            del pieces[selected_piece]
+        # Captura (clic en pieza enemiga) o paso a casilla vacía, validados con las
+        # tablas de geometria.py
+        move = click_move(pieces, selected_piece, (row, col))
+        # En medio de una cadena de capturas solo vale seguir saltando con la misma pieza
+        if jumping and (move is None or move[1] is None):
+            return
+        if move is not None:
+            landing, captured = move
+            moving_piece = pieces.pop(selected_piece)
+            if captured is not None:
+                del pieces[captured]
+            pieces[landing] = promote_piece(landing[0], moving_piece)
+            # Si puede seguir capturando (y no acaba de coronar), el turno no pasa
+            if captured is not None and pieces[landing] == moving_piece and piece_captures(pieces, landing):
+                selected_piece = landing
+                jumping = True
+                return
+            jumping = False
             turn = 'player' if turn == 'vino' else 'vino'
             turn_counter += 1
         selected_piece = None
@@ -321,19 +192,19 @@ def check_winner():
     check_draw()
     if vino_count == 0:
         # IA pierde: actualizar Q-table con castigo fuerte (-20)
-        terminal_state = get_state_representation(pieces)
-        update_q_table(terminal_state, "terminal", -20, None)
+        terminal_state = get_state_representation(pieces, turn == 'vino')
+        update_q_table(terminal_state, TERMINAL_ACTION, -20, None)
         show_winner_message("Gano el jugador|grises")
     elif player_count == 0:
         # IA gana: actualizar Q-table con recompensa fuerte (+20)
-        terminal_state = get_state_representation(pieces)
-        update_q_table(terminal_state, "terminal", 20, None)
+        terminal_state = get_state_representation(pieces, turn == 'vino')
+        update_q_table(terminal_state, TERMINAL_ACTION, 20, None)
         show_winner_message("Gano el jugador|vinotinto")
 
 # Evalua si hay empate
 def check_draw():
     global turn_counter
-    if turn_counter >= 64:
+    if turn_counter >= MAX_TURNS:
         show_winner_message("¡Empate!|Número máximo|de turnos alcanzado.")
 
 # Muestra el ganador
@@ -353,66 +224,38 @@ def show_winner_message(winner):
     pygame.quit()
     sys.exit()
 
-# Genera movimientos para la IA
-def generate_moves(board, color):
-    moves = []
-    capture_moves = []
-    for (row, col), piece in board.items():
-        if piece[0] == color:
-            color_piece, is_king = piece
-            if is_king:
-                directions = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
-            else:
-                if color == PLAYER_PIECE:
-                    directions = [(-1, -1), (-1, 1)]  # El jugador (humano) avanza hacia arriba (fila menor)
-                else:
-                    directions = [(1, -1), (1, 1)]      # La IA avanza hacia abajo (fila mayor)
-            for d_row, d_col in directions:
-                new_row = row + d_row
-                new_col = col + d_col
-                if 0 <= new_row < board_size and 0 <= new_col < board_size:
-                    if (new_row, new_col) not in board:
-                        new_board = board.copy()
-                        del new_board[(row, col)]
-                        new_piece = promote_piece(new_row, piece)
-                        new_board[(new_row, new_col)] = new_piece
-                        moves.append(new_board)
-                    # Captura: verificar casilla detrás de la pieza enemiga.
-                    enemy_row = row + d_row
-                    enemy_col = col + d_col
-                    behind_row = enemy_row + d_row
-                    behind_col = enemy_col + d_col
-                    if (0 <= enemy_row < board_size and 0 <= enemy_col < board_size and
-                        (enemy_row, enemy_col) in board and board[(enemy_row, enemy_col)][0] != color):
-                        if 0 <= behind_row < board_size and 0 <= behind_col < board_size and (behind_row, behind_col) not in board:
-                            capture_board = board.copy()
-                            del capture_board[(row, col)]
-                            del capture_board[(enemy_row, enemy_col)]
-                            new_piece = promote_piece(behind_row, piece)
-                            capture_board[(behind_row, behind_col)] = new_piece
-                            capture_moves.append(capture_board)
-    return capture_moves if capture_moves else moves
-
-# Función de la IA usando Q-Learning (para la jugada de la IA en Human vs IA)
-def apply_ai_move():
-    global turn, turn_counter, pieces
-    state = get_state_representation(pieces)
+# Función de la IA usando Q-Learning (para la jugada de la IA en Human vs IA). Corre
+# en el hilo de ai_turn sobre una copia del tablero: elige la jugada, actualiza la
+# Q-table y la guarda si toca, y devuelve el tablero resultante (None si no hay jugadas).
+# turn_number (turnos jugados) es para el límite de turnos de la tabla de finales.
+def choose_ai_move(pieces, turn_number):
+    state = get_state_representation(pieces, True)
     actions = []
     moves = generate_moves(pieces, VINO_PIECE)
     if not moves:
-        update_q_table(state, "none", -1, None)
-        turn = 'player'
-        return
+        update_q_table(state, NO_MOVE_ACTION, -1, None)
+        return None
     # Guardar el estado previo completo para calcular recompensa
     prev_board = copy.deepcopy(pieces)
     for move in moves:
-        action_rep = get_state_representation(move)
+        action_rep = get_state_representation(move, False)
         actions.append((move, action_rep))
+    position = from_pieces(pieces)
+    tablebase_choice = tablebase_move(position, True, MAX_TURNS - turn_number) if use_tablebase else None
+    book_entry = book_move(position) if use_book and tablebase_choice is None else None
+    if tablebase_choice is not None:
+        # Jugada perfecta consultada en la tabla de finales (sin explorar ni buscar).
+        selected_move = to_pieces(tablebase_choice)
+        selected_action = get_state_representation(selected_move, False)
+    elif book_entry is not None:
+        # Jugada del libro de aperturas: la apertura no se vuelve a explorar.
+        selected_move = to_pieces(book_entry[0])
+        selected_action = get_state_representation(selected_move, False)
     # Política epsilon-greedy
-    if random.random() < epsilon:
+    elif random.random() < epsilon:
         selected_move, selected_action = random.choice(actions)
     else:
-        q_values = q_table.get(state, {})
+        q_values = nucleo.q_table.get(state, {})
         best_value = -float('inf')
         selected_move, selected_action = None, None
         for move, action_rep in actions:
@@ -424,33 +267,66 @@ def apply_ai_move():
             selected_move, selected_action = random.choice(actions)
     prev_state = state
     pieces = selected_move.copy()
-    new_state = get_state_representation(pieces)
-    # Calcular recompensa basada en las mejoras definidas, incluyendo la recompensa por posicionamiento protegido
-    reward = compute_reward(prev_board, pieces, VINO_PIECE)
+    new_state = get_state_representation(pieces, False)
+    # Calcular recompensa con los pesos del juego contra el humano: promoción +3,
+    # penalización de -0.1 por jugada sin captura ni promoción y sin protection_reward
+    reward = compute_reward(prev_board, pieces, VINO_PIECE, promotion_bonus=3, idle_penalty=0.1, protection=False)
     update_q_table(prev_state, selected_action, reward, new_state)
+    # Solo se escriben los cambios, y como mucho cada pocos segundos
+    nucleo.maybe_save_q_table()
+    return pieces
+
+# Aplica en el bucle principal el tablero que devolvió choose_ai_move.
+def apply_ai_move(new_pieces):
+    global turn, turn_counter, pieces
     turn = 'player'
+    if new_pieces is None:
+        return
+    pieces = new_pieces
     turn_counter += 1
-    save_q_table()
     check_winner()
 
 def main():
+    parser = argparse.ArgumentParser(description="Juego de damas contra la IA de Q-Learning.")
+    parser.add_argument("--medir", metavar="ARCHIVO", help="Escribir tiempos por jugada de la IA como líneas JSON")
+    parser.add_argument("--perfil", metavar="ARCHIVO", help="Guardar un perfil de cProfile al salir")
+    args = parser.parse_args()
+    if args.perfil:
+        instrumentacion.start_profile(args.perfil)
+    if args.medir:
+        instrumentacion.start(args.medir)
+        instrumentacion.instrument(sys.modules[__name__], ["generate_moves", "get_state_representation", "compute_reward",
+                                                           "update_q_table", "tablebase_move", "book_move"],
+                                   "Damas_Q_Learning")
+        instrumentacion.instrument(nucleo, ["maybe_save_q_table"])
     show_menu()
+    clock = pygame.time.Clock()
     while True:
         draw_board()
         draw_pieces()
         show_movement_counter()
+        if ai_turn.busy():
+            show_thinking()
         pygame.display.flip()
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                save_q_table()
-                pygame.quit()
-                sys.exit()
+                quit_game()
             if event.type == pygame.MOUSEBUTTONDOWN and turn == 'player':
                 handle_mouse_click(event.pos)
 
+        # La IA juega en segundo plano sobre una copia del tablero; su jugada se aplica
+        # en el primer cuadro después de que termina.
         if turn == 'vino':
-            apply_ai_move()
+            if ai_turn.done():
+                apply_ai_move(ai_turn.result())
+                if instrumentacion.enabled:
+                    instrumentacion.emit("ai_move", turn=turn_counter)
+            elif not ai_turn.busy():
+                if instrumentacion.enabled:
+                    instrumentacion.reset()
+                ai_turn.start(choose_ai_move, dict(pieces), turn_counter)
+        clock.tick(FPS)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,98 @@
+# Almacenamiento persistente de la Q-table.
+#
+# En lugar de reescribir todo qtable.json en cada guardado, los cambios se agregan a un
+# registro (qtable.log) con una línea JSON [estado, acción, valor] por entrada modificada.
+# Al cargar se lee la instantánea qtable.json y se aplican encima las líneas del registro.
+# Cuando el registro crece demasiado se compacta: se vuelve a escribir la instantánea con
+# todo lo que hay en disco y se vacía el registro.
+#
+# Estados y acciones son enteros (ver get_state_representation en nucleo.py). JSON guarda
+# las claves de los diccionarios como texto, así que se convierten a int al leer.
+import json
+import os
+import time
+
+class QTableStore:
+    def __init__(self, snapshot_file, flush_interval=5.0, compact_min=20000, compact_ratio=2):
+        self.snapshot_file = snapshot_file
+        self.log_file = os.path.splitext(snapshot_file)[0] + ".log"
+        self.flush_interval = flush_interval   # Segundos entre guardados automáticos
+        self.compact_min = compact_min         # Líneas mínimas del registro antes de compactar
+        self.compact_ratio = compact_ratio     # Compacta si el registro supera ratio * estados
+        self.dirty = set()                     # (estado, acción) modificados desde el último guardado
+        self.log_entries = 0
+        self.last_flush = time.monotonic()
+
+    # Lee la instantánea. Si usa el formato antiguo (claves de texto con las piezas) se
+    # detiene en lugar de seguir, para no mezclar formatos ni perder datos al compactar.
+    def _read_snapshot(self):
+        if not os.path.exists(self.snapshot_file):
+            return {}
+        try:
+            with open(self.snapshot_file, "r") as f:
+                raw = json.load(f)
+        except Exception as e:
+            print("Error cargando qtable:", e)
+            return {}
+        try:
+            return {int(state): {int(action): value for action, value in actions.items()}
+                    for state, actions in raw.items()}
+        except ValueError:
+            raise ValueError(f"{self.snapshot_file} usa el formato antiguo de claves; "
+                             "conviértalo con: python Damas_Q_Learning/migrar_qtable.py") from None
+
+    # Lee la instantánea y aplica el registro de cambios.
+    def load(self):
+        table = self._read_snapshot()
+        self.log_entries = self._replay_log(table)
+        self.dirty.clear()
+        self.last_flush = time.monotonic()
+        return table
+
+    def _replay_log(self, table):
+        count = 0
+        if not os.path.exists(self.log_file):
+            return count
+        with open(self.log_file, "r") as f:
+            for line in f:
+                try:
+                    state, action, value = json.loads(line)
+                except ValueError:
+                    # Línea incompleta, por ejemplo si el programa se cerró a mitad de escritura
+                    continue
+                table.setdefault(state, {})[action] = value
+                count += 1
+        return count
+
+    def record(self, state, action):
+        self.dirty.add((state, action))
+
+    # Agrega al registro solo las entradas modificadas: el costo depende de los cambios,
+    # no del tamaño de la tabla.
+    def flush(self, table):
+        if self.dirty:
+            with open(self.log_file, "a") as f:
+                for state, action in self.dirty:
+                    f.write(json.dumps([state, action, table[state][action]]) + "\n")
+            self.log_entries += len(self.dirty)
+            self.dirty.clear()
+        self.last_flush = time.monotonic()
+        if self.log_entries > max(self.compact_min, self.compact_ratio * len(table)):
+            self.compact()
+
+    # Guarda solo si pasó flush_interval desde el último guardado.
+    def maybe_flush(self, table):
+        if time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush(table)
+
+    # Reescribe la instantánea con lo que hay en disco (incluidos cambios de otros procesos)
+    # y vacía el registro.
+    def compact(self):
+        merged = self._read_snapshot()
+        self._replay_log(merged)
+        temp_file = self.snapshot_file + ".tmp"
+        with open(temp_file, "w") as f:
+            json.dump(merged, f)
+        os.replace(temp_file, self.snapshot_file)
+        open(self.log_file, "w").close()
+        self.log_entries = 0
@@ -0,0 +1,78 @@
+# Entrenamiento sin ventana: no importa pygame, así que arranca al instante y
+# funciona en máquinas sin pantalla.
+#
+#   python Damas_Q_Learning/entrenar.py --partidas 7000 --procesos 8
+#   python Damas_Q_Learning/entrenar.py --partidas 7000 --densa
+#   python Damas_Q_Learning/entrenar.py --partidas 2000 --repeticion 50000 --prioridad 0.6
+import argparse
+import os
+import time
+
+import nucleo
+from motor import instrumentacion
+
+# Abre la Q-table densa; la primera vez se construye a partir de qtable.json.
+def load_dense_table():
+    import tabla_densa
+    if os.path.exists(tabla_densa.dense_table_file):
+        return tabla_densa.DenseQTable.load()
+    nucleo.load_q_table()
+    table, skipped = tabla_densa.DenseQTable.from_dict(nucleo.q_table)
+    print(f"Q-table densa creada desde {nucleo.q_table_file} ({skipped} entradas sin jugada legal omitidas)")
+    table.save()
+    return tabla_densa.DenseQTable.load()
+
+def print_progress(simulated, total):
+    print(f"Simuladas {simulated} / {total} partidas...")
+
+def main():
+    parser = argparse.ArgumentParser(description="Entrena la Q-table sin ventana simulando partidas IA vs IA.")
+    parser.add_argument("--partidas", type=int, default=7000, help="Número de partidas a simular")
+    parser.add_argument("--procesos", type=int, default=nucleo.num_workers, help="Procesos trabajadores (1 = secuencial)")
+    parser.add_argument("--sincronizar", type=int, default=nucleo.sync_interval, help="Partidas por proceso entre sincronizaciones")
+    parser.add_argument("--silencioso", action="store_true", help="No mostrar el progreso")
+    parser.add_argument("--densa", action="store_true", help="Entrenar la Q-table densa de NumPy (qtable_densa.npy)")
+    parser.add_argument("--repeticion", type=int, default=0, metavar="CAPACIDAD",
+                        help="Repetir transiciones de un búfer de esta capacidad (0 = no; ver repeticion.py)")
+    parser.add_argument("--prioridad", type=float, default=0.0, metavar="EXPONENTE",
+                        help="Prioridad por error TD al repetir (0 = muestreo uniforme)")
+    parser.add_argument("--importancia", type=float, default=0.4, metavar="BETA",
+                        help="Exponente inicial de los pesos de importancia con --prioridad (crece hasta 1)")
+    parser.add_argument("--minilotes", type=int, default=nucleo.replay_batches,
+                        help="Minilotes repetidos por partida")
+    parser.add_argument("--medir", metavar="ARCHIVO", help="Escribir tiempos cada 100 partidas como líneas JSON")
+    parser.add_argument("--perfil", metavar="ARCHIVO", help="Guardar un perfil de cProfile al terminar")
+    args = parser.parse_args()
+    if args.densa and args.procesos > 1:
+        parser.error("--densa solo funciona con --procesos 1")
+    if args.densa and nucleo.board_size != 4:
+        parser.error("--densa solo funciona con el tablero 4x4")
+    if args.repeticion and args.procesos > 1:
+        parser.error("--repeticion solo funciona con --procesos 1")
+    if args.perfil:
+        instrumentacion.start_profile(args.perfil)
+    if args.medir:
+        instrumentacion.start(args.medir)
+        nucleo.instrument_training()
+
+    progress = None if args.silencioso else print_progress
+    start = time.perf_counter()
+    if args.densa:
+        nucleo.dense_table = load_dense_table()
+    else:
+        nucleo.load_q_table()
+    if args.repeticion:
+        from repeticion import ReplayBuffer
+        nucleo.replay_batches = args.minilotes
+        nucleo.replay_buffer = ReplayBuffer(args.repeticion, args.prioridad, importance_exponent=args.importancia,
+                                            anneal_samples=nucleo.replay_samples(args.partidas))
+    if args.procesos > 1:
+        nucleo.simulate_games_parallel(args.partidas, args.procesos, args.sincronizar, progress=progress)
+    else:
+        nucleo.simulate_games(args.partidas, progress=progress, record_moves=False)
+    elapsed = time.perf_counter() - start
+    print(f"Victorias grises: {nucleo.gray_wins} | Victorias Vinotinto: {nucleo.vino_wins}")
+    print(f"{args.partidas} partidas en {elapsed:.1f} s ({args.partidas / elapsed:.0f} partidas/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# Convierte una Q-table guardada con un formato anterior al de get_state_representation
+# (enteros en forma canónica). Se ejecuta una sola vez:
+#
+#   python Damas_Q_Learning/migrar_qtable.py
+#
+# Hay dos formatos anteriores:
+#   - Claves de texto con la lista ordenada de piezas, p. ej.
+#     "[('(0, 0)', ((128, 0, 32), False)), ...]".
+#   - Claves enteras sin forma canónica: los estados con turno gris y las acciones con
+#     el código de la posición resultante tal cual.
+# En los dos casos, un estado con turno gris y su girado con turno vinotinto pasan a
+# ser la misma entrada; si los dos tenían valor para la misma acción, se guarda el
+# promedio.
+#
+# Las claves de texto no guardaban el turno, así que se deduce:
+#   - Para una acción normal, mueve el bando que ocupa una casilla nueva en la acción.
+#   - Para "terminal", si a un bando no le quedan piezas le tocaba mover a ese bando;
+#     si hay piezas de los dos (empate por límite de turnos), se guarda para ambos.
+#   - Para "none", mueve el bando que no tiene jugadas (o ambos si ninguno tiene).
+# La tabla original se conserva como qtable.json.bak.
+import ast
+import json
+import os
+import shutil
+
+import nucleo
+from motor.bitboard import decode_pieces
+from nucleo import NO_MOVE_ACTION, PLAYER_PIECE, TERMINAL_ACTION, VINO_PIECE, generate_moves, get_state_representation
+
+def parse_board(key):
+    return {ast.literal_eval(square): piece for square, piece in ast.literal_eval(key)}
+
+def squares_of(board, color):
+    return {square for square, piece in board.items() if piece[0] == color}
+
+# Bandos (True = vinotinto) a los que les podía tocar mover en `board` con esta acción.
+def possible_sides(board, action):
+    if action == "terminal":
+        vino_left = squares_of(board, VINO_PIECE)
+        player_left = squares_of(board, PLAYER_PIECE)
+        if not vino_left:
+            return [True]
+        if not player_left:
+            return [False]
+        return [True, False]
+    if action == "none":
+        sides = [vino_turn for vino_turn in (True, False)
+                 if not generate_moves(board, VINO_PIECE if vino_turn else PLAYER_PIECE)]
+        return sides or [True, False]
+    after = parse_board(action)
+    if squares_of(after, VINO_PIECE) - squares_of(board, VINO_PIECE):
+        return [True]
+    return [False]
+
+# Promedio de los valores que cayeron en cada (estado, acción).
+def average(values):
+    return {state: {action: sum(action_values) / len(action_values) for action, action_values in actions.items()}
+            for state, actions in values.items()}
+
+def migrate(old_table):
+    values = {}
+    for state_key, actions in old_table.items():
+        board = parse_board(state_key)
+        for action_key, value in actions.items():
+            for vino_turn in possible_sides(board, action_key):
+                state = get_state_representation(board, vino_turn)
+                if action_key == "terminal":
+                    action = TERMINAL_ACTION
+                elif action_key == "none":
+                    action = NO_MOVE_ACTION
+                else:
+                    action = get_state_representation(parse_board(action_key), not vino_turn)
+                values.setdefault(state, {}).setdefault(action, []).append(value)
+    return average(values)
+
+# Código canónico de un código de encode_position (los canónicos quedan igual).
+def canonical_code(code):
+    board, vino_turn = decode_pieces(code)
+    return get_state_representation(board, vino_turn)
+
+def canonicalize(table):
+    values = {}
+    for state, actions in table.items():
+        new_state = canonical_code(state)
+        for action, value in actions.items():
+            new_action = action if action < 0 else canonical_code(action)
+            values.setdefault(new_state, {}).setdefault(new_action, []).append(value)
+    return average(values)
+
+def main():
+    snapshot_file = nucleo.q_table_file
+    log_file = nucleo.q_table_store.log_file
+    with open(snapshot_file, "r") as f:
+        old_table = json.load(f)
+    # Cambios pendientes en el registro con el formato antiguo (las claves se pasan a
+    # texto, como las de la instantánea en JSON)
+    if os.path.exists(log_file):
+        with open(log_file, "r") as f:
+            for line in f:
+                try:
+                    state, action, value = json.loads(line)
+                except ValueError:
+                    continue
+                old_table.setdefault(str(state), {})[str(action)] = value
+    try:
+        int_table = {int(state): {int(action): value for action, value in actions.items()}
+                     for state, actions in old_table.items()}
+    except ValueError:
+        new_table = migrate(old_table)
+    else:
+        try:
+            nucleo.check_canonical(int_table)
+        except ValueError:
+            new_table = canonicalize(int_table)
+        else:
+            print(f"{snapshot_file} ya usa la forma canónica; no hay nada que migrar.")
+            return
+    shutil.copyfile(snapshot_file, snapshot_file + ".bak")
+    with open(snapshot_file, "w") as f:
+        json.dump(new_table, f)
+    open(log_file, "w").close()
+    old_entries = sum(len(actions) for actions in old_table.values())
+    new_entries = sum(len(actions) for actions in new_table.values())
+    print(f"Migradas {old_entries} entradas ({len(old_table)} estados) -> {new_entries} entradas ({len(new_table)} estados)")
+    print(f"Copia de la tabla original: {snapshot_file}.bak")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,621 @@
+# Núcleo del Q-Learning sin pygame: reglas del juego, recompensas, actualización de la
+# Q-table y simulación de partidas IA vs IA. Lo usan el entrenamiento sin ventana
+# (entrenar.py), la simulación con ventana (simulacion_partidas.py) y el juego
+# contra el humano (Damas_Q_Learning.py).
+import random
+import os
+import sys
+import atexit
+
+# El motor compartido está en la carpeta raíz del proyecto.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from almacen import QTableStore
+from motor import bitboard, instrumentacion
+from motor.bitboard import encode_canonical, encode_canonical_pieces, from_pieces
+from motor.geometria import CENTER_SQUARES, PIECE_JUMPS, PIECE_STEPS, PROMOTION_SQUARES, board_size, initial_pieces
+from motor.caracteristicas import CENTRAL, GRIS, PROTECTED, SUPPORTED, VINO, compute_features, make_move_features
+
+# Colores de las piezas
+VINO_PIECE = (128, 0, 32)             # Piezas vinotinto
+PLAYER_PIECE = (100, 100, 100)        # Piezas grises
+
+# Tamaño del tablero (board_size) y posición inicial: vienen de motor/geometria.py,
+# que lee DAMAS_TAMANO. Cada pieza se representa como (color, is_king)
+initial_board = initial_pieces()
+
+# Variables globales para el juego simulado
+# La simulación juega sobre bitboards: position es la lista [vino, gris, kings, key]
+# (ver motor/bitboard.py) y features su vector de características (ver
+# motor/caracteristicas.py), que se actualiza con cada jugada en lugar de recontarse.
+position = None  # Se inicializan en reset_game()
+features = None
+turn = None  # 'player' o 'vino'
+turn_counter = 0
+
+# Contadores de victorias
+gray_wins = 0
+vino_wins = 0
+
+# Parámetros de Q-Learning
+alpha = 0.5         # Tasa de aprendizaje
+gamma = 0.9         # Factor de descuento
+epsilon = 0.8       # Probabilidad de exploración (se podría decaer con el tiempo)
+# Cada tamaño de tablero tiene su propia Q-table (la del 4x4 conserva el nombre original)
+q_table_file = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            "qtable.json" if board_size == 4 else f"qtable_{board_size}x{board_size}.json")
+q_table = {}  # Se carga desde el archivo JSON
+# Guarda solo los cambios (ver almacen.py); se vuelca cada pocos segundos y al salir
+q_table_store = QTableStore(q_table_file)
+
+# Entrenamiento en paralelo
+num_workers = 1         # Procesos que simulan partidas (1 = modo secuencial)
+sync_interval = 200     # Partidas que juega cada proceso antes de sincronizar la Q-table
+_base_values = None     # En los trabajadores: valor original de cada (estado, acción) modificado
+
+# Q-table densa (ver tabla_densa.py). Si se asigna, ai_move elige con ella en lugar de
+# q_table y las transiciones se aplican juntas cada dense_batch_games partidas: una sola
+# actualización de NumPy por lote en lugar de una operación de Python por jugada.
+dense_table = None
+dense_batch_games = 32
+_transitions = []       # (estado, columna de la jugada, recompensa, estado siguiente)
+_batched_games = 0
+
+# Repetición de experiencias (ver repeticion.py). Si se asigna replay_buffer, cada
+# transición se guarda además en el búfer y, al terminar cada partida, se aplican
+# replay_batches minilotes de replay_batch_size transiciones sacadas de él. Con la
+# Q-table densa se guardan al aplicar el lote y se repiten tantos minilotes por partida
+# del lote, cada uno en una sola actualización de NumPy.
+replay_buffer = None
+replay_batches = 4
+replay_batch_size = 32
+
+# Acciones especiales de la Q-table (los códigos de posición son siempre >= 0)
+TERMINAL_ACTION = -1    # Fin de partida: recompensa final
+NO_MOVE_ACTION = -2     # El bando que mueve no tiene jugadas
+
+# Cargar los datos de partidas anteriores a q_table
+def load_q_table():
+    global q_table
+    q_table = q_table_store.load()
+    check_canonical(q_table)
+
+# Guardar en disco los cambios de q_table desde el último guardado
+def save_q_table():
+    q_table_store.flush(q_table)
+
+# Guardar solo si pasó el intervalo de guardado (para llamarlo después de cada jugada)
+def maybe_save_q_table():
+    q_table_store.maybe_flush(q_table)
+
+# Los cambios pendientes se guardan también al terminar el programa
+atexit.register(save_q_table)
+
+# Representa el estado del tablero como un entero: un dígito en base 5 por casilla
+# jugable más el bando que mueve (ver motor/bitboard.py). Las acciones se guardan como
+# el código de la posición resultante, con el turno ya pasado al rival.
+# Estados y acciones usan la forma canónica (bitboard.encode_canonical): una posición
+# con turno gris se guarda girada 180° y con los colores cambiados, como la misma
+# posición con turno vinotinto. Los dos bandos comparten así la Q-table y aprenden de
+# todas las jugadas. Como las acciones se calculan desde las jugadas reales, la elegida
+# ya es la jugada a hacer, sin tener que deshacer el giro.
+def get_state_representation(board, vino_turn):
+    return encode_canonical_pieces(board, vino_turn)
+
+# Una Q-table guardada antes de la forma canónica tiene códigos con turno gris (pares).
+def check_canonical(table):
+    for state, actions in table.items():
+        if not state & 1 or any(action >= 0 and not action & 1 for action in actions):
+            raise ValueError(f"{q_table_file} no usa la forma canónica de los estados; "
+                             "conviértala con: python Damas_Q_Learning/migrar_qtable.py")
+
+# Actualiza Q_table. Devuelve el error TD antes de actualizar. `weight` escala el
+# cambio (peso de importancia al repetir transiciones del búfer).
+def update_q_table(state, action, reward, next_state, weight=1.0):
+    global q_table
+    if state not in q_table:
+        q_table[state] = {}
+    if action not in q_table[state]:
+        q_table[state][action] = 0.0
+    if _base_values is not None and (state, action) not in _base_values:
+        _base_values[(state, action)] = q_table[state][action]
+    q_table_store.record(state, action)
+    next_max = 0.0
+    if next_state is not None and next_state in q_table and q_table[next_state]:
+        next_max = max(q_table[next_state].values())
+    error = reward + gamma * next_max - q_table[state][action]
+    q_table[state][action] = q_table[state][action] + alpha * weight * error
+    return error
+
+# Actualización de una jugada de la simulación: si hay búfer de repetición, la
+# transición se guarda además con su error como prioridad.
+def learn(state, action, reward, next_state):
+    error = update_q_table(state, action, reward, next_state)
+    if replay_buffer is not None:
+        replay_buffer.add(state, action, reward, -1 if next_state is None else next_state, error)
+
+# Aplica a la Q-table de diccionarios replay_batches minilotes del búfer de repetición.
+def replay_dict():
+    for _ in range(replay_batches):
+        indices, weights = replay_buffer.sample(replay_batch_size)
+        errors = [update_q_table(state, action, reward, next_state if next_state >= 0 else None, weight)
+                  for state, action, reward, next_state, weight in zip(replay_buffer.states[indices].tolist(),
+                                                                       replay_buffer.actions[indices].tolist(),
+                                                                       replay_buffer.rewards[indices].tolist(),
+                                                                       replay_buffer.next_states[indices].tolist(),
+                                                                       weights.tolist())]
+        replay_buffer.update_priorities(indices, errors)
+
+# Lo mismo con la Q-table densa, para las `games` partidas del lote recién aplicado.
+def replay_dense(games):
+    for _ in range(replay_batches):
+        indices, weights = replay_buffer.sample(replay_batch_size * games)
+        errors = dense_table.update_batch(replay_buffer.states[indices], replay_buffer.actions[indices],
+                                          replay_buffer.rewards[indices], replay_buffer.next_states[indices],
+                                          alpha, gamma, weights)
+        replay_buffer.update_priorities(indices, errors)
+
+# Llamadas a replay_buffer.sample que hacen `games` partidas de entrenamiento (para que
+# el beta de los pesos de importancia llegue a 1 al final del entrenamiento).
+def replay_samples(games):
+    if dense_table is None:
+        return replay_batches * games
+    return replay_batches * -(-games // dense_batch_games)
+
+# ------------------------------
+# Funciones para recompensas
+# ------------------------------
+
+# Cuenta las piezas
+def count_pieces(board, team):
+    return sum(1 for piece in board.values() if piece[0] == team)
+
+# cuenta si se promovio una pieza
+def count_promoted(board, team):
+    return sum(1 for piece in board.values() if piece[0] == team and piece[1] == True)
+
+# Recompensa si la ficha tiene una ficha aliada cerca y tambien si se coloca en una poscion donde la ficha de atras impide que pueda ser comida
+def support_reward(board, team):
+    reward = 0
+    for (row, col), piece in board.items():
+        if piece[0] == team:
+            for d_row, d_col in [(-1, -1), (-1, 1), (1, -1), (1, 1)]:
+                r = row + d_row
+                c = col + d_col
+                if (r, c) in board and board[(r, c)][0] == team:
+                    reward += 0.2
+                    break
+            if team == VINO_PIECE:
+                backward_dirs = [(-1, -1), (-1, 1)]
+            else:
+                backward_dirs = [(1, -1), (1, 1)]
+            for d_row, d_col in backward_dirs:
+                r = row + d_row
+                c = col + d_col
+                if 0 <= r < board_size and 0 <= c < board_size:
+                    if (r, c) in board and board[(r, c)][0] == team:
+                        reward += 1.5
+                        break
+    return reward
+
+# recompensa si hay una ficha en el medio
+def central_control_reward(board, team):
+    reward = 0
+    for (row, col), piece in board.items():
+        if piece[0] == team and (row, col) in CENTER_SQUARES:
+            reward += 0.1
+    return reward
+
+# recompensa si hay una ficha protegiendo
+def protection_reward(board, team):
+    reward = 0
+    if team == VINO_PIECE:
+        backward_dirs = [(-1, -1), (-1, 1)]
+    else:
+        backward_dirs = [(1, -1), (1, 1)]
+    for (row, col), piece in board.items():
+        if piece[0] == team:
+            for d_row, d_col in backward_dirs:
+                r = row + d_row
+                c = col + d_col
+                if 0 <= r < board_size and 0 <= c < board_size:
+                    if (r, c) in board and board[(r, c)][0] == team:
+                        reward += 0.5
+                        break
+    return reward
+
+# Recompensas por la posición de las fichas después de la jugada
+def position_reward(after, team, protection=True):
+    reward = support_reward(after, team) + central_control_reward(after, team)
+    if protection:
+        reward += protection_reward(after, team)
+    return reward
+
+# Diferentes recompensas y castigos si mueve una ficha, captura una ficha, promueve a dama y suma todo y lo retorna.
+# Los pesos por defecto son los del entrenamiento; el juego contra el humano usa los suyos
+# (promoción +3, penalización -0.1 y sin protection_reward).
+def compute_reward(before, after, team, promotion_bonus=1, idle_penalty=0.05, protection=True):
+    reward = 0
+    enemy = PLAYER_PIECE if team == VINO_PIECE else VINO_PIECE
+
+    own_before = count_pieces(before, team)
+    own_after = count_pieces(after, team)
+    enemy_before = count_pieces(before, enemy)
+    enemy_after = count_pieces(after, enemy)
+
+    if own_after < own_before:
+        reward -= 5 * (own_before - own_after)
+    if enemy_after < enemy_before:
+        reward += 5 * (enemy_before - enemy_after)
+
+    prom_before = count_promoted(before, team)
+    prom_after = count_promoted(after, team)
+    if prom_after > prom_before:
+        reward += promotion_bonus * (prom_after - prom_before)
+
+    if (enemy_after == enemy_before) and (prom_after == prom_before):
+        reward -= idle_penalty
+
+    reward += position_reward(after, team, protection)
+
+    return reward
+
+# Pesos de las características del bando que movió en la recompensa por posición:
+# support_reward da 0.2 por ficha acompañada y 1.5 por ficha protegida por detrás,
+# central_control_reward 0.1 por ficha central y protection_reward 0.5 más por ficha protegida.
+SUPPORTED_WEIGHT = 0.2
+PROTECTED_WEIGHT = 1.5
+CENTRAL_WEIGHT = 0.1
+PROTECTION_WEIGHT = 0.5
+
+# Parte de la recompensa que depende solo de la jugada de bitboards: 5 por cada ficha
+# rival capturada en la cadena y el bono si corona la propia.
+def move_bonus(move, promotion_bonus=1, idle_penalty=0.05):
+    reward = 0
+    if move[2]:
+        reward += 5 * move[2].bit_count()
+    if move[3]:
+        reward += promotion_bonus
+    if not move[2] and not move[3]:
+        reward -= idle_penalty
+    return reward
+
+# La misma recompensa que compute_reward para una jugada de bitboards ya hecha, leída del
+# vector de características en lugar de recorrer el tablero.
+def feature_reward(features, move, vino_turn, promotion_bonus=1, idle_penalty=0.05, protection=True):
+    reward = move_bonus(move, promotion_bonus, idle_penalty)
+    offset = VINO if vino_turn else GRIS
+    reward += SUPPORTED_WEIGHT * features[offset + SUPPORTED] + PROTECTED_WEIGHT * features[offset + PROTECTED]
+    reward += CENTRAL_WEIGHT * features[offset + CENTRAL]
+    if protection:
+        reward += PROTECTION_WEIGHT * features[offset + PROTECTED]
+    return reward
+
+# Recompensas por posición (sin move_bonus) de muchas jugadas a la vez, a partir de los
+# códigos de las posiciones resultantes (con el turno ya pasado al rival). Usa NumPy
+# (ver motor/evaluacion.py) y devuelve un arreglo con una recompensa por código.
+def batch_position_rewards(codes, protection=True):
+    from motor.evaluacion import batch_features, side_features, squares_from_codes
+    squares, vino_turn = squares_from_codes(codes)
+    # Movió el bando contrario al que tiene el turno
+    mover = side_features(batch_features(squares), ~vino_turn)
+    protected_weight = PROTECTED_WEIGHT + (PROTECTION_WEIGHT if protection else 0)
+    return (SUPPORTED_WEIGHT * mover[:, SUPPORTED] + protected_weight * mover[:, PROTECTED]
+            + CENTRAL_WEIGHT * mover[:, CENTRAL])
+
+# ------------------------------
+# Lógica del Juego y Q-Learning (Simulación de partidas AI vs AI)
+# ------------------------------
+
+# Resetea el juego
+def reset_game():
+    global position, features, turn, turn_counter
+    position = list(from_pieces(initial_board))
+    # Con la Q-table densa las recompensas por posición se calculan por lotes
+    features = compute_features(position) if dense_table is None else None
+    turn = 'player'
+    turn_counter = 0
+
+# Promueve fichas
+def promote_piece(row, piece):
+    color, is_king = piece
+    if not is_king:
+        if color == PLAYER_PIECE and row == 0:
+            return (color, True)
+        if color == VINO_PIECE and row == board_size - 1:
+            return (color, True)
+    return piece
+
+# Una jugada es la tupla (origen, destino, casillas capturadas, piezas capturadas, promueve);
+# las capturadas son tuplas vacías si no hay captura. Con make_move y unmake_move se
+# aplica y se deshace sobre el mismo tablero, sin copiarlo.
+def make_move(board, move):
+    origin, target, captured, _, promoted = move
+    piece = board.pop(origin)
+    for square in captured:
+        del board[square]
+    board[target] = (piece[0], True) if promoted else piece
+
+def unmake_move(board, move):
+    origin, target, captured, captured_pieces, promoted = move
+    piece = board.pop(target)
+    for square, captured_piece in zip(captured, captured_pieces):
+        board[square] = captured_piece
+    board[origin] = (piece[0], False) if promoted else piece
+
+# Capturas en cadena de la pieza de `square` que empiezan saltando `over` hasta `landing`,
+# con las mismas reglas que motor/bitboard.py: la pieza sigue saltando mientras pueda,
+# la cadena termina al coronar y las piezas saltadas se quitan en el momento (su casilla
+# queda libre). El tablero no se modifica: las saltadas se llevan en la tupla `captured`.
+# `seen` evita repetir cadenas que terminan igual con las mismas capturas.
+def _capture_chains(board, square, piece, over, landing, seen):
+    color, is_king = piece
+    promotion = PROMOTION_SQUARES[color]
+    jumps = PIECE_JUMPS[piece]
+    stack = [(landing, (over,))]
+    while stack:
+        current, captured = stack.pop()
+        if is_king or current not in promotion:
+            extended = False
+            for next_over, next_landing in jumps[current]:
+                enemy = board.get(next_over)
+                if enemy is None or enemy[0] == color or next_over in captured:
+                    continue
+                if next_landing in board and next_landing != square and next_landing not in captured:
+                    continue
+                extended = True
+                stack.append((next_landing, captured + (next_over,)))
+            if extended:
+                continue
+        result = (square, current, frozenset(captured))
+        if result in seen:
+            continue
+        seen.add(result)
+        yield (square, current, captured, tuple(board[c] for c in captured), not is_king and current in promotion)
+
+# Genera las jugadas del color una a una. Si hay alguna captura, solo se generan
+# capturas, cada una con su cadena completa (se buscan primero). No se debe modificar
+# el tablero mientras se recorre.
+def iter_moves(board, color):
+    found_capture = False
+    seen = set()
+    for square, piece in board.items():
+        if piece[0] != color:
+            continue
+        for over, landing in PIECE_JUMPS[piece][square]:
+            if landing not in board:
+                enemy = board.get(over)
+                if enemy is not None and enemy[0] != color:
+                    found_capture = True
+                    yield from _capture_chains(board, square, piece, over, landing, seen)
+    if found_capture:
+        return
+    promotion = PROMOTION_SQUARES[color]
+    for square, piece in board.items():
+        if piece[0] != color:
+            continue
+        for step in PIECE_STEPS[piece][square]:
+            if step not in board:
+                yield (square, step, (), (), not piece[1] and step in promotion)
+
+# Genera los tableros resultantes de cada jugada posible (una copia por jugada).
+# La simulación juega sobre bitboards (ver ai_move).
+def generate_moves(board, color):
+    moves = []
+    for move in iter_moves(board, color):
+        new_board = board.copy()
+        make_move(new_board, move)
+        moves.append(new_board)
+    return moves
+
+# Evalua si termina el juego (sobre la posición en bitboards)
+def game_over(position):
+    return not position[0] or not position[1]
+
+# Retorna si gano, perdio o empato
+def get_winner(position):
+    if not position[0]:
+        return "player"
+    elif not position[1]:
+        return "vino"
+    else:
+        return "draw"
+
+# Mueve las fichas de la IA. Las jugadas se prueban y se deshacen sobre `position` para
+# calcular el código de cada acción, y la elegida se aplica en la misma posición junto
+# con el vector de características, del que sale la recompensa.
+def ai_move(color):
+    global turn_counter
+    vino_turn = color == VINO_PIECE
+    state = encode_canonical(position, vino_turn)
+    actions = []
+    for move in bitboard.iter_moves(position, vino_turn):
+        bitboard.make_move(position, move, vino_turn)
+        actions.append((move, encode_canonical(position, not vino_turn)))
+        bitboard.unmake_move(position, move, vino_turn)
+    if not actions:
+        if dense_table is not None:
+            _transitions.append((state, NO_MOVE_ACTION, -1, -1))
+        else:
+            learn(state, NO_MOVE_ACTION, -1, None)
+        return None, state
+    if dense_table is not None:
+        return dense_ai_move(color, state, actions)
+    if random.random() < epsilon:
+        selected_move, selected_action = random.choice(actions)
+    else:
+        q_values = q_table.get(state, {})
+        best_value = -float('inf')
+        selected_move, selected_action = None, None
+        for move, action_rep in actions:
+            value = q_values.get(action_rep, 0.0)
+            if value > best_value:
+                best_value = value
+                selected_move, selected_action = move, action_rep
+        if selected_move is None:
+            selected_move, selected_action = random.choice(actions)
+    make_move_features(position, features, selected_move, vino_turn)
+    # El código de la acción es el del tablero resultante con el turno del rival
+    new_state = selected_action
+    reward = feature_reward(features, selected_move, vino_turn)
+    learn(state, selected_action, reward, new_state)
+    turn_counter += 1
+    return selected_action, state
+
+# Igual que ai_move pero con la Q-table densa: las jugadas se ordenan por código para
+# que cada una tenga su columna, y la transición se guarda para aplicarla con el lote.
+# Solo se guarda move_bonus: la recompensa por posición se suma en apply_dense_updates.
+def dense_ai_move(color, state, actions):
+    global turn_counter
+    vino_turn = color == VINO_PIECE
+    actions.sort(key=lambda action: action[1])
+    # El número de jugadas del estado se anota para el máximo del estado siguiente
+    dense_table.move_counts[state >> 1] = len(actions)
+    if random.random() < epsilon:
+        slot = random.randrange(len(actions))
+    else:
+        slot = int(dense_table.values[state >> 1, :len(actions)].argmax())
+    selected_move, selected_action = actions[slot]
+    bitboard.make_move(position, selected_move, vino_turn)
+    _transitions.append((state, slot, move_bonus(selected_move), selected_action))
+    turn_counter += 1
+    return selected_action, state
+
+# Aplica a la Q-table densa las transiciones acumuladas de las últimas partidas.
+def apply_dense_updates():
+    global _batched_games
+    if replay_buffer is None:
+        dense_table.update_episode(_transitions, alpha, gamma, batch_position_rewards)
+    elif _transitions:
+        arrays = dense_table.episode_arrays(_transitions, batch_position_rewards)
+        replay_buffer.add_batch(*arrays, dense_table.update_batch(*arrays, alpha, gamma))
+        replay_dense(_batched_games)
+    _transitions.clear()
+    _batched_games = 0
+
+# Acciones de la simulacion
+def simulate_game(record_moves=True):
+    global turn, turn_counter, gray_wins, vino_wins, _batched_games
+    reset_game()
+    turn = 'player'
+    turn_counter = 0
+    moves_log = []
+    max_turns = 100
+    while not game_over(position) and turn_counter < max_turns:
+        current_color = PLAYER_PIECE if turn == 'player' else VINO_PIECE
+        action, state_before = ai_move(current_color)
+        if record_moves:
+            moves_log.append({
+                "turn": turn,
+                "state_before": state_before,
+                "action": action,
+                "turn_counter": turn_counter
+            })
+        turn = 'vino' if turn == 'player' else 'player'
+    winner = get_winner(position)
+    if winner == "draw":
+        final_reward = 0
+    else:
+        final_reward = 20 if winner == ("player" if turn == "vino" else "vino") else -20
+        if winner == "player":
+            gray_wins += 1
+        elif winner == "vino":
+            vino_wins += 1
+    last_state = encode_canonical(position, turn == 'vino')
+    if dense_table is not None:
+        _transitions.append((last_state, TERMINAL_ACTION, final_reward, -1))
+        _batched_games += 1
+        if _batched_games >= dense_batch_games:
+            apply_dense_updates()
+    else:
+        learn(last_state, TERMINAL_ACTION, final_reward, None)
+        if replay_buffer is not None:
+            replay_dict()
+    return {"winner": winner, "turns": turn_counter, "moves": moves_log}
+
+# Funciones del entrenamiento que se miden con la instrumentación (ver
+# motor/instrumentacion.py). simulate_games escribe una línea cada 100 partidas.
+def instrument_training():
+    instrumentacion.instrument(bitboard, ["iter_moves", "make_move", "unmake_move"])
+    instrumentacion.instrument(sys.modules[__name__], ["encode_canonical", "make_move_features", "feature_reward", "game_over",
+                                                       "update_q_table", "save_q_table", "apply_dense_updates"], "nucleo")
+
+# Simula el juego entre las dos IA. Si se pasa `progress`, se llama cada 100 partidas
+# con (simuladas, total); así el front-end decide si dibuja, imprime o nada.
+def simulate_games(n, progress=None, record_moves=True):
+    games = []
+    for i in range(n):
+        game_record = simulate_game(record_moves=record_moves)
+        games.append(game_record)
+        if (i+1) % 100 == 0:
+            if instrumentacion.enabled:
+                instrumentacion.emit("training_batch", games=i+1, gray_wins=gray_wins, vino_wins=vino_wins)
+            if progress is not None:
+                progress(i+1, n)
+    if dense_table is not None:
+        apply_dense_updates()
+        dense_table.save()
+    else:
+        save_q_table()
+    return games
+
+# Trabajador del entrenamiento en paralelo: juega un lote de partidas sobre una copia
+# de la Q-table y devuelve cuánto cambió cada (estado, acción) junto con las victorias.
+def play_batch(task):
+    global q_table, gray_wins, vino_wins, _base_values
+    snapshot, games, seed = task
+    random.seed(seed)
+    q_table = snapshot
+    _base_values = {}
+    gray_wins = 0
+    vino_wins = 0
+    for _ in range(games):
+        simulate_game(record_moves=False)
+    deltas = {}
+    for (state, action), base in _base_values.items():
+        deltas[(state, action)] = q_table[state][action] - base
+    _base_values = None
+    # El trabajador no guarda en disco: sus cambios los guarda el proceso principal
+    q_table_store.dirty.clear()
+    return deltas, gray_wins, vino_wins
+
+# Simula las partidas repartidas entre varios procesos. En cada ronda, cada trabajador
+# juega hasta `sync` partidas con la Q-table actual; luego el proceso principal suma a la
+# tabla el promedio de los cambios de los trabajadores que tocaron cada entrada y vuelve
+# a repartir la tabla fusionada en la ronda siguiente.
+def simulate_games_parallel(n, workers, sync, progress=None):
+    import multiprocessing
+    global gray_wins, vino_wins
+    simulated = 0
+    seed = random.randrange(1 << 30)
+    with multiprocessing.Pool(workers) as pool:
+        while simulated < n:
+            tasks = []
+            remaining = n - simulated
+            for i in range(workers):
+                games = min(sync, remaining)
+                if games <= 0:
+                    break
+                remaining -= games
+                tasks.append((q_table, games, seed))
+                seed += 1
+            results = pool.map(play_batch, tasks)
+            totals = {}
+            counts = {}
+            for deltas, batch_gray_wins, batch_vino_wins in results:
+                gray_wins += batch_gray_wins
+                vino_wins += batch_vino_wins
+                for key, delta in deltas.items():
+                    totals[key] = totals.get(key, 0.0) + delta
+                    counts[key] = counts.get(key, 0) + 1
+            for (state, action), total in totals.items():
+                actions = q_table.setdefault(state, {})
+                actions[action] = actions.get(action, 0.0) + total / counts[(state, action)]
+                q_table_store.record(state, action)
+            simulated += sum(task[1] for task in tasks)
+            # Los trabajadores no se miden: la línea muestra la espera y la fusión
+            if instrumentacion.enabled:
+                instrumentacion.emit("training_batch", games=simulated, gray_wins=gray_wins, vino_wins=vino_wins)
+            if progress is not None:
+                progress(simulated, n)
+    save_q_table()
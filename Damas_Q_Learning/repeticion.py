@@ -0,0 +1,125 @@
+# Búfer de repetición de experiencias para el entrenamiento.
+#
+# Guarda las últimas `capacity` transiciones (estado, acción, recompensa, estado
+# siguiente) en arreglos de NumPy reservados al crearlo: al llenarse, cada transición
+# nueva ocupa el lugar de la más vieja (búfer circular), sin crear objetos por
+# transición. El estado siguiente es -1 si no hay; la acción es el código de la Q-table
+# de diccionarios o la columna de la Q-table densa, según quién lo use.
+#
+# sample saca minilotes de índices. Cada transición tiene como prioridad su último error
+# TD en valor absoluto (más PRIORITY_EPSILON, para que ninguna quede sin salir) y se
+# elige con probabilidad proporcional a prioridad ** priority_exponent: con 0 el
+# muestreo es uniforme y cuanto mayor, más se repiten las transiciones que la tabla
+# todavía predice mal. Después de aplicar un minilote, update_priorities guarda los
+# errores nuevos de esas transiciones.
+#
+# Muestrear por prioridad sesga la tabla hacia las transiciones con más error: salen
+# más veces que en la experiencia real. Para compensarlo, sample devuelve además el peso
+# de importancia de cada una, (N * P(i)) ** -beta dividido por el mayor del minilote,
+# y quien actualiza multiplica el cambio por él. beta empieza en importance_exponent y
+# crece linealmente hasta 1 (corrección completa) a lo largo de anneal_samples llamadas
+# a sample; con anneal_samples = 0 vale 1 desde el principio. Con muestreo uniforme
+# todos los pesos son 1.
+#
+# Las prioridades se guardan en un árbol de sumas dentro de un solo arreglo: la hoja de
+# la transición i está en leaves + i y cada nodo n guarda la suma de sus hijos 2n y
+# 2n + 1, así que la raíz (nodo 1) es la suma total. Muestrear y actualizar un minilote
+# baja o sube por los niveles del árbol con una operación de NumPy por nivel, sin
+# recorrer todo el búfer.
+import numpy as np
+
+from motor.bitboard import POSITION_CODES
+
+PRIORITY_EPSILON = 0.01
+
+# Los estados se guardan en int64, como en motor/evaluacion.py: caben hasta el tablero 6x6.
+if POSITION_CODES >= 1 << 63:
+    raise ValueError("Los códigos de posición de este tablero no caben en int64")
+
+class ReplayBuffer:
+    def __init__(self, capacity, priority_exponent=0.0, seed=None, importance_exponent=0.4, anneal_samples=0):
+        self.capacity = capacity
+        self.priority_exponent = priority_exponent
+        self.importance_exponent = importance_exponent
+        self.anneal_samples = anneal_samples
+        self.samples = 0        # Llamadas a sample hasta ahora
+        self.states = np.zeros(capacity, dtype=np.int64)
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity, dtype=np.float64)
+        self.next_states = np.zeros(capacity, dtype=np.int64)
+        self.depth = max(capacity - 1, 1).bit_length()
+        self.leaves = 1 << self.depth
+        self.tree = np.zeros(2 * self.leaves, dtype=np.float64)
+        self.size = 0
+        self.next_index = 0     # Próxima posición a escribir
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return self.size
+
+    def add(self, state, action, reward, next_state, error):
+        i = self.next_index
+        self.states[i] = state
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.next_states[i] = next_state
+        if self.priority_exponent:
+            node = self.leaves + i
+            tree = self.tree
+            tree[node] = (abs(error) + PRIORITY_EPSILON) ** self.priority_exponent
+            for _ in range(self.depth):
+                node >>= 1
+                tree[node] = tree[2 * node] + tree[2 * node + 1]
+        self.next_index = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    # Igual que add para arreglos de transiciones (por ejemplo, las de un lote de la
+    # Q-table densa). Si hay más que la capacidad, solo se guardan las últimas.
+    def add_batch(self, states, actions, rewards, next_states, errors):
+        count = min(len(states), self.capacity)
+        indices = (self.next_index + np.arange(count)) % self.capacity
+        self.states[indices] = states[-count:]
+        self.actions[indices] = actions[-count:]
+        self.rewards[indices] = rewards[-count:]
+        self.next_states[indices] = next_states[-count:]
+        self.update_priorities(indices, errors[-count:])
+        self.next_index = (self.next_index + count) % self.capacity
+        self.size = min(self.size + count, self.capacity)
+
+    # beta actual de los pesos de importancia.
+    def importance_beta(self):
+        if not self.anneal_samples:
+            return 1.0
+        progress = min(self.samples / self.anneal_samples, 1.0)
+        return self.importance_exponent + (1.0 - self.importance_exponent) * progress
+
+    # Índices de un minilote de `batch_size` transiciones (con reemplazo) y sus pesos de
+    # importancia.
+    def sample(self, batch_size):
+        if not self.priority_exponent:
+            return self.rng.integers(0, self.size, batch_size), np.ones(batch_size)
+        beta = self.importance_beta()
+        self.samples += 1
+        tree = self.tree
+        targets = self.rng.random(batch_size) * tree[1]
+        nodes = np.ones(batch_size, dtype=np.int64)
+        for _ in range(self.depth):
+            nodes <<= 1
+            left = tree[nodes]
+            right = targets >= left
+            targets -= np.where(right, left, 0.0)
+            nodes += right
+        # Por redondeo, un objetivo justo en el total podría caer en una hoja vacía
+        indices = np.minimum(nodes - self.leaves, self.size - 1)
+        weights = (self.size * tree[indices + self.leaves] / tree[1]) ** -beta
+        return indices, weights / weights.max()
+
+    def update_priorities(self, indices, errors):
+        if not self.priority_exponent:
+            return
+        tree = self.tree
+        nodes = np.asarray(indices) + self.leaves
+        tree[nodes] = (np.abs(errors) + PRIORITY_EPSILON) ** self.priority_exponent
+        for _ in range(self.depth):
+            nodes = np.unique(nodes >> 1)
+            tree[nodes] = tree[2 * nodes] + tree[2 * nodes + 1]
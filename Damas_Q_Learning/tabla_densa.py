@@ -0,0 +1,151 @@
+# Q-table densa sobre NumPy.
+#
+# Los estados son los códigos enteros de get_state_representation (menores que
+# POSITION_CODES), así que la tabla es una matriz float32 con una fila por estado. Como
+# esos códigos están en forma canónica, siempre con turno vinotinto (impares), la fila
+# de un estado es state >> 1 y la tabla tiene la mitad de filas que códigos.
+# Cada fila tiene una columna por jugada, en el orden de los códigos de las posiciones
+# resultantes (de menor a mayor), y dos columnas más para TERMINAL_ACTION y
+# NO_MOVE_ACTION. move_counts guarda cuántas jugadas tiene cada estado visto, para
+# que el máximo del estado siguiente solo mire columnas válidas.
+#
+# La matriz se crea con np.zeros, así que el sistema solo reserva memoria para las
+# páginas que se tocan; guardada como .npy se puede abrir con mmap y pasa lo mismo.
+#
+# A diferencia de la tabla de diccionarios, las actualizaciones TD se aplican por lotes
+# de partidas completas (update_episode): los objetivos se calculan con los valores del
+# inicio del lote y, si un mismo (estado, jugada) aparece varias veces, se suma el
+# promedio de sus cambios, igual que al fusionar los trabajadores en paralelo.
+import os
+
+import numpy as np
+
+import nucleo
+from motor.bitboard import POSITION_CODES, decode_pieces
+from motor.geometria import board_size
+
+# Una fila por código de posición solo cabe en memoria para el tablero 4x4.
+if board_size != 4:
+    raise ValueError(f"La Q-table densa solo existe para el tablero 4x4 (DAMAS_TAMANO={board_size})")
+
+# Máximo de jugadas de una posición 4x4: dos damas por bando con cuatro pasos cada una.
+MAX_MOVES = 8
+TERMINAL_SLOT = MAX_MOVES
+NO_MOVE_SLOT = MAX_MOVES + 1
+SLOTS = MAX_MOVES + 2
+ROWS = POSITION_CODES // 2
+
+dense_table_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "qtable_densa.npy")
+
+def _counts_file(values_file):
+    return os.path.splitext(values_file)[0] + "_jugadas.npy"
+
+# Columna de una acción de la Q-table de diccionarios (-1 si ya no es una jugada legal).
+def action_slot(action, action_codes):
+    if action == nucleo.TERMINAL_ACTION:
+        return TERMINAL_SLOT
+    if action == nucleo.NO_MOVE_ACTION:
+        return NO_MOVE_SLOT
+    if action in action_codes:
+        return action_codes.index(action)
+    return -1
+
+# Códigos ordenados de las posiciones a las que se puede llegar desde un estado.
+def sorted_action_codes(state):
+    board, vino_turn = decode_pieces(state)
+    color = nucleo.VINO_PIECE if vino_turn else nucleo.PLAYER_PIECE
+    return sorted(nucleo.get_state_representation(move, not vino_turn)
+                  for move in nucleo.generate_moves(board, color))
+
+class DenseQTable:
+    def __init__(self, values_file=dense_table_file, values=None, move_counts=None):
+        if values is None:
+            values = np.zeros((ROWS, SLOTS), dtype=np.float32)
+        if move_counts is None:
+            move_counts = np.zeros(ROWS, dtype=np.uint8)
+        if len(values) != ROWS:
+            raise ValueError(f"{values_file} tiene {len(values)} filas en lugar de {ROWS}: es de antes de la "
+                             "forma canónica de los estados; bórrelo para crearlo de nuevo desde qtable.json")
+        self.values_file = values_file
+        self.values = values
+        self.move_counts = move_counts
+
+    # Abre una tabla guardada. Con mmap los cambios se escriben directamente en el archivo.
+    @classmethod
+    def load(cls, values_file=dense_table_file, mmap=True):
+        mode = "r+" if mmap else None
+        return cls(values_file, np.load(values_file, mmap_mode=mode), np.load(_counts_file(values_file), mmap_mode=mode))
+
+    # Construye la tabla densa a partir de la Q-table de diccionarios (por ejemplo, la
+    # cargada de qtable.json). Devuelve la tabla y las entradas que no se pudieron pasar.
+    @classmethod
+    def from_dict(cls, q_table, values_file=dense_table_file):
+        table = cls(values_file)
+        skipped = 0
+        for state, actions in q_table.items():
+            action_codes = sorted_action_codes(state)
+            table.move_counts[state >> 1] = len(action_codes)
+            for action, value in actions.items():
+                slot = action_slot(action, action_codes)
+                if slot < 0:
+                    skipped += 1
+                    continue
+                table.values[state >> 1, slot] = value
+        return table, skipped
+
+    # Escribe los dos .npy (si la tabla está mapeada, basta con volcar los cambios).
+    def save(self):
+        if isinstance(self.values, np.memmap):
+            self.values.flush()
+            self.move_counts.flush()
+            return
+        for array, path in ((self.values, self.values_file), (self.move_counts, _counts_file(self.values_file))):
+            temp_file = path + ".tmp.npy"
+            np.save(temp_file, array)
+            os.replace(temp_file, path)
+
+    # Actualización TD de una o varias partidas enteras. `transitions` es una lista de
+    # (estado, columna, recompensa, estado siguiente): la columna es el índice de la jugada
+    # o TERMINAL_ACTION / NO_MOVE_ACTION, y el estado siguiente es -1 si no hay.
+    # Si se pasa next_rewards, a las transiciones con estado siguiente se les suma lo que
+    # devuelve para el arreglo de esos estados (por ejemplo, nucleo.batch_position_rewards).
+    def update_episode(self, transitions, alpha, gamma, next_rewards=None):
+        if not transitions:
+            return
+        self.update_batch(*self.episode_arrays(transitions, next_rewards), alpha, gamma)
+
+    # Las transiciones de update_episode como cuatro arreglos, con las acciones especiales
+    # ya pasadas a sus columnas y la recompensa completa.
+    def episode_arrays(self, transitions, next_rewards=None):
+        states, slots, rewards, next_states = (np.array(column) for column in zip(*transitions))
+        slots = np.where(slots == nucleo.TERMINAL_ACTION, TERMINAL_SLOT,
+                         np.where(slots == nucleo.NO_MOVE_ACTION, NO_MOVE_SLOT, slots))
+        rewards = rewards.astype(np.float64)
+        if next_rewards is not None:
+            has_next = next_states >= 0
+            rewards[has_next] += next_rewards(next_states[has_next])
+        return states, slots, rewards, next_states
+
+    # Actualización TD de arreglos de transiciones (columnas ya resueltas). Devuelve el
+    # error TD de cada una antes de actualizar (para las prioridades de repeticion.py).
+    # `weights` escala el cambio de cada transición (pesos de importancia del búfer).
+    def update_batch(self, states, slots, rewards, next_states, alpha, gamma, weights=None):
+        rows = states >> 1
+        has_next = next_states >= 0
+        next_rows = np.where(has_next, next_states >> 1, 0)
+        next_counts = self.move_counts[next_rows]
+        valid = np.arange(MAX_MOVES) < next_counts[:, None]
+        next_values = np.where(valid, self.values[next_rows, :MAX_MOVES], -np.inf).max(axis=1)
+        next_max = np.where(has_next & (next_counts > 0), next_values, 0.0)
+        targets = rewards + gamma * next_max
+        errors = targets - self.values[rows, slots]
+        # Las entradas repetidas en el lote reciben el promedio de sus cambios.
+        flat = rows.astype(np.int64) * SLOTS + slots
+        unique, inverse = np.unique(flat, return_inverse=True)
+        weighted = errors if weights is None else errors * weights
+        mean_deltas = alpha * np.bincount(inverse, weights=weighted) / np.bincount(inverse)
+        self.values[unique // SLOTS, unique % SLOTS] += mean_deltas.astype(np.float32)
+        return errors
+
+    def entries(self):
+        return int(np.count_nonzero(self.values))
@@ -0,0 +1,111 @@
+# Capturas en cadena: perft en el tablero 8x8 (el 4x4 no tiene espacio para dos saltos
+# seguidos, así que perft.py no las ve).
+#
+# Desde la posición inicial los conteos son los publicados para las damas inglesas, que
+# usan las mismas reglas: captura obligatoria, cadenas completas, peones que solo
+# saltan hacia adelante y cadena que termina al coronar. Las demás posiciones están
+# preparadas para que haya cadenas largas, ramificadas, que coronan o que dan la vuelta
+# y se repiten. Con --comprobar recorre además el árbol de cada posición con el
+# generador de diccionarios de nucleo.py, escrito aparte, y verifica que los dos dan las
+# mismas posiciones.
+#
+#   python benchmarks/capturas.py
+#   python benchmarks/capturas.py --perft 9 --comprobar 5
+#
+# Termina con código 1 si algún conteo o comprobación falla.
+import argparse
+import os
+import sys
+import time
+
+# Las posiciones y los conteos son del tablero 8x8; geometria lee el tamaño al importar.
+os.environ["DAMAS_TAMANO"] = "8"
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "Damas_Q_Learning"))
+
+import nucleo
+from benchmarks.perft import perft
+from motor.bitboard import PLAYER_PIECE, VINO_PIECE, _generate_moves, from_pieces, to_pieces
+from motor.geometria import initial_pieces
+
+V = (VINO_PIECE, False)
+VK = (VINO_PIECE, True)
+G = (PLAYER_PIECE, False)
+GK = (PLAYER_PIECE, True)
+
+# (nombre, piezas, juegan_vinotinto, hojas de perft a profundidad 1, 2, ...)
+CHAIN_POSITIONS = [
+    ("inicial", initial_pieces(), True,
+     [7, 49, 302, 1469, 7361, 36768, 179740, 845931, 3963680]),
+    # Un peón gris salta dos veces seguidas
+    ("doble_salto", {(6, 0): G, (5, 1): V, (3, 3): V, (0, 6): V}, False,
+     [1, 2, 3, 2, 4, 8, 16, 24]),
+    # Tres cadenas de dos saltos; dos terminan en la misma casilla con capturas distintas
+    ("ramificada", {(6, 2): G, (5, 1): V, (5, 3): V, (3, 1): V, (3, 3): V, (3, 5): V}, False,
+     [3, 18, 36, 184, 339, 1770, 3204, 16883]),
+    # El peón corona con la primera captura y ahí termina, aunque una dama seguiría
+    ("corona_y_para", {(2, 2): G, (1, 3): V, (1, 5): V, (7, 7): V}, False,
+     [1, 2, 4, 8, 32, 56, 168, 336]),
+    # La dama da la vuelta completa y vuelve a su casilla: las dos direcciones son la misma jugada
+    ("dama_circular", {(2, 2): VK, (3, 3): G, (3, 5): G, (1, 5): G, (1, 3): G, (7, 1): G}, True,
+     [1, 2, 8, 12, 48, 87, 234, 341]),
+    # Damas de los dos bandos con cadenas en varias direcciones
+    ("damas_cruzadas", {(4, 4): GK, (3, 3): VK, (3, 5): V, (5, 3): V, (1, 1): V, (1, 5): V,
+                        (5, 5): GK, (6, 2): G, (7, 1): G}, False,
+     [2, 12, 13, 43, 235, 874, 5914, 20849]),
+]
+
+# Recorre el árbol con el generador de diccionarios de nucleo.py y guarda los hijos de
+# cada nodo ordenados (los dos generadores los dan en distinto orden).
+def dict_tree(pieces, vino_turn, depth, nodes):
+    children = sorted(sorted(child.items()) for child in
+                      nucleo.generate_moves(pieces, VINO_PIECE if vino_turn else PLAYER_PIECE))
+    nodes.append(children)
+    if depth > 1:
+        for child in children:
+            dict_tree(dict(child), not vino_turn, depth - 1, nodes)
+
+# El mismo recorrido con el generador de bitboards.
+def bitboard_tree(pieces, vino_turn, depth, nodes):
+    children = sorted(sorted(to_pieces(child).items()) for child in _generate_moves(from_pieces(pieces), vino_turn))
+    nodes.append(children)
+    if depth > 1:
+        for child in children:
+            bitboard_tree(dict(child), not vino_turn, depth - 1, nodes)
+
+def main():
+    parser = argparse.ArgumentParser(description="Perft de las capturas en cadena en el tablero 8x8.")
+    parser.add_argument("--perft", type=int, default=8, help="Profundidad máxima de perft")
+    parser.add_argument("--comprobar", type=int, default=0,
+                        help="Profundidad de la comprobación contra el generador de nucleo.py (0 = no)")
+    args = parser.parse_args()
+    ok = True
+    print(f"{'posicion':<16}{'prof':>5}{'hojas':>10}{'esperado':>10}{'llamadas/s':>12}  ok")
+    for name, pieces, vino_turn, counts in CHAIN_POSITIONS:
+        depth = min(args.perft, len(counts))
+        counter = [0]
+        start = time.perf_counter()
+        leaves = perft(from_pieces(pieces), vino_turn, depth, counter)
+        elapsed = time.perf_counter() - start
+        same = leaves == counts[depth - 1]
+        ok = ok and same
+        print(f"{name:<16}{depth:>5}{leaves:>10}{counts[depth - 1]:>10}{counter[0] / elapsed:>12.0f}"
+              f"  {'si' if same else 'NO'}")
+    if args.comprobar:
+        print()
+        print(f"Generador de nucleo.py hasta profundidad {args.comprobar}")
+        for name, pieces, vino_turn, _ in CHAIN_POSITIONS:
+            expected = []
+            bitboard_tree(pieces, vino_turn, args.comprobar, expected)
+            nodes = []
+            dict_tree(pieces, vino_turn, args.comprobar, nodes)
+            same = nodes == expected
+            ok = ok and same
+            print(f"  {name:<16}{len(nodes):>8} nodos  {'iguales' if same else 'DISTINTOS'}")
+    if not ok:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
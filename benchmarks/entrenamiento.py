@@ -0,0 +1,139 @@
+# Benchmark reproducible del entrenamiento por autojuego (sin ventana ni pygame).
+#
+# Entrena un número fijo de partidas con una semilla fija y una Q-table vacía en una
+# carpeta temporal, y mide partidas/s y actualizaciones de la Q-table por segundo.
+# Luego repite las mismas partidas (misma semilla, mismos resultados) midiendo cuánto
+# tiempo se va en generar las jugadas (iter_moves), hacerlas y deshacerlas, codificar
+# los estados (encode_canonical), la jugada elegida con sus características, la
+# recompensa, game_over, la actualización de la Q-table y el guardado; esa segunda
+# pasada es algo más lenta por la propia medición, así que las velocidades salen de la primera.
+#
+#   python benchmarks/entrenamiento.py --partidas 5000 --semilla 1
+#   python benchmarks/entrenamiento.py --densa --json entrenamiento.json
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "Damas_Q_Learning"))
+
+import nucleo
+from almacen import QTableStore
+from motor import instrumentacion
+
+# Memoria aproximada de la Q-table de diccionarios (claves, valores y diccionarios).
+def dict_table_bytes(q_table):
+    total = sys.getsizeof(q_table)
+    for state, actions in q_table.items():
+        total += sys.getsizeof(state) + sys.getsizeof(actions)
+        for action, value in actions.items():
+            total += sys.getsizeof(action) + sys.getsizeof(value)
+    return total
+
+# Deja a nucleo con una Q-table vacía que se guarda en `folder`.
+def fresh_tables(folder, dense):
+    nucleo.q_table_store = QTableStore(os.path.join(folder, "qtable.json"))
+    nucleo.q_table = {}
+    nucleo.dense_table = None
+    nucleo.gray_wins = nucleo.vino_wins = 0
+    if dense:
+        import tabla_densa
+        dense_file = os.path.join(folder, "qtable_densa.npy")
+        tabla_densa.DenseQTable(dense_file).save()
+        nucleo.dense_table = tabla_densa.DenseQTable.load(dense_file)
+
+def table_size(folder):
+    if nucleo.dense_table is not None:
+        return {
+            "entries": nucleo.dense_table.entries(),
+            "states": int((nucleo.dense_table.move_counts > 0).sum()),
+            "memory_bytes": nucleo.dense_table.values.nbytes + nucleo.dense_table.move_counts.nbytes,
+        }
+    disk = 0
+    for name in ("qtable.json", "qtable.log"):
+        path = os.path.join(folder, name)
+        if os.path.exists(path):
+            disk += os.path.getsize(path)
+    return {
+        "entries": sum(len(actions) for actions in nucleo.q_table.values()),
+        "states": len(nucleo.q_table),
+        "memory_bytes": dict_table_bytes(nucleo.q_table),
+        "disk_bytes": disk,
+    }
+
+def run(games, seed, dense):
+    with tempfile.TemporaryDirectory() as folder:
+        fresh_tables(folder, dense)
+        random.seed(seed)
+        start = time.perf_counter()
+        records = nucleo.simulate_games(games, record_moves=True)
+        elapsed = time.perf_counter() - start
+        updates = sum(len(record["moves"]) + 1 for record in records)
+        result = {
+            "table": "densa" if dense else "dict",
+            "games": games,
+            "seed": seed,
+            "seconds": elapsed,
+            "games_per_sec": games / elapsed,
+            "updates": updates,
+            "updates_per_sec": updates / elapsed,
+            "gray_wins": nucleo.gray_wins,
+            "vino_wins": nucleo.vino_wins,
+            "q_table": table_size(folder),
+        }
+
+        fresh_tables(folder, dense)
+        # Las mismas funciones que mide entrenar.py --medir, más el guardado de la tabla densa.
+        # Las recompensas por posición de la tabla densa se calculan dentro de apply_dense_updates.
+        nucleo.instrument_training()
+        if nucleo.dense_table is not None:
+            instrumentacion.instrument(nucleo.dense_table, ["save"], "dense_table")
+        instrumentacion.reset()
+        random.seed(seed)
+        start = time.perf_counter()
+        try:
+            nucleo.simulate_games(games, record_moves=True)
+        finally:
+            instrumentacion.restore()
+        profiled = time.perf_counter() - start
+        timings = {label: seconds for label, seconds in instrumentacion.timings.items() if instrumentacion.calls[label]}
+        timings["resto"] = profiled - sum(timings.values())
+        result["profiled_seconds"] = profiled
+        result["time_split"] = timings
+        result["reproducible"] = (nucleo.gray_wins, nucleo.vino_wins) == (result["gray_wins"], result["vino_wins"])
+        nucleo.dense_table = None
+    return result
+
+def print_result(result):
+    size = result["q_table"]
+    print(f"Tabla {result['table']}, {result['games']} partidas, semilla {result['seed']}")
+    print(f"  {result['games_per_sec']:.0f} partidas/s, {result['updates_per_sec']:.0f} actualizaciones/s "
+          f"({result['updates']} actualizaciones en {result['seconds']:.2f} s)")
+    print(f"  Victorias grises: {result['gray_wins']} | Victorias Vinotinto: {result['vino_wins']}"
+          f"{'' if result['reproducible'] else '  (¡la segunda pasada dio otro resultado!)'}")
+    print(f"  Q-table: {size['states']} estados, {size['entries']} entradas, {size['memory_bytes'] / 1024:.0f} KB en memoria"
+          + (f", {size['disk_bytes'] / 1024:.0f} KB en disco" if "disk_bytes" in size else ""))
+    print(f"  Reparto del tiempo ({result['profiled_seconds']:.2f} s con medición):")
+    for name, seconds in sorted(result["time_split"].items(), key=lambda item: -item[1]):
+        print(f"    {name:<26}{seconds:>8.3f} s {seconds / result['profiled_seconds']:>7.1%}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Velocidad del entrenamiento por autojuego, sin ventana.")
+    parser.add_argument("--partidas", type=int, default=5000, help="Número de partidas")
+    parser.add_argument("--semilla", type=int, default=1, help="Semilla de random")
+    parser.add_argument("--densa", action="store_true", help="Usar la Q-table densa de NumPy")
+    parser.add_argument("--json", help="Guardar los resultados en este archivo")
+    args = parser.parse_args()
+    result = run(args.partidas, args.semilla, args.densa)
+    print_result(result)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=1)
+
+if __name__ == "__main__":
+    main()
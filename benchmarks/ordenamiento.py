@@ -0,0 +1,41 @@
+# Compara los nodos visitados por minimax a profundidad fija con y sin el
+# ordenamiento de jugadas (capturas/promociones, jugada TT, killers, historia).
+#
+#   python benchmarks/ordenamiento.py [profundidad]
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.posiciones import BENCHMARK_POSITIONS
+from motor import busqueda
+from motor.bitboard import from_pieces
+
+def count_nodes(position, vino_turn, depth, ordering):
+    busqueda.MOVE_ORDERING = ordering
+    busqueda.transposition_table.clear()
+    busqueda.clear_heuristics()
+    busqueda.reset_stats()
+    # Se recorren las profundidades como en la profundización iterativa para que
+    # la tabla de transposición y las heurísticas tengan información previa.
+    best_move = None
+    for current_depth in range(1, depth + 1):
+        best_move, _ = busqueda.search_root(position, current_depth, vino_turn, best_move)
+    return busqueda.nodes_searched, busqueda.cutoffs
+
+def main():
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+    total_without = total_with = 0
+    print(f"{'posicion':<22}{'sin orden':>12}{'con orden':>12}{'reduccion':>11}")
+    for name, pieces, vino_turn in BENCHMARK_POSITIONS:
+        position = from_pieces(pieces)
+        nodes_without, _ = count_nodes(position, vino_turn, depth, False)
+        nodes_with, _ = count_nodes(position, vino_turn, depth, True)
+        total_without += nodes_without
+        total_with += nodes_with
+        print(f"{name:<22}{nodes_without:>12}{nodes_with:>12}{1 - nodes_with / nodes_without:>10.1%}")
+    print(f"{'total':<22}{total_without:>12}{total_with:>12}{1 - total_with / total_without:>10.1%}")
+    busqueda.MOVE_ORDERING = True
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# Búsqueda en paralelo de la raíz contra la secuencial con el mismo tiempo por jugada.
+#
+# Para cada número de procesos busca cada posición de posiciones.py con el presupuesto
+# indicado e informa la profundidad alcanzada y los nodos/s de todos los procesos juntos.
+# Con --determinista comprueba además que la búsqueda determinista a profundidad fija da
+# la misma jugada y evaluación con cualquier número de procesos.
+#
+#   python benchmarks/paralela.py --procesos 1 2 4 --tiempo 300
+#   python benchmarks/paralela.py --procesos 1 2 4 --determinista --profundidad 14
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.posiciones import BENCHMARK_POSITIONS
+from motor import busqueda, busqueda_paralela
+from motor.bitboard import from_pieces
+
+def run_timed(workers, time_budget_ms):
+    print(f"{workers} proceso(s), {time_budget_ms} ms por jugada")
+    print(f"  {'posicion':<22}{'prof':>5}{'nodos':>10}{'nodos/s':>10}")
+    for name, pieces, vino_turn in BENCHMARK_POSITIONS:
+        busqueda.transposition_table.clear()
+        busqueda.clear_heuristics()
+        start = time.perf_counter()
+        _, _, depth = busqueda_paralela.iterative_deepening(from_pieces(pieces), vino_turn, time_budget_ms,
+                                                            workers=workers)
+        elapsed = time.perf_counter() - start
+        nodes = busqueda_paralela.nodes_searched
+        print(f"  {name:<22}{depth:>5}{nodes:>10}{nodes / elapsed:>10.0f}")
+
+def check_deterministic(worker_counts, depth):
+    print(f"Búsqueda determinista a profundidad {depth}")
+    ok = True
+    for name, pieces, vino_turn in BENCHMARK_POSITIONS:
+        results = [busqueda_paralela.iterative_deepening(from_pieces(pieces), vino_turn, None, depth, workers, True)
+                   for workers in worker_counts]
+        same = all(result == results[0] for result in results)
+        ok = ok and same
+        print(f"  {name:<22}{str(results[0][1]):>6}  {'igual' if same else 'DISTINTA'}")
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description="Búsqueda en paralelo de la raíz contra la secuencial.")
+    parser.add_argument("--procesos", type=int, nargs="+", default=[1, 2, 4], help="Números de procesos a probar")
+    parser.add_argument("--tiempo", type=int, default=300, help="Milisegundos por jugada")
+    parser.add_argument("--determinista", action="store_true", help="Comprobar la búsqueda determinista")
+    parser.add_argument("--profundidad", type=int, default=14, help="Profundidad de la búsqueda determinista")
+    args = parser.parse_args()
+    try:
+        if args.determinista:
+            if not check_deterministic(args.procesos, args.profundidad):
+                sys.exit(1)
+            return
+        for workers in args.procesos:
+            run_timed(workers, args.tiempo)
+    finally:
+        busqueda_paralela.close_pool()
+
+if __name__ == "__main__":
+    main()
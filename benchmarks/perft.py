@@ -0,0 +1,218 @@
+# Benchmark de correctitud y velocidad del motor.
+#
+# perft: cuenta las hojas del árbol de jugadas hasta la profundidad indicada desde cada
+# posición de posiciones.py y las compara con los valores de perft_referencia.json.
+# Usa el generador sin la caché de jugadas, para medir el generador y no la caché; con
+# --hacer-deshacer recorre el árbol con iter_moves, make_move y unmake_move sobre una
+# sola posición mutable.
+#
+# busqueda: minimax a profundidad fija (profundización iterativa desde cero, con la
+# tabla de transposición y las heurísticas vacías). Informa nodos, nodos/s, cortes,
+# aciertos de la tabla de transposición y memoria máxima (medida con tracemalloc en
+# una segunda pasada, para que no afecte a los tiempos). Con --lotes las hojas se
+# evalúan por lotes con NumPy (ver motor/evaluacion.py y busqueda.batch_evaluate).
+#
+# Cada medición se repite --repeticiones veces y se guarda el mejor tiempo, que es el
+# menos afectado por otros procesos de la máquina.
+#
+#   python benchmarks/perft.py                        # perft a 18 y búsqueda a 30
+#   python benchmarks/perft.py --json resultados.json # además guarda los resultados
+#   python benchmarks/perft.py --comparar anterior.json
+#   python benchmarks/perft.py --actualizar           # reescribe perft_referencia.json
+#
+# Termina con código 1 si algún perft no coincide con la referencia.
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.ordenamiento import count_nodes
+from benchmarks.posiciones import BENCHMARK_POSITIONS
+from motor import bitboard, busqueda
+from motor.bitboard import from_pieces
+
+REFERENCE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "perft_referencia.json")
+PERFT_DEPTH = 18
+SEARCH_DEPTH = 30
+
+# Hojas a `depth` jugadas. `counter` acumula las llamadas al generador.
+def perft(position, vino_turn, depth, counter):
+    moves = bitboard._generate_moves(position, vino_turn)
+    counter[0] += 1
+    if depth == 1:
+        return len(moves)
+    return sum(perft(move, not vino_turn, depth - 1, counter) for move in moves)
+
+# El mismo recuento haciendo y deshaciendo jugadas sobre una lista [vino, gris, kings, key].
+def perft_make_unmake(position, vino_turn, depth, counter):
+    counter[0] += 1
+    if depth == 1:
+        return sum(1 for _ in bitboard.iter_moves(position, vino_turn))
+    leaves = 0
+    for move in bitboard.iter_moves(position, vino_turn):
+        bitboard.make_move(position, move, vino_turn)
+        leaves += perft_make_unmake(position, not vino_turn, depth - 1, counter)
+        bitboard.unmake_move(position, move, vino_turn)
+    return leaves
+
+# Conteos de perft a profundidad 1..depth (para la referencia).
+def perft_counts(position, vino_turn, depth):
+    return [perft(position, vino_turn, current, [0]) for current in range(1, depth + 1)]
+
+def load_reference():
+    if not os.path.exists(REFERENCE_FILE):
+        return {}
+    with open(REFERENCE_FILE, "r") as f:
+        return json.load(f)
+
+def write_reference(depth):
+    reference = {}
+    for name, pieces, vino_turn in BENCHMARK_POSITIONS:
+        reference[name] = perft_counts(from_pieces(pieces), vino_turn, depth)
+    # Una línea por posición, para que los cambios se lean bien en el diff
+    lines = [f" {json.dumps(name)}: {json.dumps(counts)}" for name, counts in reference.items()]
+    with open(REFERENCE_FILE, "w") as f:
+        f.write("{\n" + ",\n".join(lines) + "\n}\n")
+    print(f"Referencia de perft hasta profundidad {depth} escrita en {REFERENCE_FILE}")
+
+def run_perft(depth, reference, repeats, make_unmake):
+    results = []
+    for name, pieces, vino_turn in BENCHMARK_POSITIONS:
+        elapsed = float("inf")
+        for _ in range(repeats):
+            counter = [0]
+            start = time.perf_counter()
+            if make_unmake:
+                leaves = perft_make_unmake(list(from_pieces(pieces)), vino_turn, depth, counter)
+            else:
+                leaves = perft(from_pieces(pieces), vino_turn, depth, counter)
+            elapsed = min(elapsed, time.perf_counter() - start)
+        counts = reference.get(name, [])
+        expected = counts[depth - 1] if depth <= len(counts) else None
+        results.append({
+            "name": name,
+            "depth": depth,
+            "generator": "make_unmake" if make_unmake else "tuples",
+            "leaves": leaves,
+            "expected": expected,
+            "ok": expected is None or leaves == expected,
+            "generator_calls": counter[0],
+            "seconds": elapsed,
+            "calls_per_sec": counter[0] / elapsed if elapsed else 0.0,
+        })
+    return results
+
+def run_search(depth, repeats, batch_leaves=False):
+    if batch_leaves:
+        from motor import evaluacion
+        busqueda.batch_evaluate = evaluacion.evaluate_positions
+    results = []
+    for name, pieces, vino_turn in BENCHMARK_POSITIONS:
+        position = from_pieces(pieces)
+        elapsed = float("inf")
+        for _ in range(repeats):
+            # La caché de jugadas se vacía para que cada pasada empiece igual.
+            bitboard._move_cache.clear()
+            start = time.perf_counter()
+            nodes, cutoffs = count_nodes(position, vino_turn, depth, True)
+            elapsed = min(elapsed, time.perf_counter() - start)
+        hit_rate = busqueda.transposition_table.stats()["hit_rate"]
+        bitboard._move_cache.clear()
+        tracemalloc.start()
+        count_nodes(position, vino_turn, depth, True)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results.append({
+            "name": name,
+            "depth": depth,
+            "nodes": nodes,
+            "cutoffs": cutoffs,
+            "seconds": elapsed,
+            "nodes_per_sec": nodes / elapsed if elapsed else 0.0,
+            "tt_hit_rate": hit_rate,
+            "peak_kb": peak / 1024,
+            "batch_leaves": batch_leaves,
+        })
+    busqueda.batch_evaluate = None
+    return results
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+def print_results(perft_results, search_results):
+    print(f"{'perft':<22}{'prof':>5}{'hojas':>10}{'esperado':>10}{'llamadas/s':>12}  ok")
+    for result in perft_results:
+        expected = "-" if result["expected"] is None else result["expected"]
+        print(f"{result['name']:<22}{result['depth']:>5}{result['leaves']:>10}{expected:>10}"
+              f"{result['calls_per_sec']:>12.0f}  {'si' if result['ok'] else 'NO'}")
+    print()
+    print(f"{'busqueda':<22}{'prof':>5}{'nodos':>10}{'cortes':>9}{'nodos/s':>10}{'TT':>7}{'pico KB':>9}")
+    for result in search_results:
+        print(f"{result['name']:<22}{result['depth']:>5}{result['nodes']:>10}{result['cutoffs']:>9}"
+              f"{result['nodes_per_sec']:>10.0f}{result['tt_hit_rate']:>7.1%}{result['peak_kb']:>9.0f}")
+
+# Compara con un JSON anterior: cambios de velocidad y cualquier cambio en el número de nodos.
+def print_comparison(report, previous):
+    print()
+    print(f"Comparación con {previous.get('commit') or 'resultado anterior'}:")
+    compared = 0
+    for section, speed_key, count_key in (("perft", "calls_per_sec", "leaves"), ("search", "nodes_per_sec", "nodes")):
+        old_results = {(result["name"], result["depth"], result.get("generator")): result
+                       for result in previous.get(section, [])}
+        for result in report[section]:
+            old = old_results.get((result["name"], result["depth"], result.get("generator")))
+            if old is None:
+                continue
+            compared += 1
+            change = result[speed_key] / old[speed_key] - 1 if old[speed_key] else 0.0
+            note = "" if result[count_key] == old[count_key] else f"  {count_key}: {old[count_key]} -> {result[count_key]}"
+            print(f"  {section:<7}{result['name']:<22}{change:>+8.1%}{note}")
+    if not compared:
+        print("  Sin resultados comparables (¿otras profundidades?)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Perft y búsqueda a profundidad fija del motor.")
+    parser.add_argument("--perft", type=int, default=PERFT_DEPTH, help="Profundidad de perft")
+    parser.add_argument("--profundidad", type=int, default=SEARCH_DEPTH, help="Profundidad de la búsqueda minimax")
+    parser.add_argument("--hacer-deshacer", action="store_true", help="Perft con make_move/unmake_move en lugar de tuplas")
+    parser.add_argument("--lotes", action="store_true", help="Evaluar las hojas de la búsqueda por lotes con NumPy")
+    parser.add_argument("--repeticiones", type=int, default=3, help="Pasadas por medición (se guarda la más rápida)")
+    parser.add_argument("--json", help="Guardar los resultados en este archivo")
+    parser.add_argument("--comparar", help="JSON de una ejecución anterior para comparar")
+    parser.add_argument("--actualizar", action="store_true", help="Reescribir perft_referencia.json hasta --perft")
+    args = parser.parse_args()
+
+    if args.actualizar:
+        write_reference(args.perft)
+        return
+    perft_results = run_perft(args.perft, load_reference(), args.repeticiones, args.hacer_deshacer)
+    search_results = run_search(args.profundidad, args.repeticiones, args.lotes)
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "perft": perft_results,
+        "search": search_results,
+    }
+    print_results(perft_results, search_results)
+    if args.comparar:
+        with open(args.comparar, "r") as f:
+            print_comparison(report, json.load(f))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=1)
+    if not all(result["ok"] for result in perft_results):
+        print("ERROR: perft no coincide con la referencia")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# Ponderación (motor/ponderacion.py): aciertos y espera de la IA con y sin ponderar.
+#
+# Juega partidas de la IA (vinotinto, profundización iterativa con --tiempo ms por
+# jugada) contra un jugador simulado que piensa --humano ms antes de cada jugada y
+# elige la que le deja mejor material a un ply (desempates al azar con semilla fija).
+# Mientras el jugador "piensa" (time.sleep suelta el GIL), la ponderación busca en su
+# hilo. Se mide la espera de la IA: desde la jugada del jugador hasta tener la
+# respuesta, que en un acierto es solo tomarla de la caché.
+#
+# En el 4x4 la tabla de finales responde casi todo al instante, así que por defecto se
+# juega en el 8x8 (DAMAS_TAMANO cambia el tamaño).
+#
+#   python benchmarks/ponderacion.py
+#   DAMAS_TAMANO=6 python benchmarks/ponderacion.py --partidas 4 --humano 1500
+import argparse
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("DAMAS_TAMANO", "8")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motor import busqueda
+from motor.bitboard import evaluate_board, from_pieces, generate_moves
+from motor.geometria import board_size, initial_pieces
+from motor.ponderacion import Ponderer
+from motor.tablas_finales import MAX_TURNS, best_move as tablebase_move, open_tablebase
+
+def make_search(time_budget_ms):
+    def search(position, turn_number):
+        best_move = tablebase_move(position, True, MAX_TURNS - turn_number)
+        if best_move is not None:
+            return best_move, "TF"
+        best_move, _, depth = busqueda.iterative_deepening(position, True, time_budget_ms)
+        return best_move, depth
+    return search
+
+# Jugada del jugador simulado: la de menor evaluación (a favor de las grises) a un ply.
+def human_move(position, rng):
+    moves = generate_moves(position, False)
+    if not moves:
+        return None
+    best = min(evaluate_board(move) for move in moves)
+    return rng.choice([move for move in moves if evaluate_board(move) == best])
+
+# Devuelve la espera de cada jugada de la IA y el ponderador (None si no se pondera).
+def play(args, ponder):
+    search = make_search(args.tiempo)
+    ponderer = Ponderer(search) if ponder else None
+    rng = random.Random(args.semilla)
+    waits = []
+    busqueda.transposition_table.clear()
+    busqueda.clear_heuristics()
+    for _ in range(args.partidas):
+        position = from_pieces(initial_pieces())
+        for turn_number in range(1, MAX_TURNS, 2):
+            time.sleep(args.humano / 1000)
+            position = human_move(position, rng)
+            if position is None or not position[0]:
+                break
+            start = time.perf_counter()
+            answer = ponderer.take(position) if ponderer is not None else None
+            if answer is None:
+                busqueda.clear_stop()
+                answer = search(position, turn_number)
+            waits.append(time.perf_counter() - start)
+            position = answer[0]
+            if position is None or not position[1]:
+                break
+            if ponderer is not None:
+                ponderer.start(position, turn_number + 1)
+        if ponderer is not None:
+            ponderer.stop()
+    if ponderer is not None:
+        ponderer.cancel()
+    return waits, ponderer
+
+def main():
+    parser = argparse.ArgumentParser(description="Aciertos y espera de la IA con y sin ponderación.")
+    parser.add_argument("--partidas", type=int, default=3, help="Partidas por modo")
+    parser.add_argument("--tiempo", type=int, default=300, help="Milisegundos de búsqueda por jugada de la IA")
+    parser.add_argument("--humano", type=int, default=2000, help="Milisegundos que piensa el jugador simulado")
+    parser.add_argument("--semilla", type=int, default=1, help="Semilla del jugador simulado")
+    args = parser.parse_args()
+    open_tablebase()
+    print(f"Tablero {board_size}x{board_size}, {args.partidas} partidas, IA {args.tiempo} ms, jugador {args.humano} ms")
+    print(f"{'':<14}{'jugadas':>8}{'aciertos':>10}{'espera media':>14}{'espera total':>14}")
+    for ponder in (False, True):
+        waits, ponderer = play(args, ponder)
+        hits = f"{ponderer.hits}/{ponderer.hits + ponderer.misses}" if ponderer is not None else "-"
+        print(f"{'ponderando' if ponder else 'sin ponderar':<14}{len(waits):>8}{hits:>10}"
+              f"{sum(waits) / len(waits) * 1000:>11.0f} ms{sum(waits):>12.1f} s")
+        if ponderer is not None:
+            print(f"  {ponderer.summary()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+# Posiciones de prueba para los benchmarks del motor, en el mismo formato que
+# el diccionario `pieces` de los juegos: {(row, col): (color, is_king)}.
+# Cada entrada es (nombre, piezas, juegan_vinotinto).
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motor.bitboard import PLAYER_PIECE, VINO_PIECE
+
+V = (VINO_PIECE, False)
+VK = (VINO_PIECE, True)
+G = (PLAYER_PIECE, False)
+GK = (PLAYER_PIECE, True)
+
+INITIAL_PIECES = {(0, 0): V, (0, 2): V, (3, 1): G, (3, 3): G}
+
+BENCHMARK_POSITIONS = [
+    ("inicial_vino", INITIAL_PIECES, True),
+    ("inicial_gris", INITIAL_PIECES, False),
+    ("medio_juego", {(0, 0): V, (1, 1): V, (2, 2): G, (3, 3): G}, True),
+    ("dama_contra_peones", {(0, 0): GK, (0, 2): GK, (1, 3): V, (3, 1): VK}, True),
+    ("damas_2v2", {(0, 0): GK, (2, 2): VK, (3, 1): GK, (3, 3): VK}, True),
+    ("damas_2v2_cruzadas", {(0, 0): VK, (1, 1): GK, (2, 0): VK, (3, 3): GK}, True),
+    ("damas_2v1", {(0, 0): GK, (1, 3): VK, (2, 0): GK}, True),
+    ("final_1v1", {(0, 0): VK, (1, 3): GK}, False),
+    ("mixto_2v2", {(0, 0): V, (2, 0): VK, (2, 2): GK, (3, 3): GK}, False),
+]
@@ -0,0 +1,117 @@
+# Repetición de experiencias: partidas y tiempo de entrenamiento hasta ganarle a un
+# rival fijo.
+#
+# Cada configuración entrena desde una Q-table vacía (carpeta temporal, semilla fija)
+# en bloques de --bloque partidas de autojuego. Después de cada bloque, la política
+# voraz de la tabla (sin exploración ni actualizaciones) juega --evaluacion partidas
+# contra un rival que elige jugadas al azar con su propia semilla, la mitad con cada
+# color. Se informa cuántas partidas y segundos de entrenamiento (sin contar la
+# evaluación) hicieron falta para llegar a --objetivo victorias.
+#
+#   python benchmarks/repeticion.py
+#   python benchmarks/repeticion.py --densa --objetivo 0.5 --semilla 2
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "Damas_Q_Learning"))
+
+import nucleo
+from benchmarks.entrenamiento import fresh_tables
+from motor import bitboard
+from motor.bitboard import encode_canonical, from_pieces
+from repeticion import ReplayBuffer
+
+# (nombre, capacidad del búfer o 0 sin repetición, exponente de prioridad)
+CONFIGURATIONS = [
+    ("sin repeticion", 0, 0.0),
+    ("uniforme", 50000, 0.0),
+    ("prioridad 0.6", 50000, 0.6),
+]
+
+# Jugada voraz de la Q-table actual (de diccionarios o densa) sin modificarla.
+def greedy_move(position, vino_turn):
+    state = encode_canonical(position, vino_turn)
+    actions = []
+    for move in bitboard.iter_moves(position, vino_turn):
+        bitboard.make_move(position, move, vino_turn)
+        actions.append((encode_canonical(position, not vino_turn), move))
+        bitboard.unmake_move(position, move, vino_turn)
+    if not actions:
+        return None
+    if nucleo.dense_table is not None:
+        actions.sort(key=lambda action: action[0])
+        return actions[int(nucleo.dense_table.values[state >> 1, :len(actions)].argmax())][1]
+    q_values = nucleo.q_table.get(state, {})
+    return max(actions, key=lambda action: q_values.get(action[0], 0.0))[1]
+
+# Proporción de partidas que gana la política voraz contra jugadas al azar.
+def win_rate(games, seed):
+    rng = random.Random(seed)
+    wins = 0
+    for game in range(games):
+        learner_vino = game % 2 == 0
+        position = list(from_pieces(nucleo.initial_board))
+        vino_turn = False
+        for _ in range(100):
+            if not position[0] or not position[1]:
+                break
+            if vino_turn == learner_vino:
+                move = greedy_move(position, vino_turn)
+            else:
+                moves = list(bitboard.iter_moves(position, vino_turn))
+                move = rng.choice(moves) if moves else None
+            if move is not None:
+                bitboard.make_move(position, move, vino_turn)
+            vino_turn = not vino_turn
+        learner, rival = (0, 1) if learner_vino else (1, 0)
+        if position[learner] and not position[rival]:
+            wins += 1
+    return wins / games
+
+def run(name, capacity, priority_exponent, args, folder):
+    fresh_tables(folder, args.densa)
+    # beta de los pesos de importancia llega a 1 en --maximo partidas
+    nucleo.replay_buffer = (ReplayBuffer(capacity, priority_exponent, seed=args.semilla,
+                                         anneal_samples=nucleo.replay_samples(args.maximo))
+                            if capacity else None)
+    random.seed(args.semilla)
+    games = 0
+    training = 0.0
+    # La tabla vacía no se evalúa: elige siempre la primera jugada y eso ya gana a veces
+    rate = 0.0
+    while rate < args.objetivo and games < args.maximo:
+        start = time.perf_counter()
+        nucleo.simulate_games(args.bloque, record_moves=False)
+        training += time.perf_counter() - start
+        games += args.bloque
+        rate = win_rate(args.evaluacion, args.semilla)
+    reached = rate >= args.objetivo
+    nucleo.replay_buffer = None
+    nucleo.dense_table = None
+    print(f"{name:<16}{games if reached else '-':>10}{training if reached else float('nan'):>10.2f}"
+          f"{rate:>10.1%}{training / max(games, 1) * 1000:>12.3f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Partidas y tiempo hasta ganarle a un rival al azar, con y sin repetición.")
+    parser.add_argument("--objetivo", type=float, default=0.4, help="Proporción de victorias a alcanzar")
+    parser.add_argument("--bloque", type=int, default=100, help="Partidas de entrenamiento entre evaluaciones")
+    parser.add_argument("--evaluacion", type=int, default=400, help="Partidas de cada evaluación")
+    parser.add_argument("--maximo", type=int, default=10000, help="Máximo de partidas de entrenamiento")
+    parser.add_argument("--semilla", type=int, default=1, help="Semilla de random y del búfer")
+    parser.add_argument("--densa", action="store_true", help="Usar la Q-table densa de NumPy")
+    args = parser.parse_args()
+    print(f"Tabla {'densa' if args.densa else 'dict'}, objetivo {args.objetivo:.0%} contra jugadas al azar "
+          f"({args.evaluacion} partidas por evaluación, cada {args.bloque} de entrenamiento)")
+    print(f"{'':<16}{'partidas':>10}{'segundos':>10}{'final':>10}{'ms/partida':>12}")
+    with tempfile.TemporaryDirectory() as folder:
+        for name, capacity, priority_exponent in CONFIGURATIONS:
+            run(name, capacity, priority_exponent, args, folder)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# Compara la Q-table de diccionarios con la Q-table densa de NumPy (tabla_densa.py):
+# partidas y actualizaciones por segundo entrenando desde cero con la misma semilla,
+# memoria máxima del proceso (RSS) y el costo de solo las actualizaciones TD,
+# aplicando las mismas transiciones grabadas a las dos tablas (la densa por lotes de
+# nucleo.dense_batch_games partidas, como en el entrenamiento).
+# Cada tabla se mide en un proceso aparte para que el RSS de una no afecte a la otra.
+# Nada se guarda en Damas_Q_Learning: las tablas se escriben en una carpeta temporal.
+#
+#   python benchmarks/tabla_q.py [partidas]
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "Damas_Q_Learning"))
+
+import nucleo
+import tabla_densa
+from almacen import QTableStore
+from benchmarks.entrenamiento import dict_table_bytes
+
+SEED = 12345
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+# Entrena `games` partidas con una tabla vacía y devuelve las métricas como texto.
+def train(mode, games, folder):
+    random.seed(SEED)
+    nucleo.q_table_store = QTableStore(os.path.join(folder, "qtable.json"))
+    nucleo.q_table = {}
+    if mode == "densa":
+        # Igual que entrenar.py --densa: la tabla se abre mapeada desde el .npy
+        dense_file = os.path.join(folder, "qtable_densa.npy")
+        tabla_densa.DenseQTable(dense_file).save()
+        nucleo.dense_table = tabla_densa.DenseQTable.load(dense_file)
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+    records = nucleo.simulate_games(games, record_moves=True)
+    elapsed = time.perf_counter() - start
+    rss_after = peak_rss_mb()
+    updates = sum(len(record["moves"]) + 1 for record in records)
+    if mode == "densa":
+        entries = nucleo.dense_table.entries()
+        table_mb = nucleo.dense_table.values.nbytes / 2 ** 20
+    else:
+        entries = sum(len(actions) for actions in nucleo.q_table.values())
+        table_mb = dict_table_bytes(nucleo.q_table) / 2 ** 20
+    return (f"{mode:<8}{games / elapsed:>10.0f}{updates / elapsed:>12.0f}{entries:>10}"
+            f"{table_mb:>12.2f}{rss_before:>10.1f}{rss_after:>10.1f}")
+
+# Graba las transiciones de `games` partidas y mide solo el tiempo de aplicarlas:
+# paso a paso con update_q_table o por lotes con DenseQTable.update_episode.
+def updates_only(games, folder):
+    random.seed(SEED)
+    nucleo.q_table_store = QTableStore(os.path.join(folder, "qtable.json"))
+    recorder = tabla_densa.DenseQTable(os.path.join(folder, "grabacion.npy"))
+    batches = []
+
+    # Se graban las transiciones con la recompensa completa (move_bonus más la de posición)
+    def record(transitions, alpha, gamma, next_rewards=None):
+        next_codes = [transition[3] for transition in transitions if transition[3] >= 0]
+        extra = iter(next_rewards(next_codes).tolist() if next_rewards is not None and next_codes else [])
+        batches.append([(state, slot, reward + next(extra) if next_state >= 0 else reward, next_state)
+                        for state, slot, reward, next_state in transitions])
+    recorder.update_episode = record
+    nucleo.dense_table = recorder
+    nucleo.simulate_games(games, record_moves=False)
+    nucleo.dense_table = None
+    transitions = sum(len(batch) for batch in batches)
+
+    nucleo.q_table = {}
+    start = time.perf_counter()
+    for batch in batches:
+        for state, slot, reward, next_state in batch:
+            nucleo.update_q_table(state, slot, reward, next_state if next_state >= 0 else None)
+    dict_elapsed = time.perf_counter() - start
+
+    dense = tabla_densa.DenseQTable(os.path.join(folder, "qtable_densa.npy"))
+    dense.move_counts[:] = recorder.move_counts
+    start = time.perf_counter()
+    for batch in batches:
+        dense.update_episode(batch, nucleo.alpha, nucleo.gamma)
+    dense_elapsed = time.perf_counter() - start
+    return (f"solo actualizaciones TD ({transitions} transiciones de {games} partidas):\n"
+            f"  diccionarios: {transitions / dict_elapsed:>10.0f} actualizaciones/s\n"
+            f"  densa:        {transitions / dense_elapsed:>10.0f} actualizaciones/s")
+
+def main():
+    if len(sys.argv) > 2:
+        with tempfile.TemporaryDirectory() as folder:
+            if sys.argv[1] == "actualizaciones":
+                print(updates_only(int(sys.argv[2]), folder))
+            else:
+                print(train(sys.argv[1], int(sys.argv[2]), folder))
+            nucleo.save_q_table()
+        return
+    games = sys.argv[1] if len(sys.argv) > 1 else "5000"
+    print(f"{'tabla':<8}{'partidas/s':>10}{'act./s':>12}{'entradas':>10}{'tabla MB':>12}{'RSS ini':>10}{'RSS max':>10}")
+    for mode in ("dict", "densa"):
+        subprocess.run([sys.executable, os.path.abspath(__file__), mode, games], check=True)
+    subprocess.run([sys.executable, os.path.abspath(__file__), "actualizaciones", games], check=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# Velocidad del motor según el tamaño del tablero (ver DAMAS_TAMANO en motor/geometria.py).
+#
+# Como las tablas del tablero se calculan al importar, cada tamaño se mide en un proceso
+# aparte con su DAMAS_TAMANO. Desde la posición inicial de cada tamaño informa:
+#   perft     hojas y llamadas al generador por segundo hasta --perft
+#   busqueda  profundidad alcanzada, nodos y nodos/s de la profundización iterativa con
+#             --tiempo milisegundos (tabla de transposición y heurísticas vacías)
+#
+#   python benchmarks/tamanos.py
+#   python benchmarks/tamanos.py --tamanos 4 8 --perft 6 --tiempo 1000
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.perft import perft
+from motor import busqueda
+from motor.bitboard import from_pieces
+from motor.geometria import BITS, board_size, initial_pieces
+
+# Mide el tamaño de este proceso y devuelve la fila de la tabla.
+def measure(perft_depth, time_budget_ms):
+    position = from_pieces(initial_pieces())
+    counter = [0]
+    start = time.perf_counter()
+    leaves = perft(position, True, perft_depth, counter)
+    perft_elapsed = time.perf_counter() - start
+
+    busqueda.transposition_table.clear()
+    busqueda.clear_heuristics()
+    busqueda.reset_stats()
+    start = time.perf_counter()
+    _, _, depth = busqueda.iterative_deepening(position, True, time_budget_ms)
+    search_elapsed = time.perf_counter() - start
+    nodes = busqueda.nodes_searched
+    board = f"{board_size}x{board_size}"
+    return (f"{board:<8}{len(BITS):>8}{leaves:>12}{counter[0] / perft_elapsed:>12.0f}"
+            f"{depth:>6}{nodes:>10}{nodes / search_elapsed:>10.0f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Velocidad del motor según el tamaño del tablero.")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[4, 6, 8, 10], help="Tamaños a medir")
+    parser.add_argument("--perft", type=int, default=6, help="Profundidad del perft")
+    parser.add_argument("--tiempo", type=int, default=1000, help="Milisegundos de búsqueda")
+    parser.add_argument("--medir", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.medir:
+        print(measure(args.perft, args.tiempo))
+        return
+    print(f"perft a {args.perft}, búsqueda de {args.tiempo} ms desde la posición inicial")
+    print(f"{'tablero':<8}{'casillas':>8}{'hojas':>12}{'gen./s':>12}{'prof':>6}{'nodos':>10}{'nodos/s':>10}")
+    for size in args.tamanos:
+        env = dict(os.environ, DAMAS_TAMANO=str(size))
+        subprocess.run([sys.executable, os.path.abspath(__file__), "--medir",
+                        "--perft", str(args.perft), "--tiempo", str(args.tiempo)], env=env, check=True)
+
+if __name__ == "__main__":
+    main()
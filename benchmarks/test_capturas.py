@@ -0,0 +1,92 @@
+# Capturas en cadena con resultados fijos, como comprobación junto a los conteos de
+# perft (perft_referencia.json y capturas.py): cada caso da las piezas, el bando que
+# mueve y el tablero exacto que debe quedar tras cada jugada legal, calculados a mano.
+# Se comprueban los dos generadores (bitboards y diccionarios de nucleo.py) y, en el de
+# bitboards, que la clave Zobrist actualizada jugada a jugada sea la de las piezas finales.
+#
+#   python -m pytest benchmarks/test_capturas.py
+#   python benchmarks/test_capturas.py        (sin pytest; termina con código 1 si falla)
+import os
+import sys
+
+# Los casos son del tablero 8x8; geometria lee el tamaño al importar.
+os.environ["DAMAS_TAMANO"] = "8"
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "Damas_Q_Learning"))
+
+import nucleo
+from motor.bitboard import PLAYER_PIECE, VINO_PIECE, _generate_moves, from_pieces, hash_pieces, to_pieces
+from motor.geometria import board_size
+
+V = (VINO_PIECE, False)
+VK = (VINO_PIECE, True)
+G = (PLAYER_PIECE, False)
+GK = (PLAYER_PIECE, True)
+
+# (piezas, juegan_vinotinto, tableros resultantes). Las vinotinto avanzan hacia la fila
+# mayor y las grises hacia la menor; la captura es obligatoria y la cadena sigue
+# mientras haya saltos.
+CASES = {
+    # (6,0) salta (5,1) a (4,2) y sin parar (3,3) a (2,4): quedarse en (4,2) no es legal
+    "doble_salto_obligatorio": (
+        {(6, 0): G, (5, 1): V, (3, 3): V, (0, 6): V}, False,
+        [{(2, 4): G, (0, 6): V}]),
+    # Tres cadenas de dos saltos; dos terminan en (2,2) con capturas distintas y las tres
+    # son jugadas distintas
+    "cadena_ramificada": (
+        {(6, 2): G, (5, 1): V, (5, 3): V, (3, 1): V, (3, 3): V, (3, 5): V}, False,
+        [{(2, 2): G, (5, 3): V, (3, 3): V, (3, 5): V},
+         {(2, 2): G, (5, 1): V, (3, 1): V, (3, 5): V},
+         {(2, 6): G, (5, 1): V, (3, 1): V, (3, 3): V}]),
+    # La dama gris salta hacia adelante y luego hacia atrás: (2,2) -> (4,4) -> (6,2)
+    "cadena_de_dama": (
+        {(2, 2): GK, (3, 3): V, (5, 3): V, (0, 0): V}, False,
+        [{(6, 2): GK, (0, 0): V}]),
+    # El peón corona con la primera captura y la cadena termina aunque una dama podría
+    # seguir saltando (1,5)
+    "corona_y_para": (
+        {(2, 2): G, (1, 3): V, (1, 5): V, (7, 7): V}, False,
+        [{(0, 4): GK, (1, 5): V, (7, 7): V}]),
+    # La dama vinotinto da la vuelta y vuelve a (2,2). Ahí podría saltar otra vez (3,3)
+    # si una pieza capturada se pudiera saltar de nuevo; no se puede, así que la cadena
+    # termina con las cuatro capturas, y los dos sentidos de la vuelta son la misma jugada
+    "sin_repetir_capturada": (
+        {(2, 2): VK, (3, 3): G, (3, 5): G, (1, 5): G, (1, 3): G, (7, 1): G}, True,
+        [{(2, 2): VK, (7, 1): G}]),
+}
+
+def _describe(boards):
+    return sorted(sorted(board.items()) for board in boards)
+
+def _check(name, generated):
+    pieces, _, expected = CASES[name]
+    assert _describe(generated) == _describe(expected), (
+        f"{name}: desde {sorted(pieces.items())}\n"
+        f"  se esperaban {_describe(expected)}\n  se generaron {_describe(generated)}")
+
+def test_board_size():
+    assert board_size == 8, f"Los casos son del 8x8 y el motor se importó con DAMAS_TAMANO={board_size}"
+
+def test_bitboard_chains():
+    for name, (pieces, vino_turn, _) in CASES.items():
+        moves = _generate_moves(from_pieces(pieces), vino_turn)
+        _check(name, [to_pieces(move) for move in moves])
+        for move in moves:
+            assert move[3] == hash_pieces(*move[:3]), f"{name}: clave Zobrist incorrecta tras la cadena"
+
+def test_dict_chains():
+    for name, (pieces, vino_turn, _) in CASES.items():
+        _check(name, nucleo.generate_moves(dict(pieces), VINO_PIECE if vino_turn else PLAYER_PIECE))
+
+if __name__ == "__main__":
+    failed = 0
+    for test in (test_board_size, test_bitboard_chains, test_dict_chains):
+        try:
+            test()
+            print(f"{test.__name__}: bien")
+        except AssertionError as error:
+            failed += 1
+            print(f"{test.__name__}: FALLA\n{error}")
+    sys.exit(1 if failed else 0)
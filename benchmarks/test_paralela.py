@@ -0,0 +1,54 @@
+# La búsqueda en paralelo respeta el tiempo por jugada: las hijas de la raíz que esperan
+# en la cola del pool comparten el mismo instante límite y no empiezan con un
+# presupuesto nuevo cada una (así una iteración tardaba hijas / procesos veces el
+# presupuesto).
+#
+#   python -m pytest benchmarks/test_paralela.py
+#   python benchmarks/test_paralela.py        (sin pytest; termina con código 1 si falla)
+import os
+import sys
+import time
+
+# La apertura del 8x8 tiene hijas suficientes para llenar la cola; geometria lee el
+# tamaño al importar.
+os.environ["DAMAS_TAMANO"] = "8"
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from motor import busqueda_paralela
+from motor.bitboard import from_pieces
+from motor.geometria import board_size, initial_pieces
+
+# Cuánto se pasa depende de en qué punto de una iteración se acaba el tiempo, así que se
+# prueban varios presupuestos seguidos (con el error se pasaban de 1.3 a 3 veces)
+BUDGETS_MS = (100, 150, 200, 250, 300)
+WORKERS = 2
+# Margen para la última consulta del reloj y para recoger los resultados del pool
+TOLERANCE = 1.25
+
+def test_parallel_budget():
+    assert board_size == 8, f"La prueba es del 8x8 y el motor se importó con DAMAS_TAMANO={board_size}"
+    position = from_pieces(initial_pieces())
+    elapsed = {}
+    try:
+        # La primera llamada crea el pool (su arranque no cuenta en la jugada) y, con
+        # 1 ms, apenas llena las tablas de los trabajadores
+        busqueda_paralela.iterative_deepening(position, True, 1, workers=WORKERS)
+        for budget_ms in BUDGETS_MS:
+            start = time.perf_counter()
+            best_move, _, depth = busqueda_paralela.iterative_deepening(position, True, budget_ms, workers=WORKERS)
+            elapsed[budget_ms] = (time.perf_counter() - start) * 1000
+            assert best_move is not None and depth >= 1
+    finally:
+        busqueda_paralela.close_pool()
+    over = {budget_ms: round(ms) for budget_ms, ms in elapsed.items() if ms > budget_ms * TOLERANCE}
+    assert not over, f"Con {WORKERS} procesos la búsqueda se pasó del tiempo (presupuesto ms: tardó ms): {over}"
+
+if __name__ == "__main__":
+    try:
+        test_parallel_budget()
+        print("test_parallel_budget: bien")
+    except AssertionError as error:
+        print(f"test_parallel_budget: FALLA\n{error}")
+        sys.exit(1)
@@ -0,0 +1 @@
+# Motor de juego sin dependencias de pygame (bitboards y búsqueda).
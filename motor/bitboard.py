@@ -0,0 +1,408 @@
+import random
+
+# Representación del tablero con bitboards.
+# Solo las casillas con (row + col) % 2 == 0 son jugables y cada una ocupa un bit,
+# numeradas fila por fila. Una posición es una tupla:
+#   (vino, gris, kings, key)
+#   vino  -> máscara de casillas con piezas vinotinto (IA)
+#   gris  -> máscara de casillas con piezas grises (jugador)
+#   kings -> máscara de casillas con damas, de cualquier color
+#   key   -> hash Zobrist de las piezas (sin el turno), actualizado en cada jugada
+
+# Casillas, direcciones y tablas de pasos y saltos por casilla (ver geometria.py).
+from motor.geometria import (BITS, KING_JUMPED, KING_JUMPS, KING_STEPS, PLAYER_JUMPED, PLAYER_JUMPS, PLAYER_PIECE,
+                             PLAYER_PROMOTION, PLAYER_STEPS, SQUARE_INDEX, SQUARES, VINO_JUMPED, VINO_JUMPS, VINO_PIECE,
+                             VINO_PROMOTION, VINO_STEPS, board_size)
+
+# Simetría del tablero: al girarlo 180° cada casilla jugable cae en otra jugable (la
+# número i pasa a ser la N-1-i, así que basta invertir el orden de los bits) y, si
+# además se cambian los colores, las vinotinto siguen avanzando hacia la fila mayor y
+# las grises hacia la menor. Una posición con turno de las grises es, girada y con los
+# colores cambiados, una con turno de las vinotinto con las mismas jugadas y la
+# evaluación con el signo cambiado. La forma canónica de una posición es la de turno
+# vinotinto: las de turno gris se giran y las otras se dejan como están.
+_MIRROR_BYTES = [int(f"{byte:08b}"[::-1], 2) for byte in range(256)]
+_MIRROR_SHIFT = -len(BITS) % 8
+
+# Máscara girada 180°.
+def mirror_mask(mask):
+    mirrored = 0
+    for _ in range((len(BITS) + 7) // 8):
+        mirrored = mirrored << 8 | _MIRROR_BYTES[mask & 255]
+        mask >>= 8
+    return mirrored >> _MIRROR_SHIFT
+
+# Clave Zobrist de la posición girada y con los colores cambiados: las dos mitades de
+# 32 bits intercambiadas (ver las claves de las grises más abajo).
+def mirror_key(key):
+    return key >> 32 | (key & 0xFFFFFFFF) << 32
+
+# Claves Zobrist de 64 bits por tipo de pieza y casilla. La semilla es fija para que
+# el hash de una posición sea el mismo en cada ejecución. Las de las grises son las de
+# las vinotinto en la casilla girada pasadas por mirror_key, así que la clave de la
+# posición girada con los colores cambiados se obtiene de la clave sin girar nada.
+_rng = random.Random(20250202)
+ZOBRIST_VINO_MAN = {bit: _rng.getrandbits(64) for bit in BITS}
+ZOBRIST_VINO_KING = {bit: _rng.getrandbits(64) for bit in BITS}
+ZOBRIST_PLAYER_MAN = {bit: mirror_key(ZOBRIST_VINO_MAN[mirror_mask(bit)]) for bit in BITS}
+ZOBRIST_PLAYER_KING = {bit: mirror_key(ZOBRIST_VINO_KING[mirror_mask(bit)]) for bit in BITS}
+ZOBRIST_SIDE = _rng.getrandbits(64)   # Se combina con la clave cuando mueven las vinotinto
+
+# Calcula desde cero el hash Zobrist de las piezas.
+def hash_pieces(vino, gris, kings):
+    key = 0
+    for bit in BITS:
+        if vino & bit:
+            key ^= ZOBRIST_VINO_KING[bit] if kings & bit else ZOBRIST_VINO_MAN[bit]
+        elif gris & bit:
+            key ^= ZOBRIST_PLAYER_KING[bit] if kings & bit else ZOBRIST_PLAYER_MAN[bit]
+    return key
+
+# Clave de la posición incluyendo el bando que mueve.
+def position_key(position, vino_turn):
+    return position[3] ^ ZOBRIST_SIDE if vino_turn else position[3]
+
+# Posición girada 180° y con los colores cambiados (el turno también cambia de bando).
+def mirror_position(position):
+    vino, gris, kings, key = position
+    return (mirror_mask(gris), mirror_mask(vino), mirror_mask(kings), mirror_key(key))
+
+# Forma canónica (turno vinotinto) de la posición y si hubo que girarla.
+def canonical_position(position, vino_turn):
+    if vino_turn:
+        return position, False
+    return mirror_position(position), True
+
+# Clave de la forma canónica, sin construirla: una posición y su girada comparten clave.
+def canonical_key(position, vino_turn):
+    return position[3] if vino_turn else mirror_key(position[3])
+
+# Convierte el diccionario de piezas de pygame {(row, col): (color, is_king)} a bitboards.
+def from_pieces(pieces):
+    vino = gris = kings = 0
+    for square, (color, is_king) in pieces.items():
+        bit = BITS[SQUARE_INDEX[square]]
+        if color == VINO_PIECE:
+            vino |= bit
+        else:
+            gris |= bit
+        if is_king:
+            kings |= bit
+    return (vino, gris, kings, hash_pieces(vino, gris, kings))
+
+# Convierte una posición de bitboards al diccionario de piezas de pygame.
+def to_pieces(position):
+    vino, gris, kings = position[0], position[1], position[2]
+    pieces = {}
+    for index, square in enumerate(SQUARES):
+        bit = BITS[index]
+        if vino & bit:
+            pieces[square] = (VINO_PIECE, bool(kings & bit))
+        elif gris & bit:
+            pieces[square] = (PLAYER_PIECE, bool(kings & bit))
+    return pieces
+
+# Codificación entera de la posición: un dígito en base 5 por casilla jugable
+# (0 vacía, 1 peón vinotinto, 2 dama vinotinto, 3 peón gris, 4 dama gris),
+# multiplicado por 2 y más 1 si mueven las vinotinto.
+POSITION_CODES = 5 ** len(SQUARES) * 2
+_CODE_VINO_MAN = {bit: 1 * 5 ** index for index, bit in enumerate(BITS)}
+_CODE_VINO_KING = {bit: 2 * 5 ** index for index, bit in enumerate(BITS)}
+_CODE_PLAYER_MAN = {bit: 3 * 5 ** index for index, bit in enumerate(BITS)}
+_CODE_PLAYER_KING = {bit: 4 * 5 ** index for index, bit in enumerate(BITS)}
+
+def encode_position(position, vino_turn):
+    vino, gris, kings = position[0], position[1], position[2]
+    code = 0
+    occupied = vino | gris
+    while occupied:
+        bit = occupied & -occupied
+        occupied ^= bit
+        if vino & bit:
+            code += _CODE_VINO_KING[bit] if kings & bit else _CODE_VINO_MAN[bit]
+        else:
+            code += _CODE_PLAYER_KING[bit] if kings & bit else _CODE_PLAYER_MAN[bit]
+    return code * 2 + 1 if vino_turn else code * 2
+
+# Código de la forma canónica (siempre con el turno de las vinotinto), calculado sin
+# girar la posición: las tablas _MIRROR_* ya tienen la casilla girada y el color cambiado.
+_MIRROR_CODE_VINO_MAN = {bit: 3 * 5 ** (len(BITS) - 1 - index) for index, bit in enumerate(BITS)}
+_MIRROR_CODE_VINO_KING = {bit: 4 * 5 ** (len(BITS) - 1 - index) for index, bit in enumerate(BITS)}
+_MIRROR_CODE_PLAYER_MAN = {bit: 1 * 5 ** (len(BITS) - 1 - index) for index, bit in enumerate(BITS)}
+_MIRROR_CODE_PLAYER_KING = {bit: 2 * 5 ** (len(BITS) - 1 - index) for index, bit in enumerate(BITS)}
+
+def encode_canonical(position, vino_turn):
+    if vino_turn:
+        return encode_position(position, True)
+    vino, gris, kings = position[0], position[1], position[2]
+    code = 0
+    occupied = vino | gris
+    while occupied:
+        bit = occupied & -occupied
+        occupied ^= bit
+        if vino & bit:
+            code += _MIRROR_CODE_VINO_KING[bit] if kings & bit else _MIRROR_CODE_VINO_MAN[bit]
+        else:
+            code += _MIRROR_CODE_PLAYER_KING[bit] if kings & bit else _MIRROR_CODE_PLAYER_MAN[bit]
+    return code * 2 + 1
+
+# La misma codificación calculada directamente desde el diccionario de piezas de pygame.
+_PIECE_CODES = {}
+for _index, _square in enumerate(SQUARES):
+    _PIECE_CODES[(_square, (VINO_PIECE, False))] = 1 * 5 ** _index
+    _PIECE_CODES[(_square, (VINO_PIECE, True))] = 2 * 5 ** _index
+    _PIECE_CODES[(_square, (PLAYER_PIECE, False))] = 3 * 5 ** _index
+    _PIECE_CODES[(_square, (PLAYER_PIECE, True))] = 4 * 5 ** _index
+
+def encode_pieces(pieces, vino_turn):
+    code = 0
+    for item in pieces.items():
+        code += _PIECE_CODES[item]
+    return code * 2 + 1 if vino_turn else code * 2
+
+_MIRROR_PIECE_CODES = {}
+for _index, _square in enumerate(SQUARES):
+    _mirror_index = len(SQUARES) - 1 - _index
+    _MIRROR_PIECE_CODES[(_square, (VINO_PIECE, False))] = 3 * 5 ** _mirror_index
+    _MIRROR_PIECE_CODES[(_square, (VINO_PIECE, True))] = 4 * 5 ** _mirror_index
+    _MIRROR_PIECE_CODES[(_square, (PLAYER_PIECE, False))] = 1 * 5 ** _mirror_index
+    _MIRROR_PIECE_CODES[(_square, (PLAYER_PIECE, True))] = 2 * 5 ** _mirror_index
+
+# encode_canonical desde el diccionario de piezas.
+def encode_canonical_pieces(pieces, vino_turn):
+    codes = _PIECE_CODES if vino_turn else _MIRROR_PIECE_CODES
+    code = 0
+    for item in pieces.items():
+        code += codes[item]
+    return code * 2 + 1
+
+# Operación inversa de encode_pieces: devuelve (piezas, mueven las vinotinto).
+_DIGIT_PIECES = [None, (VINO_PIECE, False), (VINO_PIECE, True), (PLAYER_PIECE, False), (PLAYER_PIECE, True)]
+
+def decode_pieces(code):
+    vino_turn = bool(code & 1)
+    code >>= 1
+    pieces = {}
+    for square in SQUARES:
+        code, digit = divmod(code, 5)
+        if digit:
+            pieces[square] = _DIGIT_PIECES[digit]
+    return pieces, vino_turn
+
+def evaluate_board(position):
+    return position[0].bit_count() - position[1].bit_count()
+
+# Las jugadas de cada posición se calculan una sola vez y se guardan aquí.
+# El tablero 4x4 tiene pocas posiciones alcanzables, así que la caché casi nunca
+# se llena; si lo hace, se vacía entera para acotar la memoria.
+MOVE_CACHE_LIMIT = 1 << 16
+_move_cache = {}
+
+# Genera las posiciones resultantes de cada jugada del bando indicado.
+# Si existe alguna captura, solo se devuelven capturas, cada una con su cadena completa.
+# La lista devuelta es compartida por la caché: no se debe modificar.
+def generate_moves(position, vino_turn):
+    cache_key = (position, vino_turn)
+    moves = _move_cache.get(cache_key)
+    if moves is None:
+        if len(_move_cache) >= MOVE_CACHE_LIMIT:
+            _move_cache.clear()
+        moves = _move_cache[cache_key] = _generate_moves(position, vino_turn)
+    return moves
+
+def _generate_moves(position, vino_turn):
+    vino, gris, kings, key = position
+    if vino_turn:
+        own, enemy = vino, gris
+        man_steps, man_jumps, man_jumped, promotion = VINO_STEPS, VINO_JUMPS, VINO_JUMPED, VINO_PROMOTION
+        own_man, own_king = ZOBRIST_VINO_MAN, ZOBRIST_VINO_KING
+        enemy_man, enemy_king = ZOBRIST_PLAYER_MAN, ZOBRIST_PLAYER_KING
+    else:
+        own, enemy = gris, vino
+        man_steps, man_jumps, man_jumped, promotion = PLAYER_STEPS, PLAYER_JUMPS, PLAYER_JUMPED, PLAYER_PROMOTION
+        own_man, own_king = ZOBRIST_PLAYER_MAN, ZOBRIST_PLAYER_KING
+        enemy_man, enemy_king = ZOBRIST_VINO_MAN, ZOBRIST_VINO_KING
+    occupied = vino | gris
+    moves = []
+    capture_moves = []
+    seen = None
+    remaining = own
+    while remaining:
+        bit = remaining & -remaining
+        remaining ^= bit
+        index = bit.bit_length() - 1
+        is_king = kings & bit
+        if is_king:
+            steps, jumps, jumped = KING_STEPS[index], KING_JUMPS, KING_JUMPED
+            key_from = key ^ own_king[bit]
+        else:
+            steps, jumps, jumped = man_steps[index], man_jumps, man_jumped
+            key_from = key ^ own_man[bit]
+        for over, landing in jumps[index]:
+            if enemy & over and not occupied & landing:
+                if (enemy ^ over) & jumped[landing]:
+                    # Desde el aterrizaje se podría seguir capturando: cadenas completas
+                    if seen is None:
+                        seen = set()
+                    for move in _capture_chains(bit, over, landing, jumps, is_king, enemy, occupied, kings, promotion,
+                                                own_man, own_king, enemy_man, enemy_king, seen):
+                        if vino_turn:
+                            capture_moves.append((own ^ bit ^ move[1], enemy ^ move[2], kings ^ move[4], key ^ move[5]))
+                        else:
+                            capture_moves.append((enemy ^ move[2], own ^ bit ^ move[1], kings ^ move[4], key ^ move[5]))
+                    continue
+                new_own = own ^ bit ^ landing
+                new_enemy = enemy ^ over
+                new_kings = kings & ~over
+                new_key = key_from ^ (enemy_king[over] if kings & over else enemy_man[over])
+                if is_king:
+                    new_kings ^= bit | landing
+                    new_key ^= own_king[landing]
+                elif landing & promotion:
+                    new_kings |= landing
+                    new_key ^= own_king[landing]
+                else:
+                    new_key ^= own_man[landing]
+                if vino_turn:
+                    capture_moves.append((new_own, new_enemy, new_kings, new_key))
+                else:
+                    capture_moves.append((new_enemy, new_own, new_kings, new_key))
+        if capture_moves:
+            continue
+        for landing in steps:
+            if not occupied & landing:
+                new_own = own ^ bit ^ landing
+                new_kings = kings
+                if is_king:
+                    new_kings ^= bit | landing
+                    new_key = key_from ^ own_king[landing]
+                elif landing & promotion:
+                    new_kings |= landing
+                    new_key = key_from ^ own_king[landing]
+                else:
+                    new_key = key_from ^ own_man[landing]
+                if vino_turn:
+                    moves.append((new_own, enemy, new_kings, new_key))
+                else:
+                    moves.append((enemy, new_own, new_kings, new_key))
+    return capture_moves if capture_moves else moves
+
+# Capturas en cadena de la pieza de `bit` que empiezan saltando `over` hasta `landing`,
+# como jugadas para make_move (ver abajo). Después de cada salto la pieza sigue
+# capturando mientras pueda; la cadena termina cuando ya no hay saltos o cuando un peón
+# corona. Se recorre en profundidad con una pila de máscaras, sin copiar la posición en
+# cada salto, y las piezas saltadas se quitan en el momento. Dos cadenas que terminan en
+# la misma casilla con las mismas capturas dejan la misma posición: `seen` guarda las ya
+# devueltas por la misma llamada al generador para no repetirlas.
+def _capture_chains(bit, over, landing, jumps, is_king, enemy, occupied, kings, promotion,
+                    own_man, own_king, enemy_man, enemy_king, seen):
+    moves = []
+    stack = [(landing, over, enemy ^ over, occupied ^ bit ^ over,
+              enemy_king[over] if kings & over else enemy_man[over])]
+    while stack:
+        square, captured, remaining, blocked, key_xor = stack.pop()
+        if is_king or not square & promotion:
+            extended = False
+            for next_over, next_landing in jumps[square.bit_length() - 1]:
+                if remaining & next_over and not blocked & next_landing:
+                    extended = True
+                    stack.append((next_landing, captured | next_over, remaining ^ next_over, blocked ^ next_over,
+                                  key_xor ^ (enemy_king[next_over] if kings & next_over else enemy_man[next_over])))
+            if extended:
+                continue
+        if (bit, square, captured) in seen:
+            continue
+        seen.add((bit, square, captured))
+        captured_kings = kings & captured
+        if is_king:
+            moves.append((bit, square, captured, False, bit ^ square ^ captured_kings,
+                          key_xor ^ own_king[bit] ^ own_king[square]))
+        elif square & promotion:
+            moves.append((bit, square, captured, True, square | captured_kings,
+                          key_xor ^ own_man[bit] ^ own_king[square]))
+        else:
+            moves.append((bit, square, captured, False, captured_kings,
+                          key_xor ^ own_man[bit] ^ own_man[square]))
+    return moves
+
+# Jugadas para hacer y deshacer sobre una posición mutable: la lista
+# [vino, gris, kings, key]. Cada jugada es una tupla
+#   (bit origen, bit destino, máscara de capturadas o 0, promueve, xor de kings, xor de key)
+# y, como todo se aplica con xor, deshacer es repetir la misma operación. Origen y
+# destino coinciden si una dama vuelve a su casilla al final de una cadena de capturas.
+def make_move(position, move, vino_turn):
+    moved = move[0] ^ move[1]
+    if vino_turn:
+        position[0] ^= moved
+        position[1] ^= move[2]
+    else:
+        position[1] ^= moved
+        position[0] ^= move[2]
+    position[2] ^= move[4]
+    position[3] ^= move[5]
+
+unmake_move = make_move
+
+# Genera las jugadas una a una, con las mismas reglas que generate_moves. Las máscaras
+# se leen al empezar, así que se puede hacer y deshacer jugadas mientras se recorre.
+def iter_moves(position, vino_turn):
+    vino, gris, kings = position[0], position[1], position[2]
+    if vino_turn:
+        own, enemy = vino, gris
+        man_steps, man_jumps, man_jumped, promotion = VINO_STEPS, VINO_JUMPS, VINO_JUMPED, VINO_PROMOTION
+        own_man, own_king = ZOBRIST_VINO_MAN, ZOBRIST_VINO_KING
+        enemy_man, enemy_king = ZOBRIST_PLAYER_MAN, ZOBRIST_PLAYER_KING
+    else:
+        own, enemy = gris, vino
+        man_steps, man_jumps, man_jumped, promotion = PLAYER_STEPS, PLAYER_JUMPS, PLAYER_JUMPED, PLAYER_PROMOTION
+        own_man, own_king = ZOBRIST_PLAYER_MAN, ZOBRIST_PLAYER_KING
+        enemy_man, enemy_king = ZOBRIST_VINO_MAN, ZOBRIST_VINO_KING
+    occupied = vino | gris
+    found_capture = False
+    seen = None
+    remaining = own
+    while remaining:
+        bit = remaining & -remaining
+        remaining ^= bit
+        index = bit.bit_length() - 1
+        is_king = kings & bit
+        for over, landing in (KING_JUMPS[index] if is_king else man_jumps[index]):
+            if enemy & over and not occupied & landing:
+                found_capture = True
+                if (enemy ^ over) & (KING_JUMPED if is_king else man_jumped)[landing]:
+                    # Desde el aterrizaje se podría seguir capturando: cadenas completas
+                    if seen is None:
+                        seen = set()
+                    yield from _capture_chains(bit, over, landing, KING_JUMPS if is_king else man_jumps, is_king,
+                                               enemy, occupied, kings, promotion,
+                                               own_man, own_king, enemy_man, enemy_king, seen)
+                    continue
+                captured_king = kings & over
+                key_xor = enemy_king[over] if captured_king else enemy_man[over]
+                if is_king:
+                    yield (bit, landing, over, False, bit | landing | captured_king,
+                           key_xor ^ own_king[bit] ^ own_king[landing])
+                elif landing & promotion:
+                    yield (bit, landing, over, True, landing | captured_king,
+                           key_xor ^ own_man[bit] ^ own_king[landing])
+                else:
+                    yield (bit, landing, over, False, captured_king,
+                           key_xor ^ own_man[bit] ^ own_man[landing])
+    if found_capture:
+        return
+    remaining = own
+    while remaining:
+        bit = remaining & -remaining
+        remaining ^= bit
+        index = bit.bit_length() - 1
+        if kings & bit:
+            for landing in KING_STEPS[index]:
+                if not occupied & landing:
+                    yield (bit, landing, 0, False, bit | landing, own_king[bit] ^ own_king[landing])
+        else:
+            for landing in man_steps[index]:
+                if not occupied & landing:
+                    if landing & promotion:
+                        yield (bit, landing, 0, True, landing, own_man[bit] ^ own_king[landing])
+                    else:
+                        yield (bit, landing, 0, False, 0, own_man[bit] ^ own_man[landing])
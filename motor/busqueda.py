@@ -0,0 +1,283 @@
+import time
+
+from motor.bitboard import canonical_key, evaluate_board, generate_moves, mirror_key
+from motor.transposicion import EXACT, LOWER, UPPER, TranspositionTable
+
+# Tabla compartida entre turnos: lo calculado en una jugada se reaprovecha en la siguiente.
+# Guarda las posiciones en forma canónica (ver bitboard.canonical_key), así que una
+# posición con turno gris y su girada con turno vinotinto comparten entrada: en los nodos
+# de las grises la evaluación se guarda con el signo cambiado y las cotas invertidas, y
+# la mejor jugada como la clave girada de la posición hija.
+transposition_table = TranspositionTable()
+_MIRROR_FLAG = {EXACT: EXACT, LOWER: UPPER, UPPER: LOWER}
+
+def _tt_store(key, depth, score, flag, best_move, maximizing_player):
+    if maximizing_player:
+        transposition_table.store(key, depth, score, flag, best_move[3] if best_move is not None else None)
+    else:
+        transposition_table.store(key, depth, -score, _MIRROR_FLAG[flag],
+                                  mirror_key(best_move[3]) if best_move is not None else None)
+
+# Cada cuántos nodos se consulta el reloj durante la búsqueda.
+TIME_CHECK_INTERVAL = 256
+
+# Se lanza dentro de la búsqueda cuando se agota el tiempo de la iteración en curso.
+class SearchTimeout(Exception):
+    pass
+
+_deadline = None
+_nodes_until_check = TIME_CHECK_INTERVAL
+
+# Parada pedida desde otro hilo (por ejemplo, al cerrar la ventana mientras la IA piensa):
+# la búsqueda en curso termina en la próxima consulta del reloj como si se hubiera
+# acabado el tiempo. Sigue activa hasta clear_stop.
+_stop_requested = False
+# En los procesos de busqueda_paralela, valor compartido (multiprocessing.Value) con el
+# que el proceso principal les pide la misma parada.
+shared_stop = None
+
+def stop_search():
+    global _stop_requested
+    _stop_requested = True
+
+def clear_stop():
+    global _stop_requested
+    _stop_requested = False
+
+def stop_requested():
+    return _stop_requested
+
+# Ordenamiento de jugadas: primero capturas y promociones, luego la jugada de la tabla
+# de transposición (o de la variante principal), luego las jugadas killer del mismo ply
+# y por último el resto según la tabla de historia.
+MOVE_ORDERING = True
+MAX_PLY = 128
+TACTICAL_SCORE = 3 << 40
+TT_MOVE_SCORE = 2 << 40
+KILLER_SCORE = 1 << 40
+
+# Jugadas killer por ply, identificadas como (bit origen, bit destino).
+killers = [[None, None] for _ in range(MAX_PLY)]
+# Historia: (bando, bit origen, bit destino) -> bonificación acumulada por cortes.
+history = {}
+
+# Evaluación por lotes de las hojas: si se asigna una función que recibe una lista de
+# posiciones y devuelve sus puntuaciones (por ejemplo evaluacion.evaluate_positions),
+# los nodos a profundidad 1 evalúan a todas sus hijas en una sola llamada en lugar de
+# llamar a evaluate_board por hoja. Con la evaluación material del 4x4 es más lento
+# (NumPy cuesta más por llamada que contar bits); está pensado para evaluadores caros.
+batch_evaluate = None
+
+# Contadores de la búsqueda, para medir el efecto del ordenamiento.
+nodes_searched = 0
+cutoffs = 0
+
+def reset_stats():
+    global nodes_searched, cutoffs
+    nodes_searched = 0
+    cutoffs = 0
+
+# Borra killers e historia (por ejemplo, entre posiciones de prueba independientes).
+def clear_heuristics():
+    for slot in killers:
+        slot[0] = slot[1] = None
+    history.clear()
+
+# Casillas de origen y destino de la pieza movida entre una posición y su hija.
+def _move_squares(position, move, own):
+    return position[own] & ~move[own], move[own] & ~position[own]
+
+# tt_move es la clave de piezas (move[3]) de la hija que se prueba después de las tácticas.
+def order_moves(position, moves, maximizing_player, tt_move, ply):
+    if len(moves) < 2:
+        return moves
+    own = 0 if maximizing_player else 1
+    enemy = 1 - own
+    kings = position[2]
+    if ply < MAX_PLY:
+        killer_a, killer_b = killers[ply]
+    else:
+        killer_a = killer_b = None
+    scored = []
+    for move in moves:
+        moved_from = position[own] & ~move[own]
+        moved_to = move[own] & ~position[own]
+        if move[enemy] != position[enemy] or (move[2] & moved_to and not kings & moved_from):
+            score = TACTICAL_SCORE
+        elif move[3] == tt_move:
+            score = TT_MOVE_SCORE
+        elif (moved_from, moved_to) == killer_a or (moved_from, moved_to) == killer_b:
+            score = KILLER_SCORE
+        else:
+            score = history.get((maximizing_player, moved_from, moved_to), 0)
+        scored.append((score, move))
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return [move for _, move in scored]
+
+# Registra una jugada tranquila (sin captura) que produjo un corte.
+def _record_cutoff(position, move, maximizing_player, depth, ply):
+    global cutoffs
+    cutoffs += 1
+    own = 0 if maximizing_player else 1
+    enemy = 1 - own
+    if move[enemy] != position[enemy]:
+        return
+    squares = _move_squares(position, move, own)
+    if ply < MAX_PLY:
+        slot = killers[ply]
+        if slot[0] != squares:
+            slot[1] = slot[0]
+            slot[0] = squares
+    history_key = (maximizing_player, squares[0], squares[1])
+    history[history_key] = history.get(history_key, 0) + depth * depth
+
+# Minimax con poda alfa-beta sobre posiciones de bitboards. Devuelve la evaluación
+# (positiva a favor de las vinotinto). Consulta la tabla de transposición antes de
+# expandir y guarda el resultado con su tipo de cota al terminar.
+def minimax(position, depth, maximizing_player, alpha, beta, ply=1):
+    global _nodes_until_check, nodes_searched
+    nodes_searched += 1
+    if _deadline is not None:
+        _nodes_until_check -= 1
+        if _nodes_until_check <= 0:
+            _nodes_until_check = TIME_CHECK_INTERVAL
+            if (_stop_requested or time.perf_counter() >= _deadline
+                    or shared_stop is not None and shared_stop.value):
+                raise SearchTimeout()
+    if depth == 0:
+        return evaluate_board(position)
+    alpha_orig = alpha
+    beta_orig = beta
+    key = canonical_key(position, maximizing_player)
+    entry = transposition_table.probe(key)
+    tt_move = None
+    if entry is not None:
+        if maximizing_player:
+            tt_move = entry[4]
+            score = entry[2]
+            flag = entry[3]
+        else:
+            tt_move = mirror_key(entry[4]) if entry[4] is not None else None
+            score = -entry[2]
+            flag = _MIRROR_FLAG[entry[3]]
+        if entry[1] >= depth:
+            if flag == EXACT:
+                return score
+            if flag == LOWER:
+                alpha = max(alpha, score)
+            else:
+                beta = min(beta, score)
+            if beta <= alpha:
+                return score
+
+    moves = generate_moves(position, maximizing_player)
+    if depth == 1 and batch_evaluate is not None and moves:
+        nodes_searched += len(moves)
+        scores = list(batch_evaluate(moves))
+        best_eval = max(scores) if maximizing_player else min(scores)
+        best_move = moves[scores.index(best_eval)]
+        # Sin poda entre las hijas, el valor es exacto
+        _tt_store(key, depth, best_eval, EXACT, best_move, maximizing_player)
+        return best_eval
+    if MOVE_ORDERING:
+        moves = order_moves(position, moves, maximizing_player, tt_move, ply)
+
+    best_move = None
+    if maximizing_player:
+        best_eval = float('-inf')
+        for move in moves:
+            eval_value = minimax(move, depth - 1, False, alpha, beta, ply + 1)
+            if eval_value > best_eval:
+                best_eval = eval_value
+                best_move = move
+            alpha = max(alpha, eval_value)
+            if beta <= alpha:
+                if MOVE_ORDERING:
+                    _record_cutoff(position, move, True, depth, ply)
+                break
+    else:
+        best_eval = float('inf')
+        for move in moves:
+            eval_value = minimax(move, depth - 1, True, alpha, beta, ply + 1)
+            if eval_value < best_eval:
+                best_eval = eval_value
+                best_move = move
+            beta = min(beta, eval_value)
+            if beta <= alpha:
+                if MOVE_ORDERING:
+                    _record_cutoff(position, move, False, depth, ply)
+                break
+
+    if best_eval <= alpha_orig:
+        flag = UPPER
+    elif best_eval >= beta_orig:
+        flag = LOWER
+    else:
+        flag = EXACT
+    _tt_store(key, depth, best_eval, flag, best_move, maximizing_player)
+    return best_eval
+
+# Búsqueda en la raíz a profundidad fija. Devuelve (mejor jugada, evaluación).
+# Si se indica pv_move (la mejor jugada de la iteración anterior), se prueba primero.
+def search_root(position, depth, maximizing_player, pv_move=None):
+    global nodes_searched
+    nodes_searched += 1
+    moves = generate_moves(position, maximizing_player)
+    if MOVE_ORDERING:
+        moves = order_moves(position, moves, maximizing_player, pv_move[3] if pv_move is not None else None, 0)
+    alpha = float('-inf')
+    beta = float('inf')
+    best_move = None
+    if maximizing_player:
+        best_eval = float('-inf')
+        for move in moves:
+            eval_value = minimax(move, depth - 1, False, alpha, beta)
+            if best_move is None or eval_value > best_eval:
+                best_eval = eval_value
+                best_move = move
+            alpha = max(alpha, eval_value)
+    else:
+        best_eval = float('inf')
+        for move in moves:
+            eval_value = minimax(move, depth - 1, True, alpha, beta)
+            if best_move is None or eval_value < best_eval:
+                best_eval = eval_value
+                best_move = move
+            beta = min(beta, eval_value)
+    _tt_store(canonical_key(position, maximizing_player), depth, best_eval, EXACT, best_move, maximizing_player)
+    return best_move, best_eval
+
+# Profundización iterativa con presupuesto de tiempo en milisegundos.
+# Busca a profundidad 1, 2, 3... hasta max_depth o hasta agotar el tiempo, y devuelve
+# (mejor jugada, evaluación, profundidad alcanzada) de la última iteración completa.
+# La primera iteración siempre se completa para tener una jugada que devolver.
+def iterative_deepening(position, maximizing_player, time_budget_ms, max_depth=64):
+    global _deadline, _nodes_until_check
+    transposition_table.new_search()
+    for slot in killers:
+        slot[0] = slot[1] = None
+    moves = generate_moves(position, maximizing_player)
+    if not moves:
+        return None, evaluate_board(position), 0
+    if len(moves) == 1:
+        return moves[0], evaluate_board(moves[0]), 0
+
+    start = time.perf_counter()
+    best_move, best_eval = search_root(position, 1, maximizing_player)
+    depth_reached = 1
+    try:
+        _deadline = start + time_budget_ms / 1000.0
+        _nodes_until_check = TIME_CHECK_INTERVAL
+        for depth in range(2, max_depth + 1):
+            # Un resultado ganado o perdido no cambia al buscar más profundo.
+            if best_eval in (float('inf'), float('-inf')):
+                break
+            if _stop_requested or time.perf_counter() >= _deadline:
+                break
+            best_move, best_eval = search_root(position, depth, maximizing_player, best_move)
+            depth_reached = depth
+    except SearchTimeout:
+        pass
+    finally:
+        _deadline = None
+    return best_move, best_eval, depth_reached
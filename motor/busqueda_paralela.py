@@ -0,0 +1,174 @@
+# Búsqueda minimax en paralelo: las jugadas de la raíz se reparten entre procesos.
+#
+# Cada trabajador es un proceso con su propia tabla de transposición, killers e historia
+# (las de busqueda.py), que conserva entre iteraciones y entre jugadas. En cada
+# iteración de la profundización iterativa el proceso principal manda una tarea por hija
+# de la raíz (primero la mejor de la iteración anterior) y espera a que terminen todas.
+#
+# Cota compartida: la mejor puntuación exacta encontrada en la iteración vive en un
+# multiprocessing.Value. Cada trabajador la usa como alfa (o beta, si la raíz minimiza)
+# al empezar su hija y la sube si la mejora, así que las hijas que no pueden superar a la
+# mejor se podan igual que en la búsqueda secuencial. El resultado depende del orden en
+# que terminen los procesos (en empates, o por lo que quede en cada tabla).
+#
+# Modo determinista: cada hija se busca con ventana completa y con la tabla y las
+# heurísticas vacías, y en empates gana la primera jugada de generate_moves. Con
+# time_budget_ms=None y la misma profundidad, la jugada y la evaluación no dependen de
+# los tiempos ni del número de trabajadores (con 1 se hace lo mismo en este proceso).
+import atexit
+import multiprocessing
+import signal
+import time
+
+from motor import busqueda
+from motor.bitboard import evaluate_board, generate_moves
+
+_pool = None
+_pool_workers = 0
+# Mejor puntuación exacta de la iteración, desde el punto de vista del bando de la raíz
+_shared_best = None
+# A 1 cuando se pidió busqueda.stop_search en el proceso principal (ver _run_tasks)
+_shared_stop = None
+_search_id = 0
+_worker_search_id = None
+
+# Nodos visitados por todos los procesos en la última llamada a iterative_deepening
+nodes_searched = 0
+
+def _init_worker(shared_best, shared_stop):
+    global _shared_best
+    # Los procesos heredan el manejador de SIGTERM de pygame (lo convierte en un evento
+    # de cerrar la ventana), y así close_pool no podría terminarlos.
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    _shared_best = shared_best
+    busqueda.shared_stop = shared_stop
+
+# Busca una hija de la raíz. Devuelve (índice, evaluación o None si se acabó el tiempo,
+# si la evaluación es exacta, nodos visitados). `deadline` es el instante de
+# time.perf_counter en que se acaba el tiempo de toda la jugada (None sin límite): en
+# Linux es el reloj monotónico del sistema, el mismo en todos los procesos. Así las
+# hijas que esperaron en la cola del pool no empiezan con un presupuesto nuevo.
+def _search_child(task):
+    global _worker_search_id
+    index, child, depth, maximizing_player, deadline, deterministic, search_id = task
+    if deadline is not None and time.perf_counter() >= deadline:
+        return index, None, False, 0
+    if search_id != _worker_search_id:
+        _worker_search_id = search_id
+        busqueda.transposition_table.new_search()
+    if deterministic:
+        busqueda.transposition_table.clear()
+        busqueda.clear_heuristics()
+        bound = float('-inf')
+    else:
+        bound = _shared_best.value
+    if maximizing_player:
+        alpha, beta = bound, float('inf')
+    else:
+        alpha, beta = float('-inf'), -bound
+    start_nodes = busqueda.nodes_searched
+    busqueda._deadline = deadline
+    busqueda._nodes_until_check = busqueda.TIME_CHECK_INTERVAL
+    try:
+        score = busqueda.minimax(child, depth - 1, not maximizing_player, alpha, beta)
+    except busqueda.SearchTimeout:
+        return index, None, False, busqueda.nodes_searched - start_nodes
+    finally:
+        busqueda._deadline = None
+    relative = score if maximizing_player else -score
+    # Si no superó la cota, la evaluación es solo una cota superior de la hija
+    exact = relative > bound
+    if exact and not deterministic:
+        with _shared_best.get_lock():
+            if relative > _shared_best.value:
+                _shared_best.value = relative
+    return index, score, exact, busqueda.nodes_searched - start_nodes
+
+def _get_pool(workers):
+    global _pool, _pool_workers, _shared_best, _shared_stop
+    if _pool is None or _pool_workers != workers:
+        close_pool()
+        _shared_best = multiprocessing.Value('d', float('-inf'))
+        _shared_stop = multiprocessing.Value('b', 0)
+        _pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=(_shared_best, _shared_stop))
+        _pool_workers = workers
+    return _pool
+
+# Reparte las tareas entre los trabajadores. Mientras esperan, mira si otro hilo pidió
+# busqueda.stop_search y, si es así, se lo pasa a los trabajadores por _shared_stop.
+def _run_tasks(function, tasks):
+    _shared_stop.value = 0
+    pending = _pool.map_async(function, tasks)
+    while not pending.ready():
+        pending.wait(0.05)
+        if busqueda.stop_requested():
+            _shared_stop.value = 1
+    return pending.get()
+
+# Termina los procesos trabajadores (se llama también al salir del programa).
+def close_pool():
+    global _pool, _pool_workers
+    if _pool is not None:
+        _pool.terminate()
+        _pool.join()
+        _pool = None
+        _pool_workers = 0
+
+atexit.register(close_pool)
+
+# Igual que busqueda.iterative_deepening, pero con las hijas de la raíz repartidas entre
+# `workers` procesos. Devuelve (mejor jugada, evaluación, profundidad alcanzada). Con
+# time_budget_ms=None busca hasta max_depth sin límite de tiempo.
+def iterative_deepening(position, maximizing_player, time_budget_ms, max_depth=64, workers=2, deterministic=False):
+    global nodes_searched, _search_id
+    nodes_searched = 0
+    if workers <= 1 and not deterministic:
+        busqueda.reset_stats()
+        result = busqueda.iterative_deepening(position, maximizing_player,
+                                              float('inf') if time_budget_ms is None else time_budget_ms, max_depth)
+        nodes_searched = busqueda.nodes_searched
+        return result
+    moves = generate_moves(position, maximizing_player)
+    if not moves:
+        return None, evaluate_board(position), 0
+    if len(moves) == 1:
+        return moves[0], evaluate_board(moves[0]), 0
+
+    if workers > 1:
+        _get_pool(workers)
+        run_tasks = _run_tasks
+    else:
+        run_tasks = lambda function, tasks: list(map(function, tasks))
+    _search_id += 1
+    start = time.perf_counter()
+    deadline = None if time_budget_ms is None else start + time_budget_ms / 1000.0
+    order = list(range(len(moves)))
+    best_index, best_eval, depth_reached = None, None, 0
+    for depth in range(1, max_depth + 1):
+        # Un resultado ganado o perdido no cambia al buscar más profundo.
+        if best_eval in (float('inf'), float('-inf')):
+            break
+        # La primera iteración siempre se completa para tener una jugada que devolver.
+        # Los trabajadores no ven busqueda.stop_search: la parada se mira entre iteraciones.
+        if depth > 1 and busqueda.stop_requested():
+            break
+        iteration_deadline = None
+        if depth > 1 and deadline is not None:
+            if time.perf_counter() >= deadline:
+                break
+            iteration_deadline = deadline
+        if _shared_best is not None:
+            _shared_best.value = float('-inf')
+        tasks = [(index, moves[index], depth, maximizing_player, iteration_deadline, deterministic, _search_id)
+                 for index in order]
+        results = run_tasks(_search_child, tasks)
+        nodes_searched += sum(result[3] for result in results) + 1
+        if any(result[1] is None for result in results):
+            break
+        sign = 1 if maximizing_player else -1
+        index, score, _, _ = max(results, key=lambda result: (sign * result[1], result[2], -result[0]))
+        best_index, best_eval, depth_reached = index, score, depth
+        # La mejor jugada se busca primero en la iteración siguiente
+        order.remove(index)
+        order.insert(0, index)
+    return moves[best_index], best_eval, depth_reached
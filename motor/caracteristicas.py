@@ -0,0 +1,82 @@
+# Vector de características de una posición de bitboards, mantenido de forma incremental.
+#
+# Por cada bando se cuentan cinco valores:
+#   COUNT      -> piezas
+#   KINGS      -> damas
+#   SUPPORTED  -> piezas con alguna pieza propia en una casilla diagonal vecina
+#   PROTECTED  -> piezas con una pieza propia detrás (en su sentido de avance)
+#   CENTRAL    -> piezas en las casillas centrales
+# El vector es una lista de 10 enteros: los del bando vinotinto a partir de VINO y los
+# del gris a partir de GRIS.
+#
+# Una jugada solo puede cambiar el estado de las piezas en las casillas que cambian y en
+# sus vecinas, así que make_move_features resta lo que aportaban esas piezas, aplica la
+# jugada y suma lo que aportan ahora. El costo no depende del tamaño del tablero.
+from motor import bitboard
+from motor.geometria import BITS, CENTER_SQUARES, KING_STEPS, PLAYER_STEPS, SQUARE_BITS, VINO_STEPS
+
+COUNT, KINGS, SUPPORTED, PROTECTED, CENTRAL = range(5)
+VINO = 0
+GRIS = 5
+FEATURES = 10
+
+# Máscara por bit de casilla con las casillas de las tablas de pasos de geometria.py.
+def _neighbors(steps):
+    return {bit: sum(square_steps) for bit, square_steps in zip(BITS, steps)}
+
+# Las vecinas diagonales son los pasos de una dama. Las vinotinto avanzan hacia filas
+# mayores, así que su pieza de atrás está donde daría un paso un peón gris, y al revés.
+NEIGHBORS = _neighbors(KING_STEPS)
+BEHIND_VINO = _neighbors(PLAYER_STEPS)
+BEHIND_GRIS = _neighbors(VINO_STEPS)
+CENTER = sum(SQUARE_BITS[square] for square in CENTER_SQUARES)
+
+# Suma al vector (con signo +1 o -1) lo que aportan las piezas de `own` que están en `area`.
+def _add_pieces(features, offset, own, kings, behind, area, sign):
+    pieces = own & area
+    while pieces:
+        bit = pieces & -pieces
+        pieces ^= bit
+        features[offset + COUNT] += sign
+        if kings & bit:
+            features[offset + KINGS] += sign
+        if own & NEIGHBORS[bit]:
+            features[offset + SUPPORTED] += sign
+        if own & behind[bit]:
+            features[offset + PROTECTED] += sign
+        if CENTER & bit:
+            features[offset + CENTRAL] += sign
+
+def compute_features(position):
+    features = [0] * FEATURES
+    everything = sum(BITS)
+    _add_pieces(features, VINO, position[0], position[2], BEHIND_VINO, everything, 1)
+    _add_pieces(features, GRIS, position[1], position[2], BEHIND_GRIS, everything, 1)
+    return features
+
+# Casillas cuyas piezas pueden cambiar de estado con la jugada.
+def _affected(move):
+    area = 0
+    changed = move[0] | move[1] | move[2]
+    while changed:
+        bit = changed & -changed
+        changed ^= bit
+        area |= bit | NEIGHBORS[bit]
+    return area
+
+# Hace la jugada sobre la posición mutable (ver bitboard.make_move) y actualiza el vector.
+# Se llama por el módulo para que instrumentacion pueda medir make_move.
+# Como hacer y deshacer son la misma operación, también sirve para deshacerla.
+def make_move_features(position, features, move, vino_turn):
+    area = _affected(move)
+    _add_pieces(features, VINO, position[0], position[2], BEHIND_VINO, area, -1)
+    _add_pieces(features, GRIS, position[1], position[2], BEHIND_GRIS, area, -1)
+    bitboard.make_move(position, move, vino_turn)
+    _add_pieces(features, VINO, position[0], position[2], BEHIND_VINO, area, 1)
+    _add_pieces(features, GRIS, position[1], position[2], BEHIND_GRIS, area, 1)
+
+unmake_move_features = make_move_features
+
+# Evaluación material (la misma que bitboard.evaluate_board) leída del vector.
+def evaluate_features(features):
+    return features[VINO + COUNT] - features[GRIS + COUNT]
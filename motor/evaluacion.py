@@ -0,0 +1,95 @@
+# Evaluación por lotes con NumPy: puntúa muchas posiciones en una sola llamada.
+#
+# Las posiciones se pasan a una matriz de casillas (una fila por posición, una columna
+# por casilla jugable) con los mismos dígitos de encode_position: 0 vacía, 1 peón
+# vinotinto, 2 dama vinotinto, 3 peón gris, 4 dama gris. Se puede construir desde
+# posiciones de bitboards (squares_from_positions) o desde sus códigos enteros
+# (squares_from_codes), por ejemplo los estados de la Q-table.
+#
+# batch_features calcula el mismo vector que caracteristicas.compute_features para
+# todas las filas a la vez. batch_evaluator es la función que puntúa una matriz de
+# casillas (por defecto, material como evaluate_board); un evaluador aprendido solo
+# tiene que aceptar la misma matriz y devolver una puntuación por fila.
+import numpy as np
+
+from motor.bitboard import BITS, POSITION_CODES
+from motor.caracteristicas import (BEHIND_GRIS, BEHIND_VINO, CENTER, CENTRAL, COUNT, FEATURES, GRIS,
+                                   KINGS, NEIGHBORS, PROTECTED, SUPPORTED, VINO)
+
+# Las máscaras de bitboards caben en int64 mientras haya como mucho 63 casillas jugables
+# (hasta el tablero 10x10, que tiene 50); en los mayores no se pueden pasar a NumPy.
+_SQUARE_BITS = np.array(BITS, dtype=np.int64) if len(BITS) <= 63 else None
+# Los códigos de posición caben en int64 hasta el tablero 6x6; en los mayores solo se
+# puede evaluar desde posiciones de bitboards.
+_POWERS = 5 ** np.arange(len(BITS), dtype=np.int64) if POSITION_CODES < 1 << 63 else None
+
+# Matriz de adyacencia: fila j, columna i a 1 si la casilla j está en masks[bit de i].
+# Multiplicar la matriz de piezas propias por ella cuenta, en cada casilla, las piezas
+# propias de esa vecindad.
+def _adjacency(masks):
+    matrix = np.zeros((len(BITS), len(BITS)), dtype=np.int32)
+    for i, bit in enumerate(BITS):
+        for j, other in enumerate(BITS):
+            if masks[bit] & other:
+                matrix[j, i] = 1
+    return matrix
+
+_NEIGHBORS = _adjacency(NEIGHBORS)
+_BEHIND_VINO = _adjacency(BEHIND_VINO)
+_BEHIND_GRIS = _adjacency(BEHIND_GRIS)
+_CENTER = np.array([bool(bit & CENTER) for bit in BITS])
+
+# Matriz de casillas de una lista de posiciones (tuplas o listas [vino, gris, kings, ...]).
+def squares_from_positions(positions):
+    if _SQUARE_BITS is None:
+        raise ValueError("Las máscaras de este tablero no caben en int64")
+    if not len(positions):
+        return np.zeros((0, len(BITS)), dtype=np.int8)
+    masks = np.array([position[:3] for position in positions], dtype=np.int64)
+    vino = (masks[:, 0:1] & _SQUARE_BITS) != 0
+    gris = (masks[:, 1:2] & _SQUARE_BITS) != 0
+    kings = (masks[:, 2:3] & _SQUARE_BITS) != 0
+    return (vino * (1 + kings) + gris * (3 + kings)).astype(np.int8)
+
+# Matriz de casillas y turno (True si mueven las vinotinto) de un arreglo de códigos.
+def squares_from_codes(codes):
+    if _POWERS is None:
+        raise ValueError("Los códigos de posición de este tablero no caben en int64")
+    codes = np.asarray(codes, dtype=np.int64)
+    if codes.size and (codes.min() < 0 or codes.max() >= POSITION_CODES):
+        raise ValueError("Código de posición fuera de rango")
+    squares = ((codes[:, None] >> 1) // _POWERS % 5).astype(np.int8)
+    return squares, (codes & 1).astype(bool)
+
+def _side_features(features, offset, own, kings, behind):
+    own_count = own.astype(np.int32)
+    features[:, offset + COUNT] = own_count.sum(axis=1)
+    features[:, offset + KINGS] = (own & kings).sum(axis=1)
+    features[:, offset + SUPPORTED] = (own & (own_count @ _NEIGHBORS > 0)).sum(axis=1)
+    features[:, offset + PROTECTED] = (own & (own_count @ behind > 0)).sum(axis=1)
+    features[:, offset + CENTRAL] = (own & _CENTER).sum(axis=1)
+
+# Vector de características (ver caracteristicas.py) de cada fila: matriz (N, FEATURES).
+def batch_features(squares):
+    features = np.zeros((len(squares), FEATURES), dtype=np.int32)
+    kings = (squares == 2) | (squares == 4)
+    _side_features(features, VINO, (squares == 1) | (squares == 2), kings, _BEHIND_VINO)
+    _side_features(features, GRIS, (squares == 3) | (squares == 4), kings, _BEHIND_GRIS)
+    return features
+
+# Las cinco características de un solo bando por fila: las vinotinto donde vino_side
+# es True y las grises en el resto.
+def side_features(features, vino_side):
+    return np.where(np.asarray(vino_side)[:, None], features[:, VINO:VINO + 5], features[:, GRIS:GRIS + 5])
+
+# Evaluación material (positiva a favor de las vinotinto), la misma que evaluate_board.
+def material_scores(squares):
+    return ((squares == 1) | (squares == 2)).sum(axis=1) - ((squares == 3) | (squares == 4)).sum(axis=1)
+
+batch_evaluator = material_scores
+
+def evaluate_positions(positions):
+    return batch_evaluator(squares_from_positions(positions))
+
+def evaluate_codes(codes):
+    return batch_evaluator(squares_from_codes(codes)[0])
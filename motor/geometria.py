@@ -0,0 +1,143 @@
+# Geometría del tablero precalculada al importar: casillas jugables, vecinas y saltos.
+#
+# Solo las casillas con (row + col) % 2 == 0 son jugables y se numeran fila por fila;
+# la casilla número i es el bit 1 << i de los bitboards. Para cada tipo de pieza (peón
+# vinotinto, peón gris y dama) y cada casilla hay dos tablas:
+#   pasos  -> casillas a las que puede avanzar un paso
+#   saltos -> pares (casilla saltada, casilla de aterrizaje) de cada captura posible
+# Ya tienen aplicados los límites del tablero y el sentido de avance de los peones, así
+# que quien genera jugadas solo tiene que mirar qué casillas están ocupadas.
+#
+# Las tablas existen en dos formas: por coordenadas (row, col), indexadas por la pieza
+# (color, is_king) de los diccionarios de pygame, y por bits, indexadas por el número de
+# casilla, para motor/bitboard.py.
+#
+# El tamaño del tablero se lee de la variable de entorno DAMAS_TAMANO al importar (4 por
+# defecto; también 6, 8, 10 o cualquier par mayor). Todo el motor y los front-ends toman
+# board_size de aquí, así que se elige antes de arrancar:
+#   DAMAS_TAMANO=8 python Damas_Minimax.py
+import os
+
+VINO_PIECE = (128, 0, 32)             # Piezas de la IA (vinotinto)
+PLAYER_PIECE = (100, 100, 100)        # Piezas del jugador (grises)
+
+board_size = int(os.environ.get("DAMAS_TAMANO", 4))
+if board_size < 4 or board_size % 2:
+    raise ValueError(f"DAMAS_TAMANO debe ser un número par mayor o igual que 4 (es {board_size})")
+
+SQUARES = [(row, col) for row in range(board_size) for col in range(board_size) if (row + col) % 2 == 0]
+SQUARE_INDEX = {square: index for index, square in enumerate(SQUARES)}
+BITS = [1 << index for index in range(len(SQUARES))]
+SQUARE_BITS = {square: BITS[index] for square, index in SQUARE_INDEX.items()}
+
+VINO_DIRECTIONS = [(1, -1), (1, 1)]       # Las piezas vinotinto avanzan "hacia abajo" (fila mayor)
+PLAYER_DIRECTIONS = [(-1, -1), (-1, 1)]   # Las piezas grises avanzan "hacia arriba" (fila menor)
+KING_DIRECTIONS = PLAYER_DIRECTIONS + VINO_DIRECTIONS
+
+# Filas de promoción: las vinotinto coronan en la última fila y las grises en la fila 0.
+PROMOTION_SQUARES = {
+    VINO_PIECE: frozenset(square for square in SQUARES if square[0] == board_size - 1),
+    PLAYER_PIECE: frozenset(square for square in SQUARES if square[0] == 0),
+}
+
+# Filas iniciales de cada bando: todas menos las dos centrales (una fila por bando en
+# el 4x4, tres en el 8x8 y cuatro en el 10x10).
+START_ROWS = board_size // 2 - 1
+
+# Posición inicial como diccionario de piezas (color, is_king): las vinotinto arriba
+# (filas menores) y las grises abajo.
+def initial_pieces():
+    pieces = {}
+    for row, col in SQUARES:
+        if row < START_ROWS:
+            pieces[(row, col)] = (VINO_PIECE, False)
+        elif row >= board_size - START_ROWS:
+            pieces[(row, col)] = (PLAYER_PIECE, False)
+    return pieces
+
+# Casillas centrales: las que no están en el borde del tablero.
+CENTER_SQUARES = frozenset(square for square in SQUARES
+                           if 0 < square[0] < board_size - 1 and 0 < square[1] < board_size - 1)
+
+# Pasos y saltos por casilla (en coordenadas) para una lista de direcciones.
+def _square_tables(directions):
+    steps = {}
+    jumps = {}
+    for row, col in SQUARES:
+        square_steps = []
+        square_jumps = []
+        for d_row, d_col in directions:
+            step = (row + d_row, col + d_col)
+            if step in SQUARE_INDEX:
+                square_steps.append(step)
+                landing = (row + 2 * d_row, col + 2 * d_col)
+                if landing in SQUARE_INDEX:
+                    square_jumps.append((step, landing))
+        steps[(row, col)] = tuple(square_steps)
+        jumps[(row, col)] = tuple(square_jumps)
+    return steps, jumps
+
+_VINO_SQUARE_STEPS, _VINO_SQUARE_JUMPS = _square_tables(VINO_DIRECTIONS)
+_PLAYER_SQUARE_STEPS, _PLAYER_SQUARE_JUMPS = _square_tables(PLAYER_DIRECTIONS)
+_KING_SQUARE_STEPS, _KING_SQUARE_JUMPS = _square_tables(KING_DIRECTIONS)
+
+PIECE_STEPS = {
+    (VINO_PIECE, False): _VINO_SQUARE_STEPS,
+    (PLAYER_PIECE, False): _PLAYER_SQUARE_STEPS,
+    (VINO_PIECE, True): _KING_SQUARE_STEPS,
+    (PLAYER_PIECE, True): _KING_SQUARE_STEPS,
+}
+PIECE_JUMPS = {
+    (VINO_PIECE, False): _VINO_SQUARE_JUMPS,
+    (PLAYER_PIECE, False): _PLAYER_SQUARE_JUMPS,
+    (VINO_PIECE, True): _KING_SQUARE_JUMPS,
+    (PLAYER_PIECE, True): _KING_SQUARE_JUMPS,
+}
+
+# Las mismas tablas por número de casilla y con bits: pasos[i] es una tupla de bits
+# destino y saltos[i] una tupla de pares (bit saltado, bit de aterrizaje).
+def _bit_tables(square_steps, square_jumps):
+    steps = [tuple(SQUARE_BITS[step] for step in square_steps[square]) for square in SQUARES]
+    jumps = [tuple((SQUARE_BITS[over], SQUARE_BITS[landing]) for over, landing in square_jumps[square])
+             for square in SQUARES]
+    return steps, jumps
+
+VINO_STEPS, VINO_JUMPS = _bit_tables(_VINO_SQUARE_STEPS, _VINO_SQUARE_JUMPS)
+PLAYER_STEPS, PLAYER_JUMPS = _bit_tables(_PLAYER_SQUARE_STEPS, _PLAYER_SQUARE_JUMPS)
+KING_STEPS, KING_JUMPS = _bit_tables(_KING_SQUARE_STEPS, _KING_SQUARE_JUMPS)
+
+# Máscara de las casillas que una pieza puede saltar desde cada casilla, indexada por el
+# bit de la casilla. Si después de un salto ninguna tiene una pieza rival, la captura no
+# puede continuar en cadena.
+VINO_JUMPED = {bit: sum(over for over, _ in jumps) for bit, jumps in zip(BITS, VINO_JUMPS)}
+PLAYER_JUMPED = {bit: sum(over for over, _ in jumps) for bit, jumps in zip(BITS, PLAYER_JUMPS)}
+KING_JUMPED = {bit: sum(over for over, _ in jumps) for bit, jumps in zip(BITS, KING_JUMPS)}
+
+VINO_PROMOTION = sum(SQUARE_BITS[square] for square in PROMOTION_SQUARES[VINO_PIECE])
+PLAYER_PROMOTION = sum(SQUARE_BITS[square] for square in PROMOTION_SQUARES[PLAYER_PIECE])
+
+# Capturas que puede hacer la pieza de `square` en un tablero de diccionario: pares
+# (casilla saltada, casilla de aterrizaje). Los front-ends lo usan después de cada salto
+# del jugador: si la lista no está vacía, la misma pieza tiene que seguir capturando.
+def piece_captures(pieces, square):
+    piece = pieces[square]
+    return [(over, landing) for over, landing in PIECE_JUMPS[piece][square]
+            if over in pieces and pieces[over][0] != piece[0] and landing not in pieces]
+
+# Valida el clic del jugador sobre un tablero de diccionario: la pieza de `origin` va a
+# la casilla vacía `clicked` de un paso, o captura la pieza rival de `clicked` saltando
+# sobre ella. Devuelve (casilla de aterrizaje, casilla capturada o None), o None si la
+# jugada no es válida.
+def click_move(pieces, origin, clicked):
+    piece = pieces[origin]
+    target = pieces.get(clicked)
+    if target is None:
+        if clicked in PIECE_STEPS[piece][origin]:
+            return clicked, None
+        return None
+    if target[0] == piece[0]:
+        return None
+    for over, landing in PIECE_JUMPS[piece][origin]:
+        if over == clicked and landing not in pieces:
+            return landing, over
+    return None
@@ -0,0 +1,161 @@
+# Medición opcional de las IAs: tiempos y llamadas por función, escritos como líneas JSON.
+#
+# instrument(módulo, nombres) reemplaza esas funciones del módulo por versiones que
+# acumulan su tiempo y su número de llamadas; hay que hacerlo en el módulo donde se
+# buscan por nombre (por ejemplo busqueda.generate_moves, no bitboard.generate_moves,
+# si se quiere medir la búsqueda). Los tiempos son inclusivos: minimax incluye el
+# generate_moves de sus nodos, y en las llamadas recursivas solo se mide la exterior.
+# Si la función devuelve un generador (iter_moves), se mide cada paso del generador
+# mientras quien lo usa lo recorre, así que sigue siendo perezoso como sin medir.
+# emit(evento, ...) escribe una línea con lo acumulado desde la anterior y lo reinicia:
+# los front-ends la llaman después de cada jugada de la IA y el entrenamiento cada lote.
+#
+# Si no se llama a start(), no se reemplaza ninguna función y los puntos de medición
+# solo comprueban `enabled`, así que desactivada no cuesta nada.
+#
+# start_profile(archivo) además perfila todo el programa con cProfile y al salir guarda
+# las estadísticas en el archivo (se leen con pstats) e imprime las funciones más caras.
+# cProfile solo ve el hilo que lo activa, así que lo que corre en un hilo aparte (la IA
+# de los front-ends, ver turno_ia.py) se lanza con profile_call: cada hilo tiene su
+# propio perfil y al salir se suman todos en el archivo.
+import atexit
+import cProfile
+import inspect
+import json
+import pstats
+import threading
+import time
+
+enabled = False
+timings = {}
+calls = {}
+_output = None
+_originals = {}
+_active = {}
+_last_emit = time.perf_counter()
+profiling = False
+_thread_profilers = []
+_thread_state = threading.local()
+
+# Activa la medición y abre el archivo de líneas JSON (se añade al final).
+def start(path):
+    global enabled, _output, _last_emit
+    _output = open(path, "a")
+    enabled = True
+    _last_emit = time.perf_counter()
+    atexit.register(stop)
+
+def stop():
+    global enabled, _output
+    restore()
+    enabled = False
+    if _output is not None:
+        _output.close()
+        _output = None
+
+# Reemplaza owner.name por una versión medida para cada nombre. `prefix` es el nombre con
+# que aparece en la salida (por defecto, el del módulo).
+def instrument(owner, names, prefix=None):
+    if prefix is None:
+        prefix = owner.__name__.rsplit(".", 1)[-1]
+    for name in names:
+        if (owner, name) in _originals:
+            continue
+        function = getattr(owner, name)
+        label = f"{prefix}.{name}"
+        _originals[(owner, name)] = function
+        timings[label] = 0.0
+        calls[label] = 0
+        _active[label] = 0
+
+        def timed(*args, _function=function, _label=label, **kwargs):
+            calls[_label] += 1
+            if _active[_label]:
+                return _function(*args, **kwargs)
+            _active[_label] += 1
+            start = time.perf_counter()
+            try:
+                result = _function(*args, **kwargs)
+                return _timed_generator(result, _label) if inspect.isgenerator(result) else result
+            finally:
+                _active[_label] -= 1
+                timings[_label] += time.perf_counter() - start
+        setattr(owner, name, timed)
+
+# Recorre `generator` sumando a timings[label] el tiempo de cada paso.
+def _timed_generator(generator, label):
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(generator)
+        except StopIteration:
+            return
+        finally:
+            timings[label] += time.perf_counter() - start
+        yield item
+
+# Deja las funciones originales.
+def restore():
+    for (owner, name), function in _originals.items():
+        setattr(owner, name, function)
+    _originals.clear()
+
+# Reinicia los contadores y el reloj de la línea siguiente (por ejemplo, al empezar la
+# jugada de la IA, para no contar el tiempo que pensó el humano).
+def reset():
+    global _last_emit
+    for label in timings:
+        timings[label] = 0.0
+        calls[label] = 0
+    _last_emit = time.perf_counter()
+
+# Escribe una línea JSON con el evento, los campos dados, los segundos desde la línea
+# anterior y los tiempos y llamadas acumulados, y reinicia los contadores.
+def emit(event, **fields):
+    now = time.perf_counter()
+    record = {"event": event, "time": time.time(), "seconds": now - _last_emit}
+    record.update(fields)
+    record["timings"] = {label: seconds for label, seconds in timings.items() if calls[label]}
+    record["calls"] = {label: count for label, count in calls.items() if count}
+    if _output is not None:
+        _output.write(json.dumps(record) + "\n")
+        _output.flush()
+    reset()
+    return record
+
+# Perfila el resto del programa con cProfile; al salir guarda las estadísticas en `path`
+# e imprime las `top` funciones con más tiempo acumulado.
+def start_profile(path, top=25):
+    global profiling
+    profiler = cProfile.Profile()
+
+    def dump():
+        profiler.disable()
+        stats = pstats.Stats(profiler)
+        for thread_profiler in _thread_profilers:
+            stats.add(thread_profiler)
+        stats.dump_stats(path)
+        stats.sort_stats("cumulative").print_stats(top)
+        print(f"Perfil guardado en {path} (python -m pstats {path})")
+    atexit.register(dump)
+    profiling = True
+    profiler.enable()
+
+# Llama a function(*args) perfilándola con el perfil del hilo actual si start_profile
+# está activo.
+def profile_call(function, *args):
+    if not profiling:
+        return function(*args)
+    profiler = getattr(_thread_state, "profiler", None)
+    if profiler is None:
+        profiler = _thread_state.profiler = cProfile.Profile()
+        _thread_profilers.append(profiler)
+    try:
+        profiler.enable()
+    except ValueError:
+        # Desde Python 3.12 solo puede haber un perfil activo, y ese ya ve todos los hilos
+        return function(*args)
+    try:
+        return function(*args)
+    finally:
+        profiler.disable()
@@ -0,0 +1,192 @@
+# Libro de aperturas: respuestas de la IA precalculadas para el comienzo de la partida.
+#
+# La partida siempre empieza desde initial_pieces() con el jugador (gris) moviendo
+# primero. El generador recorre las primeras `plies` jugadas desde ahí: en el turno del
+# jugador prueba todas sus jugadas, y en el de la IA busca la posición a profundidad
+# fija `depth` (mucho más de lo que alcanza la búsqueda por tiempo de la partida) y
+# sigue solo por la jugada elegida. Antes de cada búsqueda se vacían la tabla de
+# transposición y las heurísticas de ordenamiento, así que cada respuesta no depende
+# del orden en que se generó y --comprobar puede repetirla.
+#
+# El archivo es un encabezado (LIBRO_MAGIC, tamaño del tablero, plies, profundidad) y
+# una entrada de 17 bytes por posición con turno de la IA, ordenadas por clave:
+#   clave Zobrist de la posición (8 bytes) | clave de la posición tras la jugada (8 bytes)
+#   | profundidad alcanzada (1 byte)
+# La jugada se guarda como la clave a la que lleva, no como su índice entre las de
+# generate_moves, para que el libro no dependa del orden del generador.
+#
+# En el 4x4 la tabla de finales ya juega perfecto desde la posición inicial, así que el
+# libro solo sirve en tableros mayores. Hay un archivo por tamaño. Para regenerarlo y
+# comprobarlo:
+#   DAMAS_TAMANO=8 python -m motor.libro_aperturas
+#   DAMAS_TAMANO=8 python -m motor.libro_aperturas --comprobar --muestra 20
+import argparse
+import os
+import random
+import struct
+import sys
+import time
+
+from motor import busqueda
+from motor.bitboard import board_size, from_pieces, generate_moves
+from motor.geometria import initial_pieces
+
+BOOK_PLIES = 6
+BOOK_DEPTH = 12
+LIBRO_MAGIC = b"LIBR"
+HEADER = struct.Struct("<4sBBB")
+ENTRY = struct.Struct("<QQB")
+
+BOOK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         f"libro_aperturas_{board_size}x{board_size}.bin")
+
+_book = None          # Clave de la posición -> (clave tras la jugada, profundidad)
+
+# Recorre las primeras `plies` jugadas desde la posición inicial. En el turno de la IA
+# llama a answer(position), que devuelve la posición tras su jugada (o None para no
+# seguir por ahí). Cada posición se visita una sola vez aunque se llegue por varios
+# caminos.
+def walk(plies, answer):
+    frontier = [from_pieces(initial_pieces())]
+    vino_turn = False
+    seen = set()
+    for _ in range(plies):
+        next_frontier = []
+        for position in frontier:
+            if vino_turn:
+                child = answer(position)
+                children = [child] if child is not None else []
+            else:
+                children = generate_moves(position, False)
+            for child in children:
+                if (child[3], not vino_turn) not in seen:
+                    seen.add((child[3], not vino_turn))
+                    next_frontier.append(child)
+        frontier = next_frontier
+        vino_turn = not vino_turn
+
+# Búsqueda a profundidad fija con la tabla de transposición y las heurísticas vacías.
+# Devuelve (jugada, profundidad alcanzada), o (None, 0) si la IA no tiene jugadas.
+def search_position(position, depth):
+    busqueda.transposition_table.clear()
+    busqueda.clear_heuristics()
+    best_move, _, depth_reached = busqueda.iterative_deepening(position, True, float('inf'), depth)
+    return best_move, depth_reached
+
+# Devuelve {clave: (clave tras la jugada, profundidad)} con las respuestas de la IA.
+def generate_book(plies=BOOK_PLIES, depth=BOOK_DEPTH, progress=None):
+    book = {}
+    def answer(position):
+        best_move, depth_reached = search_position(position, depth)
+        if best_move is None:
+            return None
+        book[position[3]] = (best_move[3], depth_reached)
+        if progress is not None:
+            progress(len(book))
+        return best_move
+    walk(plies, answer)
+    return book
+
+def write_book(book, plies, depth, path=BOOK_FILE):
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(LIBRO_MAGIC, board_size, plies, depth))
+        for key in sorted(book):
+            f.write(ENTRY.pack(key, *book[key]))
+
+# Lee el archivo y devuelve (plies, profundidad, libro). Falla si es de otro tamaño.
+def read_book(path=BOOK_FILE):
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, size, plies, depth = HEADER.unpack_from(data)
+    if magic != LIBRO_MAGIC:
+        raise ValueError(f"{path} no es un libro de aperturas")
+    if size != board_size:
+        raise ValueError(f"{path} es del tablero {size}x{size}, no del {board_size}x{board_size}")
+    book = {key: (move_key, depth_reached)
+            for key, move_key, depth_reached in ENTRY.iter_unpack(data[HEADER.size:])}
+    return plies, depth, book
+
+# Carga el libro del tamaño actual. Si no existe, las consultas devuelven None y la IA busca.
+def open_book(path=BOOK_FILE):
+    global _book
+    if not os.path.exists(path):
+        _book = None
+        return None
+    _book = read_book(path)[2]
+    return _book
+
+# Respuesta del libro para una posición con turno de la IA, como (jugada, profundidad
+# con la que se buscó), o None si la posición no está en el libro.
+def book_move(position):
+    if _book is None:
+        return None
+    entry = _book.get(position[3])
+    if entry is None:
+        return None
+    move_key, depth = entry
+    for move in generate_moves(position, True):
+        if move[3] == move_key:
+            return move, depth
+    return None
+
+# Comprueba el archivo: que cubra todas las posiciones de la IA a las que se llega
+# jugando según el libro, que cada jugada sea legal y que no sobren entradas. Con
+# `sample` repite la búsqueda de ese número de entradas al azar y compara la jugada.
+# Devuelve la lista de errores (vacía si todo está bien).
+def verify_book(path=BOOK_FILE, sample=0, seed=1):
+    plies, depth, book = read_book(path)
+    errors = []
+    reached = {}
+    def answer(position):
+        entry = book.get(position[3])
+        if entry is None:
+            if generate_moves(position, True):
+                errors.append(f"Falta la posición {position[3]:016x}")
+            return None
+        reached[position[3]] = position
+        for move in generate_moves(position, True):
+            if move[3] == entry[0]:
+                return move
+        errors.append(f"Jugada ilegal en la posición {position[3]:016x}")
+        return None
+    walk(plies, answer)
+    for key in book.keys() - reached.keys():
+        errors.append(f"La posición {key:016x} no se alcanza desde la inicial")
+    checked = random.Random(seed).sample(sorted(reached), min(sample, len(reached)))
+    for key in checked:
+        best_move, _ = search_position(reached[key], depth)
+        if best_move[3] != book[key][0]:
+            errors.append(f"La búsqueda a profundidad {depth} no coincide en la posición {key:016x}")
+    return errors
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera o comprueba el libro de aperturas del tamaño actual (DAMAS_TAMANO).")
+    parser.add_argument("--jugadas", type=int, default=BOOK_PLIES, help="Plies desde la posición inicial que cubre el libro")
+    parser.add_argument("--profundidad", type=int, default=BOOK_DEPTH, help="Profundidad de búsqueda de cada respuesta")
+    parser.add_argument("--comprobar", action="store_true", help="Comprobar el archivo existente en vez de generarlo")
+    parser.add_argument("--muestra", type=int, default=0, help="Con --comprobar, respuestas que se vuelven a buscar")
+    parser.add_argument("--archivo", default=BOOK_FILE, help="Ruta del libro")
+    args = parser.parse_args()
+    if args.comprobar:
+        if not os.path.exists(args.archivo):
+            raise SystemExit(f"No existe {args.archivo}; se genera con python -m motor.libro_aperturas")
+        plies, depth, book = read_book(args.archivo)
+        print(f"{args.archivo}: {len(book)} posiciones, {plies} plies, profundidad {depth}")
+        errors = verify_book(args.archivo, args.muestra)
+        for error in errors:
+            print(error)
+        if errors:
+            raise SystemExit(f"{len(errors)} errores")
+        print(f"Libro correcto ({args.muestra} respuestas buscadas de nuevo)")
+        return
+    start = time.perf_counter()
+    def progress(count):
+        print(f"\r{count} posiciones, {time.perf_counter() - start:.0f} s", end="", file=sys.stderr)
+    book = generate_book(args.jugadas, args.profundidad, progress)
+    print(file=sys.stderr)
+    write_book(book, args.jugadas, args.profundidad, args.archivo)
+    print(f"Libro escrito en {args.archivo}: {len(book)} posiciones en "
+          f"{os.path.getsize(args.archivo)} bytes, {time.perf_counter() - start:.0f} s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# Ponderación: la IA sigue buscando durante el turno del rival.
+#
+# En cuanto la IA juega, start lanza en segundo plano (con un AITurn, ver turno_ia.py)
+# la búsqueda de su respuesta a cada jugada posible del rival, empezando por las más
+# probables: las que mejor le quedan al rival según una búsqueda corta a
+# ORDER_DEPTH. Cada respuesta completa se guarda en `cache` junto con lo que tardó, y de
+# paso la búsqueda llena la tabla de transposición, las killers y la historia.
+#
+# Cuando el rival juega, take detiene la ponderación y busca la posición nueva en la
+# caché: si está (acierto), la respuesta se juega sin esperar y el tiempo que costó
+# buscarla es latencia ahorrada; si no (fallo), se descarta lo que faltaba y la IA busca
+# como siempre, con la tabla de transposición ya caliente. La búsqueda que se estaba
+# haciendo al llegar la jugada se descarta aunque fuera la buena: quedó a medias.
+#
+# `search` es la función de búsqueda de la IA: recibe una posición de bitboards con
+# turno vinotinto y el número de turnos jugados hasta ella, y devuelve (jugada,
+# profundidad), como search_ai_move de Damas_Minimax.
+import time
+
+from motor import busqueda
+from motor.bitboard import generate_moves
+from motor.turno_ia import AITurn
+
+ORDER_DEPTH = 3
+
+class Ponderer:
+    def __init__(self, search):
+        self.search = search
+        self.turn = AITurn()
+        self.cache = {}          # Posición (sin la clave Zobrist) -> (jugada, profundidad, segundos)
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+    # Empieza a ponderar desde `position`, con turno del rival (gris) y turn_number
+    # turnos jugados.
+    def start(self, position, turn_number):
+        self.turn.stop()
+        self.cache = {}
+        self.turn.start(self._ponder, position, turn_number)
+
+    def _ponder(self, position, turn_number):
+        # La evaluación es positiva a favor de las vinotinto: el rival prefiere la menor.
+        # Este minimax no mira la parada (no tiene reloj), así que se mira entre jugada y
+        # jugada: take espera como mucho una búsqueda a ORDER_DEPTH.
+        scored = []
+        for reply in generate_moves(position, False):
+            if busqueda.stop_requested():
+                return
+            scored.append((busqueda.minimax(reply, ORDER_DEPTH, True, float('-inf'), float('inf')), len(scored), reply))
+        scored.sort(key=lambda entry: entry[:2])
+        for _, _, reply in scored:
+            start = time.perf_counter()
+            best_move, depth = self.search(reply, turn_number + 1)
+            if busqueda.stop_requested():
+                return
+            self.cache[reply[:3]] = (best_move, depth, time.perf_counter() - start)
+
+    # Respuesta ya calculada para `position` (la posición después de la jugada del
+    # rival) como (jugada, profundidad), o None si no se alcanzó a calcular.
+    def take(self, position):
+        self.turn.stop()
+        entry = self.cache.get(position[:3])
+        self.cache = {}
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.saved_seconds += entry[2]
+        return entry[:2]
+
+    # Descarta la ponderación en curso sin contarla (por ejemplo, si terminó la partida).
+    def stop(self):
+        self.turn.stop()
+        self.cache = {}
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def summary(self):
+        return (f"Ponderación: {self.hits} aciertos de {self.hits + self.misses} ({self.hit_rate():.0%}), "
+                f"{self.saved_seconds:.1f} s de espera ahorrados")
+
+    def cancel(self):
+        self.turn.cancel()
@@ -0,0 +1,192 @@
+# Tabla de finales con juego perfecto para el tablero 4x4.
+#
+# El generador enumera todas las posiciones legales (hasta dos piezas por bando,
+# peones fuera de su fila de promoción) con ambos turnos, construye el grafo de
+# jugadas con generate_moves y resuelve cada posición por análisis retrógrado:
+# quien no tiene jugadas (o no tiene piezas) pierde. Las posiciones que no se
+# resuelven son tablas (ciclos de damas).
+#
+# Solo se guardan las formas canónicas (turno vinotinto, ver encode_canonical): una
+# posición con turno gris tiene el mismo resultado que su girada. El archivo es un
+# encabezado (TABLEBASE_MAGIC y número de posiciones), los códigos canónicos ordenados
+# (4 bytes cada uno) y un byte por código, en el mismo orden:
+#   bits 6-7 -> resultado para el bando que mueve (1 gana, 2 pierde, 3 tablas)
+#   bits 0-5 -> jugadas (plies) hasta el final con juego perfecto
+#
+# Las partidas se declaran tablas al llegar a MAX_TURNS plies, y la tabla no sabe en
+# qué turno va la partida: quien consulta pasa los plies que quedan (plies_left) y un
+# resultado que llegaría tarde se trata como tablas.
+#
+# Para regenerarlo:
+#   python -m motor.tablas_finales
+import os
+import struct
+from array import array
+from collections import deque
+from itertools import combinations
+
+from motor.bitboard import (BITS, PLAYER_PROMOTION, VINO_PROMOTION, board_size, encode_canonical,
+                            encode_position, generate_moves, hash_pieces)
+
+WIN = 1
+LOSS = 2
+DRAW = 3
+MAX_DISTANCE = 63
+MAX_TURNS = 64        # Plies tras los que los front-ends declaran tablas
+TABLEBASE_MAGIC = b"TFIN"
+HEADER = struct.Struct("<4sI")
+
+TABLEBASE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tablas_finales_4x4.bin")
+
+_tablebase = None     # Código canónico -> byte de resultado y distancia
+
+# Todas las formas de colocar hasta dos piezas de un bando en las casillas libres.
+# Devuelve pares (máscara de piezas, máscara de damas).
+def _placements(free, forbidden_men):
+    squares = [bit for bit in BITS if free & bit]
+    for count in range(3):
+        for chosen in combinations(squares, count):
+            for king_flags in range(1 << count):
+                mask = kings = 0
+                legal = True
+                for i, bit in enumerate(chosen):
+                    mask |= bit
+                    if king_flags >> i & 1:
+                        kings |= bit
+                    elif bit & forbidden_men:
+                        legal = False
+                if legal:
+                    yield mask, kings
+
+def enumerate_positions():
+    all_squares = sum(BITS)
+    for vino, vino_kings in _placements(all_squares, VINO_PROMOTION):
+        for gris, gris_kings in _placements(all_squares & ~vino, PLAYER_PROMOTION):
+            kings = vino_kings | gris_kings
+            position = (vino, gris, kings, hash_pieces(vino, gris, kings))
+            yield position, True
+            yield position, False
+
+# Resuelve todas las posiciones y devuelve {código canónico: byte de resultado y distancia}.
+def generate_tablebase():
+    nodes = {}
+    predecessors = {}
+    pending = {}
+    for position, vino_turn in enumerate_positions():
+        code = encode_position(position, vino_turn)
+        nodes[code] = (position, vino_turn)
+        predecessors.setdefault(code, [])
+    for code, (position, vino_turn) in nodes.items():
+        children = generate_moves(position, vino_turn)
+        pending[code] = len(children)
+        for child in children:
+            predecessors.setdefault(encode_position(child, not vino_turn), []).append(code)
+
+    result = {}
+    distance = {}
+    queue = deque()
+    for code, count in pending.items():
+        if count == 0:
+            result[code] = LOSS
+            distance[code] = 0
+            queue.append(code)
+    # Se procesa en orden de distancia: el ganador llega por el camino más corto
+    # y el perdedor resiste por el más largo.
+    while queue:
+        code = queue.popleft()
+        for parent in predecessors[code]:
+            if parent in result:
+                continue
+            if result[code] == LOSS:
+                result[parent] = WIN
+                distance[parent] = distance[code] + 1
+                queue.append(parent)
+            else:
+                pending[parent] -= 1
+                if pending[parent] == 0:
+                    result[parent] = LOSS
+                    distance[parent] = distance[code] + 1
+                    queue.append(parent)
+
+    table = {}
+    for code, (position, vino_turn) in nodes.items():
+        if not vino_turn:
+            continue
+        if code in result:
+            if distance[code] > MAX_DISTANCE:
+                raise ValueError(f"Distancia {distance[code]} fuera de rango en la posición {code}")
+            table[code] = result[code] << 6 | distance[code]
+        else:
+            table[code] = DRAW << 6
+    return table
+
+def write_tablebase(path=TABLEBASE_FILE):
+    table = generate_tablebase()
+    codes = sorted(table)
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(TABLEBASE_MAGIC, len(codes)))
+        f.write(array("I", codes).tobytes())
+        f.write(bytes(table[code] for code in codes))
+    return table
+
+# Carga el archivo. Si no existe, las consultas devuelven None y la IA busca.
+def open_tablebase(path=TABLEBASE_FILE):
+    global _tablebase
+    if board_size != 4 or not os.path.exists(path):
+        _tablebase = None
+        return None
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, count = HEADER.unpack_from(data)
+    if magic != TABLEBASE_MAGIC:
+        raise ValueError(f"{path} tiene el formato antiguo; se regenera con python -m motor.tablas_finales")
+    codes = array("I")
+    codes.frombytes(data[HEADER.size:HEADER.size + 4 * count])
+    _tablebase = dict(zip(codes, data[HEADER.size + 4 * count:]))
+    return _tablebase
+
+# Devuelve (resultado, distancia) para el bando que mueve, o None si no está en la tabla.
+# Con plies_left, un resultado que no llega antes del límite de turnos es tablas.
+def probe(position, vino_turn, plies_left=None):
+    if _tablebase is None:
+        return None
+    value = _tablebase.get(encode_canonical(position, vino_turn))
+    if value is None:
+        return None
+    result, distance = value >> 6, value & MAX_DISTANCE
+    if plies_left is not None and result != DRAW and distance >= plies_left:
+        return DRAW, 0
+    return result, distance
+
+# Mejor jugada según la tabla: ganar lo antes posible, si no empatar,
+# y si no hay remedio perder lo más tarde posible. plies_left como en probe.
+def best_move(position, vino_turn, plies_left=None):
+    best = None
+    best_rank = None
+    child_plies_left = plies_left - 1 if plies_left is not None else None
+    for child in generate_moves(position, vino_turn):
+        entry = probe(child, not vino_turn, child_plies_left)
+        if entry is None:
+            return None
+        child_result, child_distance = entry
+        if child_result == LOSS:
+            rank = (0, child_distance)
+        elif child_result == DRAW:
+            rank = (1, 0)
+        else:
+            rank = (2, -child_distance)
+        if best_rank is None or rank < best_rank:
+            best = child
+            best_rank = rank
+    return best
+
+if __name__ == "__main__":
+    # Las posiciones se enumeran todas: solo es viable en el 4x4.
+    if board_size != 4:
+        raise SystemExit(f"La tabla de finales solo se genera para el tablero 4x4 (DAMAS_TAMANO={board_size})")
+    table = write_tablebase()
+    counts = [0, 0, 0, 0]
+    for value in table.values():
+        counts[value >> 6] += 1
+    print(f"Tabla escrita en {TABLEBASE_FILE}: {len(table)} posiciones en {os.path.getsize(TABLEBASE_FILE)} bytes")
+    print(f"Gana: {counts[WIN]} | Pierde: {counts[LOSS]} | Tablas: {counts[DRAW]}")
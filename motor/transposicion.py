@@ -0,0 +1,63 @@
+# Tabla de transposición de tamaño fijo indexada por la clave Zobrist.
+# Cada entrada es una tupla (key, depth, score, flag, best_move, generation).
+
+EXACT = 0   # El valor es exacto
+LOWER = 1   # El valor es una cota inferior (hubo corte beta)
+UPPER = 2   # El valor es una cota superior (ninguna jugada superó alfa)
+
+class TranspositionTable:
+    def __init__(self, size_bits=16):
+        self.size = 1 << size_bits
+        self.mask = self.size - 1
+        self.entries = [None] * self.size
+        self.generation = 0
+        self.hits = 0          # La casilla tenía la misma clave
+        self.misses = 0        # La casilla estaba vacía
+        self.collisions = 0    # La casilla tenía otra posición
+        self.stores = 0
+        self.overwrites = 0    # Entradas de otra posición reemplazadas
+
+    # Marca el inicio de una nueva búsqueda; las entradas antiguas pasan a ser reemplazables.
+    def new_search(self):
+        self.generation += 1
+
+    def probe(self, key):
+        entry = self.entries[key & self.mask]
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry[0] != key:
+            self.collisions += 1
+            return None
+        self.hits += 1
+        return entry
+
+    # Política de reemplazo: se sobrescribe si la casilla está vacía, es la misma posición,
+    # viene de una búsqueda anterior o la nueva búsqueda es al menos igual de profunda.
+    def store(self, key, depth, score, flag, best_move):
+        index = key & self.mask
+        entry = self.entries[index]
+        if entry is not None and entry[0] != key:
+            if entry[5] == self.generation and entry[1] > depth:
+                return
+            self.overwrites += 1
+        self.entries[index] = (key, depth, score, flag, best_move, self.generation)
+        self.stores += 1
+
+    def clear(self):
+        self.entries = [None] * self.size
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.hits = self.misses = self.collisions = self.stores = self.overwrites = 0
+
+    def stats(self):
+        probes = self.hits + self.misses + self.collisions
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "collisions": self.collisions,
+            "stores": self.stores,
+            "overwrites": self.overwrites,
+            "hit_rate": self.hits / probes if probes else 0.0,
+        }
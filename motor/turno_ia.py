@@ -0,0 +1,62 @@
+# Turno de la IA en segundo plano para los front-ends de pygame.
+#
+# La jugada se calcula en un hilo aparte mientras el bucle principal sigue dibujando y
+# atendiendo eventos: start lanza la función y vuelve enseguida, el bucle pregunta
+# done() en cada cuadro y recoge lo que devolvió con result() (si la función lanzó una
+# excepción, result la vuelve a lanzar en el bucle). La búsqueda en Python tiene el GIL
+# casi todo el tiempo, pero el intérprete cambia de hilo cada pocos milisegundos
+# (sys.getswitchinterval), así que un cuadro espera como mucho eso aunque la búsqueda
+# sea muy profunda. El bucle debe esperar entre cuadros (pygame.time.Clock.tick) para
+# no quitarle tiempo a la búsqueda.
+#
+# stop() descarta el trabajo en curso: pide a la búsqueda que pare
+# (busqueda.stop_search) y espera a que la función vuelva; después se puede lanzar otro.
+# cancel() hace lo mismo y además cierra el hilo; se usa al cerrar la ventana.
+#
+# Con --perfil, la función se perfila en el hilo (instrumentacion.profile_call): el
+# perfil del hilo principal solo vería el dibujo y los eventos.
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from motor import busqueda, instrumentacion
+
+class AITurn:
+    def __init__(self):
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="turno_ia")
+        self.future = None
+        self.cancelled = False
+
+    def start(self, function, *args):
+        self.cancelled = False
+        self.future = self.executor.submit(self._run, function, args)
+
+    def _run(self, function, args):
+        # Primero se quita la parada anterior y luego se mira la cancelación: stop()
+        # marca la cancelación antes de pedir la parada, así que no se pierde ninguna.
+        busqueda.clear_stop()
+        if self.cancelled:
+            return None
+        return instrumentacion.profile_call(function, *args)
+
+    # True mientras la IA está pensando.
+    def busy(self):
+        return self.future is not None and not self.future.done()
+
+    # True si hay una jugada lista para recoger con result().
+    def done(self):
+        return self.future is not None and self.future.done()
+
+    def result(self):
+        future, self.future = self.future, None
+        return future.result()
+
+    def stop(self):
+        if self.future is None:
+            return
+        self.cancelled = True
+        busqueda.stop_search()
+        wait([self.future])
+        self.future = None
+
+    def cancel(self):
+        self.stop()
+        self.executor.shutdown(wait=True)